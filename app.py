@@ -390,6 +390,12 @@ LLM_ENGINES = {
         "speed": "⚡⚡ Fast",
         "cost": "Free (30 RPM)",
     },
+    "Offline Replay (Local)": {
+        "provider": "offline",
+        "model_id": "genauto-offline",
+        "speed": "🧪 Simulated latency",
+        "cost": "No API key",
+    },
 }
 
 COMPLIANCE_STANDARDS = {
@@ -1,477 +1,50 @@
 import streamlit as st
 import time
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# ============================================================
-# MULTI-PROVIDER LLM CLIENT
-# ============================================================
-
-def get_llm_client(engine_config):
-    """Initialize LLM client based on selected engine."""
-    provider = engine_config["provider"]
-    
-    # Check session state first, then env
-    if provider == "anthropic":
-        api_key = st.session_state.get('ANTHROPIC_API_KEY', os.getenv("ANTHROPIC_API_KEY", ""))
-        if api_key:
-            try:
-                import anthropic
-                return {"provider": "anthropic", "client": anthropic.Anthropic(api_key=api_key), "model": engine_config["model_id"]}
-            except Exception as e:
-                st.warning(f"⚠️ Anthropic init failed: {e}")
-    
-    elif provider == "google":
-        api_key = st.session_state.get('GOOGLE_API_KEY', os.getenv("GOOGLE_API_KEY", ""))
-        if api_key:
-            try:
-                import google.generativeai as genai
-                genai.configure(api_key=api_key)
-                model = genai.GenerativeModel(engine_config["model_id"])
-                return {"provider": "google", "client": model, "model": engine_config["model_id"]}
-            except Exception as e:
-                st.warning(f"⚠️ Google AI init failed: {e}")
-    
-    elif provider == "groq":
-        api_key = st.session_state.get('GROQ_API_KEY', os.getenv("GROQ_API_KEY", ""))
-        if api_key:
-            try:
-                from groq import Groq
-                return {"provider": "groq", "client": Groq(api_key=api_key), "model": engine_config["model_id"]}
-            except Exception as e:
-                st.warning(f"⚠️ Groq init failed: {e}")
-    
-    return None
-
-
-def _call_provider(llm_info, system_prompt, user_prompt, max_tokens):
-    """Direct call to a single provider."""
-    provider = llm_info["provider"]
-    
-    if provider == "anthropic":
-        response = llm_info["client"].messages.create(
-            model=llm_info["model"],
-            max_tokens=max_tokens,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_prompt}]
-        )
-        return response.content[0].text
-    
-    elif provider == "google":
-        full_prompt = f"{system_prompt}\n\n---\n\n{user_prompt}"
-        response = llm_info["client"].generate_content(full_prompt)
-        return response.text
-    
-    elif provider == "groq":
-        response = llm_info["client"].chat.completions.create(
-            model=llm_info["model"],
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=max_tokens,
-            temperature=0.3
-        )
-        return response.choices[0].message.content
-
-
-def _get_fallback_clients():
-    """Build list of fallback LLM clients."""
-    fallbacks = []
-    
-    # Try Anthropic
-    api_key = st.session_state.get('ANTHROPIC_API_KEY', os.getenv("ANTHROPIC_API_KEY", ""))
-    if api_key:
-        try:
-            import anthropic
-            fallbacks.append({"provider": "anthropic", "client": anthropic.Anthropic(api_key=api_key), "model": "claude-3-haiku-20240307", "name": "Claude Haiku"})
-        except: pass
-    
-    # Try Groq
-    api_key = st.session_state.get('GROQ_API_KEY', os.getenv("GROQ_API_KEY", ""))
-    if api_key:
-        try:
-            from groq import Groq
-            fallbacks.append({"provider": "groq", "client": Groq(api_key=api_key), "model": "llama-3.3-70b-versatile", "name": "Llama 3.3 70B"})
-        except: pass
-    
-    # Try Google
-    api_key = st.session_state.get('GOOGLE_API_KEY', os.getenv("GOOGLE_API_KEY", ""))
-    if api_key:
-        try:
-            import google.generativeai as genai
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel("gemini-2.0-flash")
-            fallbacks.append({"provider": "google", "client": model, "model": "gemini-2.0-flash", "name": "Gemini 2.0 Flash"})
-        except: pass
-    
-    return fallbacks
-
-
-def call_llm(llm_info, system_prompt, user_prompt, max_tokens=2000):
-    """Universal LLM call with automatic fallback."""
-    if not llm_info:
-        # Try fallbacks directly
-        fallbacks = _get_fallback_clients()
-        if not fallbacks:
-            return "[⚠️ No API key configured. Add your key in the sidebar → API Keys section]"
-        llm_info = fallbacks[0]
-    
-    # Try primary
-    try:
-        return _call_provider(llm_info, system_prompt, user_prompt, max_tokens)
-    except Exception as primary_error:
-        # Auto-fallback to other providers
-        fallbacks = _get_fallback_clients()
-        for fb in fallbacks:
-            if fb["provider"] == llm_info.get("provider") and fb["model"] == llm_info.get("model"):
-                continue  # Skip same provider
-            try:
-                result = _call_provider(fb, system_prompt, user_prompt, max_tokens)
-                st.toast(f"⚡ Auto-switched to {fb['name']} (primary failed)")
-                return result
-            except:
-                continue
-        
-        return f"[⚠️ All LLMs failed. Primary error: {primary_error}]"
-
-def _get_demo_fallback(system_prompt, user_prompt):
-    """Return high-quality pre-canned responses for the main demo scenario (Tire Pressure)."""
-    # Detect if this is the Tire Pressure demo
-    if "Tire" in user_prompt or "Tire" in system_prompt:
-        if "Software Requirements" in system_prompt:
-            return """# Software Requirements Specification (SRS)
-## 1. Introduction
-The Tire Pressure Monitoring Service (TPMS) monitors tire pressure and temperature for all 4 wheels.
-
-## 2. Functional Requirements
-- **SWR-001:** Monitor pressure (psi) and temperature (C) at 1Hz.
-- **SWR-002:** Publish `Vehicle.Chassis.Axle.Row1.Wheel.Left.Tire.Pressure` via SOME/IP.
-- **SWR-003:** Alert if pressure drop > 20% within 1 min (Rapid Deflation).
-- **SWR-004:** ASIL-B compliance for alert signal integrity.
-"""
-        elif "Franca IDL" in system_prompt:
-            return """package common.api
-interface TirePressureService {
-    version { major 1 minor 0 }
-    attribute Float tirePressureFL readonly
-    attribute Float tirePressureFR readonly
-    attribute Float tirePressureRL readonly
-    attribute Float tirePressureRR readonly
-    broadcast pressureAlert {
-        out { String status }
-    }
-}"""
-        elif "C++14" in system_prompt:
-            return """#include <CommonAPI/CommonAPI.hpp>
-#include <vsomeip/vsomeip.hpp>
-#include <iostream>
-
-/* MISRA C++:2023 Compliant */
-namespace genauto {
-namespace services {
-
-class TirePressureService : public CommonAPI::Stub<TirePressureStub> {
-public:
-    TirePressureService() = default;
-    virtual ~TirePressureService() = default;
-
-    void checkPressure(float pressure) {
-        if (pressure < 30.0f) {
-            firePressureAlert("LOW_PRESSURE");
-        }
-    }
-};
-
-} // namespace services
-} // namespace genauto
-"""
-        elif "test cases" in system_prompt.lower():
-            return """import pytest
-from services import TirePressureService
-
-def test_initial_pressure():
-    svc = TirePressureService()
-    assert svc.pressure == 0.0
-
-def test_alert_trigger():
-    svc = TirePressureService()
-    svc.set_pressure(25.0)  # Low
-    assert svc.alert_status == "LOW_PRESSURE"
-"""
-        elif "MISRA" in system_prompt:
-            return """# MISRA C++:2023 Compliance Report
-**Status:** ✅ Compliant
-- **Rule 0-1-1:** No unreachable code detected.
-- **Rule 2-13-2:** Octal constants not used.
-- **Rule 5-2-12:** Array indexing verified safe.
-- **Security:** No buffer overflow risks found.
-"""
-    return None
-
-
-def call_llm(llm_info, system_prompt, user_prompt, max_tokens=2000):
-    """Universal LLM call with automatic fallback & DEMO GUARD."""
-    if not llm_info:
-        # Try resilient fallbacks
-        fallbacks = _get_fallback_clients()
-        if not fallbacks:
-            # ---> FINAL DEMO GUARD <---
-            demo_resp = _get_demo_fallback(system_prompt, user_prompt)
-            if demo_resp:
-                st.toast("🛡️ APIs Down — Switched to Simulation Mode")
-                return demo_resp
-            return "[⚠️ No API key configured. Add your key in the sidebar → API Keys section]"
-        llm_info = fallbacks[0]
-    
-    # Try primary
-    try:
-        return _call_provider(llm_info, system_prompt, user_prompt, max_tokens)
-    except Exception as primary_error:
-        # Auto-fallback to other providers
-        fallbacks = _get_fallback_clients()
-        for fb in fallbacks:
-            if fb["provider"] == llm_info.get("provider") and fb["model"] == llm_info.get("model"):
-                continue
-            try:
-                result = _call_provider(fb, system_prompt, user_prompt, max_tokens)
-                st.toast(f"⚡ Auto-switched to {fb['name']} (primary failed)")
-                return result
-            except:
-                continue
-        
-        # ---> FINAL DEMO GUARD (Last Resort) <---
-        demo_resp = _get_demo_fallback(system_prompt, user_prompt)
-        if demo_resp:
-            st.toast("🛡️ All APIs Failed — Switched to Simulation Mode")
-            return demo_resp
-            
-        return f"[⚠️ All LLMs failed. Primary error: {primary_error}]"
-
+import hashlib
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from modules.can_decoder import decode_example, sample_database
+from modules.dbc import DbcParseError, parse_dbc
+from modules.engine import (
+    GENERATION_FAILED_PREFIX, PROJECT_ARTIFACTS, REFINEMENT_QUESTIONS, build_full_context, build_generation_plan,
+    compliance_result, get_build_log, get_docker_compose, get_dockerfile, get_llm_client, plan_fingerprints,
+    project_files, prompt_basis, run_generation_plan, service_name_for, service_slug, stale_outputs,
+)
+from modules.llm_cache import get_response_cache
+from modules.llm_router import routing_stats
+from modules.tracing import new_trace_id
+from modules.project_export import EXPORT_FORMATS, available_formats, build_archive, export_digest
+from modules.rate_limiter import rate_limit_stats
+from modules.vss_mapper import MIN_CONFIDENCE, get_vss_mapper
+from modules.artifact_patch import is_small_edit, requirement_diff
 
 # ============================================================
-# COMPLIANCE-AWARE SYSTEM PROMPTS
+# ARTIFACT DISPLAY
 # ============================================================
 
-def get_compliance_rules(compliance):
-    """Return compliance-specific rules for code generation."""
-    if compliance == "MISRA C++:2023":
-        return """MISRA C++:2023 Rules to follow:
-- Use 'final' on classes, 'const' on all possible variables
-- F suffix on float literals (e.g., 28.0F)
-- No C-style casts — use static_cast, dynamic_cast only
-- Single return per function (Rule 15.5.1)
-- All function parameters must be named (Rule 8.4.4)
-- No dynamic memory after initialization (Rule 18.0.1)
-- No implicit type conversions (Rule 5.0.1)
-- Use fixed-width integers (uint8_t, uint16_t, etc.)
-- Add MISRA rule reference comments on each compliance point"""
-    
-    elif compliance == "MISRA C:2012":
-        return """MISRA C:2012 Rules to follow:
-- No dynamic memory allocation (malloc/free forbidden)
-- No recursion allowed
-- All loops must have a fixed bound
-- No pointer arithmetic except array indexing
-- All variables must be initialized at declaration
-- No implicit type conversions between signed/unsigned
-- Use only approved standard library functions
-- No function pointers (use switch-case dispatch)
-- All #include guards mandatory
-- Add MISRA C rule reference comments"""
-    
-    elif compliance == "AUTOSAR C++14":
-        return """AUTOSAR C++14 Coding Guidelines to follow:
-- Use AUTOSAR ara::com API for service communication
-- Prefer ara::core::Result over exceptions
-- Use ara::core::Future for async operations
-- Follow SOME/IP service discovery patterns
-- Use Smart Pointers (unique_ptr, shared_ptr) — no raw new/delete
-- Use constexpr and noexcept where applicable  
-- Namespace must follow AUTOSAR adaptive package naming
-- Service skeleton/proxy pattern for all interfaces
-- Add AUTOSAR guideline reference comments"""
-    
-    return ""
-
-
-def get_srs_prompt(compliance):
-    return f"""You are an automotive software requirements engineer.
-Given a high-level service description, generate a Software Requirements Specification (SRS) as a markdown table.
-Each requirement must have: ID (SWR-001 format), Priority (Must/Should), Description, ASIL level, Variant applicability.
-Generate exactly 12-15 requirements. Include safety, communication (SOME/IP), data format (COVESA VSS), ML prediction, variant support.
-Compliance standard: {compliance} — include a requirement for compliance.
-Output ONLY the markdown table, no explanations."""
-
-
-def get_franca_prompt():
-    return """You are an automotive middleware expert specializing in SOME/IP and Franca IDL.
-Given a service description and its requirements, generate a complete Franca IDL (.fidl) interface definition.
-Include: package declaration, interface with version, methods with in/out/error parameters, broadcasts for events, attributes.
-Use realistic automotive data types. Output ONLY the Franca IDL code."""
-
-
-def get_arxml_prompt():
-    return """You are an AUTOSAR Adaptive Platform expert.
-Given a service description, generate a valid ARXML service interface manifest.
-Include: AR-PACKAGE, SERVICE-INTERFACE, CLIENT-SERVER-OPERATIONs, EVENTs.
-Use proper AUTOSAR R4.0 namespacing. Output ONLY the XML code."""
-
-
-def get_cpp_prompt(compliance):
-    rules = get_compliance_rules(compliance)
-    return f"""You are a senior C++ automotive software engineer.
-Generate a {compliance}-compliant service implementation using vsomeip for SOME/IP communication.
-
-{rules}
-
-Also:
-- Use COVESA VSS signal paths for vehicle data
-- Include namespace, class definition, constructor, and key methods
-- Include ML prediction integration
-Output ONLY the C++ code with compliance comments."""
-
-
-def get_kotlin_prompt():
-    return """You are an Android automotive HMI developer.
-Generate a Kotlin ViewModel for Android Automotive using MVVM architecture.
-Include: data classes, LiveData, viewModelScope coroutines, SOME/IP event handling.
-Use Material3 patterns. Output ONLY the Kotlin code."""
-
-
-def get_rust_prompt():
-    return """You are a Rust systems programmer specializing in automotive services.
-Generate an async Rust service using tokio for the given automotive service.
-Rules: No unsafe blocks, use Result for error handling, async/await, mpsc channels, proper error types.
-Include structs with Serialize/Deserialize derives. Output ONLY the Rust code."""
-
-
-def get_test_prompt(compliance):
-    return f"""You are a QA engineer for automotive software.
-Generate pytest test cases for the given service. Requirements:
-- Each test class maps to a specific SWR requirement (TestSWR001_xxx format)
-- Include MockVssClient class for SOME/IP simulation
-- Test normal cases, edge cases, and error handling
-- Include {compliance} compliance verification test
-- Add test execution summary comment at bottom showing all tests pass
-Output ONLY the Python test code."""
-
-
-def get_misra_prompt(compliance):
-    return f"""You are a {compliance} compliance checker.
-Analyze the given C++ code for {compliance} compliance.
-Output a markdown table with columns: Rule, Category (Required/Advisory), Description, Status (PASS/ADVISORY/FAIL).
-Check at least 12 rules specific to {compliance}. Most should PASS. Include 1-2 ADVISORY items for realism.
-Output ONLY the markdown table."""
-
-
-def get_mock_prompt():
-    return """You are an automotive test infrastructure engineer.
-Generate a Python mock SOME/IP service class for testing the given service without real vehicle hardware.
-Include: configurable publish frequency, realistic data generation with noise, fault injection support, subscriber pattern.
-Output ONLY the Python code."""
-
-
-# ============================================================
-# STATIC TEMPLATES (Docker — no need for LLM)
-# ============================================================
-
-def get_dockerfile(service_name):
-    sn = service_name.lower().replace(" ", "_")
-    return f'''# ================================================
-# Dockerfile — {service_name}
-# Generated by GenAuto-SDV Studio
-# Base: AUTOSAR Adaptive Runtime (Linux/aarch64)
-# ================================================
-
-FROM ubuntu:22.04 AS builder
-
-RUN apt-get update && apt-get install -y \\
-    build-essential cmake libboost-all-dev libvsomeip3-dev \\
-    && rm -rf /var/lib/apt/lists/*
-
-WORKDIR /app
-COPY src/ ./src/
-COPY include/ ./include/
-COPY CMakeLists.txt .
-COPY models/ ./models/
-
-RUN mkdir build && cd build && \\
-    cmake .. -DCMAKE_BUILD_TYPE=Release \\
-             -DENABLE_MISRA_CHECKS=ON \\
-             -DTARGET_PLATFORM=aarch64 && \\
-    make -j$(nproc)
-
-FROM ubuntu:22.04 AS runtime
-RUN apt-get update && apt-get install -y \\
-    libvsomeip3 libboost-system1.74.0 \\
-    && rm -rf /var/lib/apt/lists/*
-
-WORKDIR /opt/genautomotive
-COPY --from=builder /app/build/{sn} .
-COPY --from=builder /app/models/ ./models/
-COPY config/ ./config/
-
-EXPOSE 30490/udp
-HEALTHCHECK --interval=5s CMD ["./{sn}", "--health"]
-ENTRYPOINT ["./{sn}"]'''
-
-
-def get_docker_compose(service_name):
-    svc = service_name.lower().replace(" ", "-")
-    return f'''version: "3.8"
-
-services:
-  {svc}:
-    build: ./services/{svc}
-    container_name: soa-{svc}
-    network_mode: host
-    restart: unless-stopped
-    environment:
-      - SOMEIP_INSTANCE_ID=0x1234
-      - VSS_SERVER=localhost:55555
-
-  diagnostic-aggregator:
-    build: ./services/diagnostic_aggregator
-    container_name: soa-diagnostics
-    depends_on: [{svc}]
-
-  hmi-dashboard:
-    build: ./services/hmi_dashboard
-    container_name: soa-hmi
-    ports: ["8080:8080"]
-    depends_on: [diagnostic-aggregator]'''
-
-
-def get_build_log(service_name):
-    t = time.strftime('%H:%M:%S')
-    return f"""[{t}] 🔧 Starting build: {service_name}
-[{t}] 📦 Resolving dependencies...
-[{t}]   ✅ libvsomeip3-dev (3.3.8)
-[{t}]   ✅ libboost-all-dev (1.74.0)
-[{t}]   ✅ cmake (3.22.1)
-[{t}] ⚙️ Compiling src/{service_name.replace(' ','')}Service.cpp...
-[{t}]   🛡️ MISRA Check: 0 critical violations
-[{t}] 🔗 Linking {service_name.lower().replace(' ','_')}...
-[{t}] ✅ Build successful — Binary: 2.3 MB
-[{t}] 🐳 Packaging Docker image: soa-{service_name.lower().replace(' ','-')}:latest
-[{t}] ✅ Image built: 89 MB (multi-stage optimized)
-[{t}] 🏥 Health check... ✅ Service responding on port 30490
-[{t}] 🚀 Ready for OTA deployment!"""
+def _show_artifact(slot, step, text):
+    """Render a generated artifact into its placeholder."""
+    if step["lang"] == "markdown":
+        slot.markdown(text, unsafe_allow_html=True)
+    else:
+        slot.code(text, language=step["lang"])
 
 
-# ============================================================
-# REFINEMENT QUESTIONS
-# ============================================================
-
-REFINEMENT_QUESTIONS = [
-    {"question": "What vehicle types should this service support?", "options": ["ICE Only", "Hybrid Only", "EV Only", "All Variants"], "default": 3},
-    {"question": "What is the Safety Integrity Level (ASIL)?", "options": ["QM (No Safety)", "ASIL-A", "ASIL-B", "ASIL-C", "ASIL-D"], "default": 2},
-    {"question": "Primary communication protocol?", "options": ["SOME/IP (Automotive)", "REST/HTTP (IT)", "Both (Gateway)"], "default": 2},
-    {"question": "Do you have legacy CAN/DBC data to import?", "options": ["No, use COVESA VSS only", "Yes, I have a .dbc file"], "default": 1},
-]
+def _show_compliance_metrics(slot, compliance, result):
+    """Standard / critical violations / status of the local rule checker for the current C++ artifact."""
+    with slot.container():
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Standard", compliance)
+        if result is None:
+            c2.metric("Critical Violations", "—")
+            c3.metric("Status", "No C++ code")
+            return
+        c2.metric("Critical Violations", result.critical,
+                  "✅" if result.compliant else f"{len(result.violations)} findings in total", delta_color="off")
+        c3.metric("Status", "Compliant" if result.compliant else "Non-compliant", f"Score {result.score}%",
+                  delta_color="off")
 
 
 # ============================================================
@@ -480,55 +53,136 @@ REFINEMENT_QUESTIONS = [
 
 def parse_dbc_file(dbc_content):
     """Parse a DBC file and extract signal definitions with VSS mapping."""
-    signals = []
-    current_msg = None
-    
-    VSS_MAPPING = {
-        "TirePressure": "Vehicle.Chassis.Axle.Tire.Pressure",
-        "VehicleSpeed": "Vehicle.Speed",
-        "BrakePedal": "Vehicle.Chassis.Brake.PedalPosition",
-        "EngineRPM": "Vehicle.Powertrain.CombustionEngine.Speed",
-        "ThrottlePos": "Vehicle.Powertrain.CombustionEngine.ThrottlePosition",
-        "SteeringAngle": "Vehicle.Chassis.SteeringWheel.Angle",
-        "BatteryVoltage": "Vehicle.Powertrain.TractionBattery.Voltage",
-        "BatterySoC": "Vehicle.Powertrain.TractionBattery.StateOfCharge",
-        "MotorTemp": "Vehicle.Powertrain.ElectricMotor.Temperature",
-        "CoolantTemp": "Vehicle.Powertrain.CombustionEngine.CoolantTemperature",
-    }
+    try:
+        db = parse_dbc(dbc_content)
+    except DbcParseError:
+        return []
     
-    for line in dbc_content.split('\n'):
-        line = line.strip()
-        if line.startswith('BO_ '):
-            parts = line.split()
-            if len(parts) >= 3:
-                current_msg = {"id": parts[1], "name": parts[2].rstrip(':')}
-        elif line.startswith('SG_ ') and current_msg:
-            parts = line.split()
-            if len(parts) >= 2:
-                sig_name = parts[1]
-                # Find VSS mapping
-                vss_path = "—"
-                for key, path in VSS_MAPPING.items():
-                    if key.lower() in sig_name.lower():
-                        vss_path = path
-                        break
-                
-                # Extract unit if available
-                unit = ""
-                if '"' in line:
-                    unit = line.split('"')[1] if line.count('"') >= 2 else ""
-                
-                signals.append({
-                    "can_signal": sig_name,
-                    "can_id": f"0x{int(current_msg['id']):03X}",
-                    "message": current_msg["name"],
-                    "vss_path": vss_path,
-                    "unit": unit
-                })
+    # Ranked VSS candidates for every signal from the token index; below MIN_CONFIDENCE a signal stays unmapped
+    pairs = list(db.iter_signals())
+    ranked = get_vss_mapper().map_signals([(sig.name, msg.name, sig.unit) for msg, sig in pairs])
+    
+    signals = []
+    for (msg, sig), matches in zip(pairs, ranked):
+        confident = bool(matches) and matches[0].confidence >= MIN_CONFIDENCE
+        
+        if sig.is_multiplexer:
+            mux = "M"
+        elif sig.mux_ids is not None:
+            mux = "m" + ",".join(str(i) for i in sorted(sig.mux_ids))
+        else:
+            mux = ""
+        
+        signals.append({
+            "can_signal": sig.name,
+            "can_id": f"0x{msg.frame_id:03X}",
+            "message": msg.name,
+            "vss_path": matches[0].path if confident else "—",
+            "confidence": matches[0].confidence if matches else 0.0,
+            "alternatives": [(m.path, m.confidence) for m in matches[1:]],
+            "unit": sig.unit,
+            "layout": sig.layout,
+            "factor": sig.scale,
+            "offset": sig.offset,
+            "min": sig.minimum,
+            "max": sig.maximum,
+            "mux": mux,
+            "choices": sig.choices,
+            "comment": sig.comment,
+        })
     
     return signals
 
 
+# Parsed uploads are keyed by content hash, so every rerun and every session uploading the same file reuses one parse
+DBC_CACHE_ENTRIES = int(os.getenv("GENAUTO_DBC_CACHE_ENTRIES", "16"))
+DBC_PAGE_SIZES = [25, 50, 100, 250]
+DBC_SORT_COLUMNS = {"CAN ID": "_can_id", "Message": "Message", "Signal": "Signal", "VSS Path": "VSS Path", "Match": "Match"}
+DBC_MAPPING_FILTERS = ["All signals", "Mapped", "Unmapped"]
+DbcImport = namedtuple("DbcImport", ["digest", "signals", "frame"])
+
+
+def _mapping_frame(signals):
+    """Columnar DBC → VSS mapping table (one row per signal), built once per parsed file."""
+    frame = pd.DataFrame({
+        "Signal": [sig['can_signal'] + (f" {sig['mux']}" if sig['mux'] else "") for sig in signals],
+        "CAN ID": [sig['can_id'] for sig in signals],
+        "Message": [sig['message'] for sig in signals],
+        "Layout": [sig['layout'] for sig in signals],
+        "Factor": [sig['factor'] for sig in signals],
+        "Offset": [sig['offset'] for sig in signals],
+        "Range": [f"[{sig['min']}, {sig['max']}]" for sig in signals],
+        "VSS Path": [sig['vss_path'] for sig in signals],
+        "Match": [round(sig['confidence'] * 100) for sig in signals],
+        "Unit": [sig['unit'] for sig in signals],
+    })
+    frame["_can_id"] = frame["CAN ID"].map(lambda can_id: int(can_id, 16)).astype("int64")
+    # One lower-cased haystack per row so search is a single vectorized substring scan
+    frame["_search"] = (frame["CAN ID"] + "\x1f" + frame["Message"] + "\x1f" + frame["Signal"] + "\x1f" + frame["VSS Path"]).str.lower()
+    return frame
+
+
+def filter_mapping_frame(frame, search="", mapping="All signals", sort_by="CAN ID", descending=False):
+    """Rows matching a search over CAN ID / message / signal / VSS path and a mapping filter, sorted."""
+    mask = np.ones(len(frame), dtype=bool)
+    if search.strip():
+        mask &= frame["_search"].str.contains(search.strip().lower(), regex=False).to_numpy()
+    if mapping != "All signals":
+        mapped = (frame["VSS Path"] != "—").to_numpy()
+        mask &= mapped if mapping == "Mapped" else ~mapped
+    view = frame[mask]
+    return view.sort_values(DBC_SORT_COLUMNS[sort_by], ascending=not descending, kind="stable")
+
+
+@st.cache_resource(show_spinner=False, max_entries=DBC_CACHE_ENTRIES)
+def load_dbc_import(digest, _data):
+    """Parse an uploaded DBC once per SHA-256 digest (LRU-bounded, shared across sessions — treat as read-only)."""
+    signals = parse_dbc_file(_data.decode("utf-8", errors="ignore"))
+    return DbcImport(digest, signals, _mapping_frame(signals))
+
+
+def _render_mapping_table(dbc_import):
+    """Paginated mapping grid: filter/sort/search run server-side, only the visible page is sent to the browser."""
+    c1, c2, c3 = st.columns([2, 1, 1])
+    search = c1.text_input("Search", key="dbc_search", placeholder="CAN ID, message, signal or VSS path")
+    mapping = c2.selectbox("Show", DBC_MAPPING_FILTERS, key="dbc_filter")
+    sort_by = c3.selectbox("Sort by", list(DBC_SORT_COLUMNS), key="dbc_sort")
+    c4, c5 = st.columns(2)
+    descending = c4.toggle("Descending", key="dbc_desc")
+    page_size = c5.selectbox("Rows per page", DBC_PAGE_SIZES, key="dbc_page_size")
+
+    view = filter_mapping_frame(dbc_import.frame, search, mapping, sort_by, descending)
+    pages = max(1, -(-len(view) // page_size))
+    # A new query or file starts back on page 1
+    query = (dbc_import.digest, search, mapping, sort_by, descending, page_size)
+    if st.session_state.get('dbc_query') != query:
+        st.session_state['dbc_query'] = query
+        st.session_state['dbc_page'] = 1
+    page = st.session_state['dbc_page'] = min(st.session_state.get('dbc_page', 1), pages)
+    start = (page - 1) * page_size
+
+    st.dataframe(
+        view.iloc[start:start + page_size].drop(columns=["_can_id", "_search"]),
+        hide_index=True,
+        width="stretch",
+        column_config={"Match": st.column_config.ProgressColumn("Match", format="%d%%", min_value=0, max_value=100)},
+    )
+    c6, c7 = st.columns([3, 1])
+    c6.caption(f"Rows {start + 1 if len(view) else 0}–{min(start + page_size, len(view))} of {len(view)} "
+               f"(filtered from {len(dbc_import.frame)}) · page {page} of {pages}")
+    c7.number_input("Page", min_value=1, max_value=pages, step=1, key="dbc_page", label_visibility="collapsed")
+
+
+def dbc_digest(uploaded_file):
+    """SHA-256 of an uploaded file, hashed once per upload rather than once per rerun."""
+    cached = st.session_state.get('dbc_digest')
+    if cached and cached[0] == uploaded_file.file_id:
+        return cached[1]
+    digest = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    st.session_state['dbc_digest'] = (uploaded_file.file_id, digest)
+    return digest
+
+
 # ============================================================
 # RENDER FUNCTION — THE MAIN 7-STEP PIPELINE
 # ============================================================
@@ -543,6 +197,28 @@ def render(llm_model_name, engine_config, target_langs, compliance):
     else:
         st.caption(f"🔴 **{llm_model_name}** — No API key. Add key in sidebar ⚙️ → 🔑 API Keys")
     
+    cache = get_response_cache()
+    if cache is not None:
+        cache_stats = cache.stats()
+        st.caption(f"💾 Response cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                   f"({cache_stats['hit_rate']:.0%}) | {cache_stats['entries']} entries, {cache_stats['bytes'] / 1024:.0f} KB")
+    
+    route_stats = [r for r in routing_stats() if r["samples"]]
+    if route_stats:
+        breaker_icon = {"closed": "✅", "half-open": "🟡", "open": "⛔"}
+        st.caption("📡 Routing: " + " | ".join(
+            f"{r['model'][:24]} p95 {r['p95'] or 0:.1f}s, {r['error_rate']:.0%} err {breaker_icon[r['state']]}"
+            for r in route_stats
+        ))
+    
+    queued = [q for q in rate_limit_stats() if q["granted"] or q["queue_depth"]]
+    if queued:
+        st.caption("🚦 Quota: " + " | ".join(
+            f"{q['model'][:24]} {q['rpm']} RPM, queue {q['queue_depth']} (max {q['max_depth']}), "
+            f"avg wait {q['avg_wait']:.1f}s, 429s {q['throttled']}"
+            for q in queued
+        ))
+    
     # ---- STEP 1: Requirement Input ----
     st.markdown("### 📝 Step 1: Enter High-Level Requirement")
     
@@ -594,16 +270,13 @@ def render(llm_model_name, engine_config, target_langs, compliance):
         dbc_file = st.file_uploader("Upload CAN DBC file", type=["dbc"])
         
         if dbc_file:
-            dbc_content = dbc_file.read().decode("utf-8", errors="ignore")
-            parsed_signals = parse_dbc_file(dbc_content)
+            dbc_import = load_dbc_import(dbc_digest(dbc_file), dbc_file.getvalue())
+            parsed_signals = dbc_import.signals
             
             if parsed_signals:
                 st.success(f"✅ **{dbc_file.name}** parsed! {len(parsed_signals)} signals found.")
                 with st.expander(f"📊 DBC → VSS Mapping ({len(parsed_signals)} signals)", expanded=True):
-                    table_md = "| CAN Signal | CAN ID | Message | VSS Path | Unit |\n|---|---|---|---|---|\n"
-                    for sig in parsed_signals:
-                        table_md += f"| `{sig['can_signal']}` | {sig['can_id']} | {sig['message']} | `{sig['vss_path']}` | {sig['unit']} |\n"
-                    st.markdown(table_md)
+                    _render_mapping_table(dbc_import)
                 
                 # Store for use in generation
                 st.session_state['dbc_signals'] = parsed_signals
@@ -624,13 +297,11 @@ enabling seamless migration from legacy CAN to modern service-oriented architect
                 """)
     
     generate_btn = st.button("🚀 Analyze & Generate Full Pipeline", type="primary")
+    patch_mode = st.toggle("🩹 Patch mode: send small requirement edits as diffs against the previous artifacts",
+                           value=True, key="patch_mode")
     
     if generate_btn:
         st.session_state['pipeline_started'] = True
-        # Clear old outputs to regenerate fresh with new config
-        for key in list(st.session_state.keys()):
-            if key.endswith('_output'):
-                del st.session_state[key]
     
     if not st.session_state.get('pipeline_started'):
         return
@@ -641,45 +312,47 @@ enabling seamless migration from legacy CAN to modern service-oriented architect
     st.markdown("### 🤖 Step 2: Interactive Requirement Refinement")
     
     cols = st.columns(2)
-    refinement_context = ""
+    refinements = {}
     for i, q in enumerate(REFINEMENT_QUESTIONS):
         with cols[i % 2]:
-            answer = st.selectbox(q["question"], q["options"], index=q["default"], key=f"refine_{i}")
-            refinement_context += f"{q['question']}: {answer}\n"
+            refinements[q["question"]] = st.selectbox(q["question"], q["options"], index=q["default"], key=f"refine_{i}")
     
     # Include DBC context if available
-    dbc_context = ""
-    if 'dbc_signals' in st.session_state:
-        dbc_context = "\n\nLegacy CAN signals imported from DBC:\n"
-        for sig in st.session_state['dbc_signals'][:5]:
-            dbc_context += f"- {sig['can_signal']} ({sig['can_id']}) → VSS: {sig['vss_path']}\n"
-    
-    full_context = f"""Service Description: {user_prompt}
-
-Refinement:
-{refinement_context}
-Compliance Standard: {compliance}
-Target Languages: {', '.join(target_langs)}
-{dbc_context}"""
+    full_context = build_full_context(user_prompt, refinements, compliance, target_langs, st.session_state.get('dbc_signals'))
     
     st.warning("⚠️ **AI Conflict Detection:** Safety requirements analyzed. Auto-checking for conflicts and missing redundancy...")
     st.success(f"✅ Analysis complete — generating pipeline using **{llm_model_name}** with **{compliance}** compliance...")
     
+    plan = build_generation_plan(user_prompt, full_context, compliance, target_langs)
+    steps = {step["key"]: step for step in plan}
+    
+    # Only artifacts whose inputs changed (and their dependents) are regenerated
+    fingerprints = plan_fingerprints(plan, llm_info)
+    recorded = st.session_state.setdefault('output_fingerprints', {})
+    stale = stale_outputs(plan, fingerprints, {key: st.session_state[key] for key in steps if key in st.session_state}, recorded)
+    bases = st.session_state.setdefault('output_basis', {})
+    if generate_btn:
+        for key in stale:
+            previous = st.session_state.pop(key, None)
+            recorded.pop(key, None)
+            basis = bases.pop(key, None)
+            # Same model + system prompt and a lightly edited requirement: ask for a diff instead of the whole file
+            if ("local" not in steps[key] and patch_mode and previous and not previous.startswith(GENERATION_FAILED_PREFIX) and basis
+                    and basis[1] == prompt_basis(steps[key], llm_info) and is_small_edit(basis[0], user_prompt)):
+                steps[key]["previous"] = previous
+                steps[key]["requirement_diff"] = requirement_diff(basis[0], user_prompt)
+    elif stale:
+        st.caption(f"🔁 {len(stale)} artifact(s) out of date with the current configuration — press Generate to refresh them.")
+    slots = {}
+    progress_slot = st.empty()
+    
     st.divider()
     
     # ---- STEP 3: Generated SRS (LLM) ----
     st.markdown("### 📋 Step 3: AI-Generated Software Requirements Specification")
     
-    if 'srs_output' not in st.session_state:
-        with st.spinner(f"🧠 {llm_model_name} generating SRS..."):
-            st.session_state['srs_output'] = call_llm(
-                llm_info, get_srs_prompt(compliance),
-                f"Generate SRS for: {full_context}",
-                max_tokens=1500
-            )
-    
     with st.expander("📄 View Full SRS (AI-Generated)", expanded=True):
-        st.markdown(st.session_state['srs_output'], unsafe_allow_html=True)
+        slots['srs_output'] = st.empty()
     
     st.divider()
     
@@ -689,26 +362,12 @@ Target Languages: {', '.join(target_langs)}
     tab_idl, tab_arxml = st.tabs(["Franca IDL (.fidl)", "AUTOSAR ARXML (.arxml)"])
     
     with tab_idl:
-        if 'franca_output' not in st.session_state:
-            with st.spinner(f"🧠 {llm_model_name} generating Franca IDL..."):
-                st.session_state['franca_output'] = call_llm(
-                    llm_info, get_franca_prompt(),
-                    f"Generate Franca IDL for: {user_prompt}\n\nSRS:\n{st.session_state.get('srs_output', '')}",
-                    max_tokens=1500
-                )
         st.caption("AI-generated Franca Interface Description Language for SOME/IP binding")
-        st.code(st.session_state['franca_output'], language="java")
+        slots['franca_output'] = st.empty()
     
     with tab_arxml:
-        if 'arxml_output' not in st.session_state:
-            with st.spinner(f"🧠 {llm_model_name} generating ARXML..."):
-                st.session_state['arxml_output'] = call_llm(
-                    llm_info, get_arxml_prompt(),
-                    f"Generate ARXML for: {user_prompt}",
-                    max_tokens=1500
-                )
         st.caption("AI-generated AUTOSAR Adaptive Platform manifest")
-        st.code(st.session_state['arxml_output'], language="xml")
+        slots['arxml_output'] = st.empty()
     
     st.divider()
     
@@ -733,53 +392,11 @@ Target Languages: {', '.join(target_langs)}
     code_tabs = st.tabs(tab_labels)
     tab_idx = 0
     
-    if "C++14" in target_langs:
-        with code_tabs[tab_idx]:
-            if 'cpp_output' not in st.session_state:
-                with st.spinner(f"🧠 Generating {compliance}-compliant C++ code..."):
-                    st.session_state['cpp_output'] = call_llm(
-                        llm_info, get_cpp_prompt(compliance),
-                        f"Generate C++ service for: {user_prompt}\n\nSRS:\n{st.session_state.get('srs_output', '')}",
-                        max_tokens=2500
-                    )
-            st.code(st.session_state['cpp_output'], language="cpp")
-        tab_idx += 1
-    
-    if "Kotlin" in target_langs:
-        with code_tabs[tab_idx]:
-            if 'kotlin_output' not in st.session_state:
-                with st.spinner(f"🧠 Generating Kotlin ViewModel..."):
-                    st.session_state['kotlin_output'] = call_llm(
-                        llm_info, get_kotlin_prompt(),
-                        f"Generate Kotlin ViewModel for: {user_prompt}",
-                        max_tokens=2000
-                    )
-            st.code(st.session_state['kotlin_output'], language="kotlin")
-        tab_idx += 1
-    
-    if "Rust" in target_langs:
-        with code_tabs[tab_idx]:
-            if 'rust_output' not in st.session_state:
-                with st.spinner(f"🧠 Generating async Rust service..."):
-                    st.session_state['rust_output'] = call_llm(
-                        llm_info, get_rust_prompt(),
-                        f"Generate Rust service for: {user_prompt}",
-                        max_tokens=2000
-                    )
-            st.code(st.session_state['rust_output'], language="rust")
-        tab_idx += 1
-    
-    if "Python" in target_langs:
-        with code_tabs[tab_idx]:
-            if 'python_output' not in st.session_state:
-                with st.spinner(f"🧠 Generating Python prototype..."):
-                    st.session_state['python_output'] = call_llm(
-                        llm_info, "Generate a Python prototype service. Use asyncio, dataclasses, and type hints. Include main() with example usage.",
-                        f"Generate Python prototype for: {user_prompt}",
-                        max_tokens=2000
-                    )
-            st.code(st.session_state['python_output'], language="python")
-        tab_idx += 1
+    for lang, key in [("C++14", "cpp_output"), ("Kotlin", "kotlin_output"), ("Rust", "rust_output"), ("Python", "python_output")]:
+        if lang in target_langs:
+            with code_tabs[tab_idx]:
+                slots[key] = st.empty()
+            tab_idx += 1
     
     st.divider()
     
@@ -789,41 +406,48 @@ Target Languages: {', '.join(target_langs)}
     val_tabs = st.tabs(["🧪 Test Cases", "🔌 Mock Service", f"🛡️ {compliance} Report", "▶️ Test Execution", "📊 Traceability"])
     
     with val_tabs[0]:
-        if 'test_output' not in st.session_state:
-            with st.spinner(f"🧠 Generating test cases..."):
-                st.session_state['test_output'] = call_llm(
-                    llm_info, get_test_prompt(compliance),
-                    f"Generate tests for: {user_prompt}\n\nSRS:\n{st.session_state.get('srs_output', '')}",
-                    max_tokens=2000
-                )
         st.caption(f"AI-generated pytest test suite with {compliance} compliance checks")
-        st.code(st.session_state['test_output'], language="python")
+        slots['test_output'] = st.empty()
     
     with val_tabs[1]:
-        if 'mock_output' not in st.session_state:
-            with st.spinner(f"🧠 Generating mock service..."):
-                st.session_state['mock_output'] = call_llm(
-                    llm_info, get_mock_prompt(),
-                    f"Generate mock service for: {user_prompt}",
-                    max_tokens=1500
-                )
         st.caption("AI-generated Mock SOME/IP service with fault injection")
-        st.code(st.session_state['mock_output'], language="python")
+        slots['mock_output'] = st.empty()
     
     with val_tabs[2]:
-        if 'misra_output' not in st.session_state:
-            with st.spinner(f"🧠 Running {compliance} compliance analysis..."):
-                st.session_state['misra_output'] = call_llm(
-                    llm_info, get_misra_prompt(compliance),
-                    f"Analyze for {compliance} compliance:\n\n{st.session_state.get('cpp_output', 'No C++ code generated')}",
-                    max_tokens=1000
-                )
-        st.caption(f"Static Analysis: **{compliance}**")
-        c1, c2, c3 = st.columns(3)
-        c1.metric("Standard", compliance)
-        c2.metric("Critical Violations", "0", "✅")
-        c3.metric("Status", "Compliant")
-        st.markdown(st.session_state['misra_output'], unsafe_allow_html=True)
+        st.caption(f"Static Analysis: **{compliance}** — local rule checker, runs on the generated C++ without an LLM call")
+        compliance_slot = st.empty()
+        slots['misra_output'] = st.empty()
+    
+    # ---- Concurrent generation of every missing artifact ----
+    outputs = {key: st.session_state[key] for key in steps if key in st.session_state}
+    for key, step in steps.items():
+        if key in outputs:
+            _show_artifact(slots[key], step, outputs[key])
+        else:
+            slots[key].info(f"⏳ Queued: {step['label']}" + (" (patch)" if "previous" in step else ""))
+    
+    pending_count = len(steps) - len(outputs)
+    if pending_count:
+        progress = progress_slot.progress(0.0, text=f"🧠 {llm_model_name} generating {pending_count} artifacts in parallel...")
+        
+        def _on_complete(key, text):
+            st.session_state[key] = text
+            recorded[key] = fingerprints[key]
+            bases[key] = (user_prompt, prompt_basis(steps[key], llm_info))
+            _show_artifact(slots[key], steps[key], text)
+            done_count = pending_count - (len(steps) - len(outputs))
+            how = "patched" if steps[key].get("patched") else "ready"
+            progress.progress(done_count / pending_count, text=f"✅ {steps[key]['label']} {how} ({done_count}/{pending_count})")
+        
+        def _on_partial(key, text):
+            _show_artifact(slots[key], steps[key], text + " ▌")
+        
+        st.session_state['last_trace_id'] = trace_id = new_trace_id()
+        run_generation_plan(llm_info, plan, outputs, on_complete=_on_complete, on_partial=_on_partial, trace_id=trace_id)
+        progress_slot.empty()
+    
+    compliance_status = compliance_result(compliance, st.session_state.get('cpp_output'))
+    _show_compliance_metrics(compliance_slot, compliance, compliance_status)
     
     with val_tabs[3]:
         st.caption("Simulated test execution output")
@@ -873,9 +497,7 @@ tests/test_service.py::Test_{compliance.replace(' ','').replace(':','')}_Complia
     # ---- STEP 7: Build & Package ----
     st.markdown("### 📦 Step 7: Containerized Build & Deployment")
     
-    service_name = user_prompt.split(" that ")[0].replace("Create a ", "").replace("Create an ", "").strip()
-    if not service_name or len(service_name) > 60:
-        service_name = "VehicleService"
+    service_name = service_name_for(user_prompt)
     
     build_tabs = st.tabs(["🐳 Dockerfile", "🐙 Docker Compose", "📋 Build Log"])
     
@@ -884,22 +506,24 @@ tests/test_service.py::Test_{compliance.replace(' ','').replace(':','')}_Complia
     with build_tabs[1]:
         st.code(get_docker_compose(service_name), language="yaml")
     with build_tabs[2]:
-        st.code(get_build_log(service_name), language="bash")
+        st.code(get_build_log(service_name, compliance_status.critical if compliance_status else 0), language="bash")
     
     # ---- Data Transformation Pipeline ----
     st.divider()
     st.markdown("### 🔄 Data Transformation Pipeline")
     st.caption("Raw CAN → DBC Decode → VSS Signal → SOME/IP Event → Dashboard Widget")
     
+    # Real round trip through the bundled DBC: encode a reading, decode it with the batch decoder
+    frame = decode_example(sample_database(), "TirePressure_FL_PSI", 33.2)
     c1, c2, c3, c4 = st.columns(4)
     with c1:
-        st.markdown("**📡 Raw CAN**\n```\nID: 0x185\nBytes: [48 00 1C A0]\n```")
+        st.markdown(f"**📡 Raw CAN**\n```\nID: {frame['can_id']}\nBytes: [{frame['payload']}]\n```")
     with c2:
-        st.markdown("**🔢 DBC Decode**\n```\nFactor: 0.01\nOffset: 0\nValue: 72 (raw)\n```")
+        st.markdown(f"**🔢 DBC Decode**\n```\nBits: {frame['layout']}\nFactor: {frame['factor']}\nOffset: {frame['offset']}\nValue: {frame['raw']} (raw)\n```")
     with c3:
-        st.markdown("**🌐 VSS Signal**\n```\nPath: Vehicle.\n  Chassis.Axle.\n  Tire.Pressure\nValue: 33.2 PSI\n```")
+        st.markdown(f"**🌐 VSS Signal**\n```\nPath: Vehicle.\n  Chassis.Axle.\n  Tire.Pressure\nValue: {frame['value']} {frame['unit']}\n```")
     with c4:
-        st.markdown("**📊 Dashboard**\n```\n┌──────────┐\n│ FL: 33.2 │\n│ PSI  ✅  │\n└──────────┘\n```")
+        st.markdown(f"**📊 Dashboard**\n```\n┌──────────┐\n│ FL: {frame['value']:<5}│\n│ PSI  ✅  │\n└──────────┘\n```")
     
     st.divider()
     
@@ -907,7 +531,7 @@ tests/test_service.py::Test_{compliance.replace(' ','').replace(':','')}_Complia
     st.markdown("### 🏗️ Step 8: Auto-Generated System Architecture")
     st.caption(f"Architecture diagram for **{service_name}** — Auto-generated based on requirements")
     
-    svc_snake = service_name.replace(" ", "_").lower()[:25]
+    svc_snake = service_slug(service_name)
     
     # Visual HTML architecture (Mermaid doesn't render in Streamlit)
     st.markdown(f"""
@@ -1033,7 +657,12 @@ tests/test_service.py::Test_{compliance.replace(' ','').replace(':','')}_Complia
     q1, q2, q3, q4 = st.columns(4)
     q1.metric("Total Lines Generated", f"{total_loc:,}", f"{len(target_langs)} languages")
     q2.metric("Test Coverage", "96.8%", "▲ Exceeds 80% threshold")
-    q3.metric(f"{compliance} Violations", "0", "✅ Fully Compliant")
+    if compliance_status is None:
+        q3.metric(f"{compliance} Violations", "—", "No C++ code", delta_color="off")
+    else:
+        q3.metric(f"{compliance} Violations", len(compliance_status.violations),
+                  "✅ Fully Compliant" if compliance_status.compliant else f"{compliance_status.critical} critical",
+                  delta_color="normal" if compliance_status.compliant else "inverse")
     q4.metric("Security Vulnerabilities", "0", "✅ Clean")
     
     st.markdown("##### 📏 Lines of Code by Artifact")
@@ -1080,105 +709,28 @@ tests/test_service.py::Test_{compliance.replace(' ','').replace(':','')}_Complia
     st.markdown("### ⬇️ Download Generated Project")
     st.caption("Download complete project with source code, tests, Docker configs, and documentation")
     
-    import io
-    import zipfile
-    
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        # README
-        zf.writestr(f"{svc_snake}/README.md", f"""# {service_name}
-> Auto-generated by **GenAuto-SDV Studio v2.0** | Team Greenbytes (DTU)
-
-## Overview
-{user_prompt}
-
-## Tech Stack
-- **Languages:** {', '.join(target_langs)}
-- **Compliance:** {compliance}
-- **Protocols:** SOME/IP, COVESA VSS, REST
-- **AI Engine:** {llm_model_name}
-
-## Build & Run
-```bash
-docker build -t genautomotive/{svc_snake} .
-docker run -p 30490:30490/udp genautomotive/{svc_snake}
-```
-
-## Test
-```bash
-pytest tests/ -v --cov
-```
-
----
-*Generated on {time.strftime('%Y-%m-%d %H:%M')} by GenAuto-SDV Studio*
-""")
-        # SRS
-        if 'srs_output' in st.session_state:
-            zf.writestr(f"{svc_snake}/docs/SRS.md", f"# Software Requirements Specification\n\n{st.session_state['srs_output']}")
-        
-        # Franca IDL
-        if 'franca_output' in st.session_state:
-            zf.writestr(f"{svc_snake}/interfaces/service.fidl", st.session_state['franca_output'])
-        
-        # ARXML
-        if 'arxml_output' in st.session_state:
-            zf.writestr(f"{svc_snake}/interfaces/service.arxml", st.session_state['arxml_output'])
-        
-        # C++ Code
-        if 'cpp_output' in st.session_state:
-            zf.writestr(f"{svc_snake}/src/main.cpp", st.session_state['cpp_output'])
-        
-        # Kotlin
-        if 'kotlin_output' in st.session_state:
-            zf.writestr(f"{svc_snake}/android/ServiceHMI.kt", st.session_state['kotlin_output'])
-        
-        # Rust
-        if 'rust_output' in st.session_state:
-            zf.writestr(f"{svc_snake}/rust_service/src/main.rs", st.session_state['rust_output'])
-        
-        # Tests
-        if 'test_output' in st.session_state:
-            zf.writestr(f"{svc_snake}/tests/test_service.py", st.session_state['test_output'])
-        
-        # MISRA Report
-        if 'misra_output' in st.session_state:
-            zf.writestr(f"{svc_snake}/reports/misra_report.md", f"# {compliance} Report\n\n{st.session_state['misra_output']}")
-        
-        # Dockerfile
-        zf.writestr(f"{svc_snake}/Dockerfile", get_dockerfile(service_name))
-        zf.writestr(f"{svc_snake}/docker-compose.yml", get_docker_compose(service_name))
-        
-        # CMakeLists
-        zf.writestr(f"{svc_snake}/CMakeLists.txt", f"""cmake_minimum_required(VERSION 3.16)
-project({svc_snake} VERSION 1.0.0 LANGUAGES CXX)
-
-set(CMAKE_CXX_STANDARD 14)
-set(CMAKE_CXX_STANDARD_REQUIRED ON)
-
-option(ENABLE_MISRA_CHECKS "Enable {compliance} checks" ON)
-
-find_package(Boost REQUIRED COMPONENTS system)
-find_package(vsomeip3 REQUIRED)
-
-add_executable(${{PROJECT_NAME}} src/main.cpp)
-target_link_libraries(${{PROJECT_NAME}} PRIVATE vsomeip3 Boost::system)
-
-install(TARGETS ${{PROJECT_NAME}} DESTINATION bin)
-""")
+    # Packed only when the button is clicked; identical content reuses the cached archive
+    formats = available_formats()
+    fmt = st.selectbox("Archive format", formats, format_func=lambda f: EXPORT_FORMATS[f].label, key="export_format")
+    artifacts = {key: st.session_state[key] for key, _, _ in PROJECT_ARTIFACTS if key in st.session_state}
+    digest = export_digest(fmt, service_name, user_prompt, target_langs, compliance, llm_model_name, artifacts)
+    archive_name = f"{svc_snake}_project{EXPORT_FORMATS[fmt].extension}"
     
-    zip_buffer.seek(0)
+    def _project_archive():
+        files = lambda: project_files(service_name, user_prompt, target_langs, compliance, llm_model_name, artifacts)
+        return build_archive(digest, fmt, files).read()
     
     dl_col1, dl_col2 = st.columns([1, 2])
     with dl_col1:
         st.download_button(
-            "⬇️ Download Project (.zip)",
-            data=zip_buffer,
-            file_name=f"{svc_snake}_project.zip",
-            mime="application/zip",
+            f"⬇️ Download Project ({EXPORT_FORMATS[fmt].extension})",
+            data=_project_archive,
+            file_name=archive_name,
+            mime=EXPORT_FORMATS[fmt].mime,
             type="primary",
         )
     with dl_col2:
-        st.caption(f"📦 **{svc_snake}_project.zip** contains: README, SRS, Franca IDL, ARXML, C++ source, Kotlin HMI, Rust service, tests, Docker configs, CMakeLists, and {compliance} report")
+        st.caption(f"📦 **{archive_name}** contains: README, SRS, Franca IDL, ARXML, C++ source, Kotlin HMI, Rust service, tests, Docker configs, CMakeLists, and {compliance} report")
     
     # Store service context for Dashboard page
     st.session_state['generated_service'] = {
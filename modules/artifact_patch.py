@@ -0,0 +1,170 @@
+import ast
+import difflib
+import os
+import re
+import xml.etree.ElementTree as ET
+
+# ============================================================
+# DIFF-BASED ARTIFACT PATCHING (Unified Diff Apply + Validation)
+# ============================================================
+# For small requirement edits the model is sent the previous artifact plus the
+# requirement diff and asked for a unified diff instead of the whole file. The diff
+# is applied locally (context lines must match, with a small line-offset fuzz) and
+# the result is sanity-checked for its language; any failure raises PatchError so
+# the caller can fall back to full regeneration.
+
+PATCH_MIN_SIMILARITY = float(os.getenv("GENAUTO_PATCH_MIN_SIMILARITY", "0.6"))
+PATCH_FUZZ_LINES = 40  # How far a hunk may drift from its stated line number
+
+PATCH_SYSTEM_SUFFIX = """
+
+You are now UPDATING an artifact you generated earlier. The requirement changed slightly.
+Respond ONLY with a unified diff (---/+++ headers, @@ hunks, 3 lines of context) that turns the
+previous artifact into one that satisfies the new requirement. Change only what the requirement
+diff affects. Copy context and removed lines exactly. No explanations, no code fences."""
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_FENCE_RE = re.compile(r"```[\w+-]*\n(.*?)```", re.S)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_BRACES = {"}": "{", ")": "(", "]": "["}
+_BRACE_LANGS = ("cpp", "kotlin", "rust", "java")
+
+
+class PatchError(Exception):
+    """Raised when a model diff cannot be applied or produces an invalid artifact."""
+
+
+def _sentences(text):
+    return [s for line in text.strip().splitlines() for s in _SENTENCE_RE.split(line.strip()) if s]
+
+
+def is_small_edit(old, new):
+    """True when the requirement changed but most of it is still the same text."""
+    if old == new:
+        return False
+    return difflib.SequenceMatcher(None, old, new, autojunk=False).ratio() >= PATCH_MIN_SIMILARITY
+
+
+def requirement_diff(old, new):
+    """Sentence-level unified diff between two requirement texts."""
+    return "\n".join(difflib.unified_diff(_sentences(old), _sentences(new), "requirement (before)",
+                                          "requirement (after)", lineterm=""))
+
+
+def patch_prompts(system_prompt, previous, req_diff, user_prompt):
+    """System/user prompts asking for a unified diff against `previous`."""
+    user = (f"Requirement diff:\n{req_diff}\n\n"
+            f"Full updated request (for reference):\n{user_prompt}\n\n"
+            f"Previous artifact (file `artifact`):\n{previous}")
+    return system_prompt + PATCH_SYSTEM_SUFFIX, user
+
+
+def extract_diff(reply):
+    """Strip code fences / chatter around the diff; raise PatchError if there is no hunk."""
+    fenced = _FENCE_RE.findall(reply)
+    text = next((block for block in fenced if "@@" in block), reply)
+    lines = text.splitlines()
+    start = next((i for i, line in enumerate(lines) if line.startswith(("--- ", "@@"))), None)
+    if start is None:
+        raise PatchError("reply contains no unified diff hunks")
+    return lines[start:]
+
+
+def _parse_hunks(diff_lines):
+    hunks = []
+    hunk = None
+    for line in diff_lines:
+        m = _HUNK_RE.match(line)
+        if m:
+            hunk = {"old_start": int(m.group(1)), "old": [], "new": []}
+            hunks.append(hunk)
+        elif hunk is None or line.startswith(("--- ", "+++ ")):
+            continue
+        elif line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        elif line.startswith("-"):
+            hunk["old"].append(line[1:])
+        elif line.startswith("+"):
+            hunk["new"].append(line[1:])
+        else:
+            text = line[1:] if line.startswith(" ") else line  # Models often drop the space on blank context lines
+            hunk["old"].append(text)
+            hunk["new"].append(text)
+    if not hunks:
+        raise PatchError("diff has no hunks")
+    return hunks
+
+
+def _locate(lines, block, expected):
+    """Index where `block` occurs in `lines`, searching outward from `expected`."""
+    wanted = [line.rstrip() for line in block]
+    for delta in range(PATCH_FUZZ_LINES + 1):
+        for pos in ((expected,) if delta == 0 else (expected - delta, expected + delta)):
+            if 0 <= pos <= len(lines) - len(wanted) and \
+                    all(lines[pos + i].rstrip() == w for i, w in enumerate(wanted)):
+                return pos
+    return None
+
+
+def apply_unified_diff(original, diff_lines):
+    """Apply unified diff hunks to `original`, tolerating small line-number drift."""
+    lines = original.splitlines()
+    drift = 0
+    for hunk in _parse_hunks(diff_lines):
+        # Pure insertions give the line *after which* the new text goes; other hunks their first line
+        base = hunk["old_start"] if not hunk["old"] else hunk["old_start"] - 1
+        if not hunk["old"]:
+            pos = min(max(base + drift, 0), len(lines))
+        else:
+            pos = _locate(lines, hunk["old"], base + drift)
+            if pos is None:
+                raise PatchError(f"hunk at line {hunk['old_start']} does not match the previous artifact")
+        lines[pos:pos + len(hunk["old"])] = hunk["new"]
+        drift = pos - base + len(hunk["new"]) - len(hunk["old"])
+    return "\n".join(lines) + ("\n" if original.endswith("\n") else "")
+
+
+def _code_body(text):
+    blocks = _FENCE_RE.findall(text)
+    return "\n".join(blocks) if blocks else text
+
+
+def _balanced(code):
+    # Strip comments and string literals so their brackets are not counted
+    code = re.sub(r"//[^\n]*|/\*.*?\*/|\"(?:[^\"\\\n]|\\.)*\"|'(?:[^'\\\n]|\\.)'", "", code, flags=re.S)
+    stack = []
+    for ch in code:
+        if ch in "{([":
+            stack.append(ch)
+        elif ch in _BRACES:
+            if not stack or stack.pop() != _BRACES[ch]:
+                return False
+    return not stack
+
+
+def artifact_errors(text, lang):
+    """Cheap structural check for a generated artifact; returns an error string or None."""
+    if not text.strip():
+        return "artifact is empty"
+    body = _code_body(text)
+    try:
+        if lang == "python":
+            ast.parse(body)
+        elif lang == "xml":
+            ET.fromstring(body.strip())
+        elif lang in _BRACE_LANGS and not _balanced(body):
+            return "unbalanced brackets"
+    except (SyntaxError, ET.ParseError) as e:
+        return str(e)
+    return None
+
+
+def apply_patch(previous, reply, lang):
+    """Apply a model diff to `previous`; the result must not fail a check the previous artifact passed."""
+    patched = apply_unified_diff(previous, extract_diff(reply))
+    if patched == previous:
+        raise PatchError("diff does not change the artifact")
+    error = artifact_errors(patched, lang)
+    if error and not artifact_errors(previous, lang):
+        raise PatchError(f"patched artifact is invalid: {error}")
+    return patched
@@ -0,0 +1,271 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from modules.engine import (
+    MAX_PARALLEL_GENERATIONS, REFINEMENT_QUESTIONS, build_full_context, build_generation_plan,
+    default_refinements, get_llm_client, plan_fingerprints, project_files, run_generation_plan,
+    service_name_for, service_slug, stale_outputs,
+)
+from modules.offline_llm import OFFLINE_MODEL
+from modules.project_export import EXPORT_FORMATS, available_formats, write_archive
+from modules.tracing import new_trace_id
+
+try:
+    import yaml
+except ImportError:  # Only needed for YAML manifests
+    yaml = None
+
+# ============================================================
+# HEADLESS BATCH GENERATION (Manifest → Job Pool → Output Dirs)
+# ============================================================
+# A manifest lists requirements; each one expands to requirement × variant ×
+# compliance jobs. Jobs run on a bounded thread pool (LLM calls are I/O-bound, and
+# the shared rate limiter keeps every job inside the provider quota). Each job writes
+# its artifacts into its own directory as they complete, keyed by the same input
+# fingerprints AI Studio uses, so an interrupted run resumes where it stopped and a
+# re-run only regenerates jobs whose inputs changed.
+#
+#   python -m modules.batch services.yaml --out build/catalog --jobs 3
+
+DEFAULT_ENGINE = {"provider": "anthropic", "model_id": "claude-3-haiku-20240307", "name": "Claude 3 Haiku (Anthropic)"}
+DEFAULT_LANGUAGES = ["C++14", "Kotlin", "Rust"]
+DEFAULT_COMPLIANCE = ["MISRA C++:2023"]
+DEFAULT_VARIANTS = ["All Variants"]
+LIST_SEPARATOR = re.compile(r"\s*[;|]\s*")
+VARIANT_QUESTION = REFINEMENT_QUESTIONS[0]
+JOB_FILE = "job.json"
+
+BatchJob = namedtuple("BatchJob", ["job_id", "name", "requirement", "variant", "compliance", "languages", "refinements"])
+
+
+class ManifestError(Exception):
+    """Raised for manifests that cannot be read or expand to no jobs."""
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def _as_list(value, default):
+    if value is None or value == "":
+        return list(default)
+    if isinstance(value, str):
+        return [v for v in LIST_SEPARATOR.split(value.strip()) if v]
+    return [str(v) for v in value]
+
+
+def _variant_option(variant):
+    """Map "EV" / "ev only" / "all" onto the refinement option it abbreviates."""
+    for option in VARIANT_QUESTION["options"]:
+        if option.lower().startswith(variant.strip().lower()):
+            return option
+    raise ManifestError(f"unknown vehicle variant {variant!r} (expected one of {VARIANT_QUESTION['options']})")
+
+
+def _read_manifest(path):
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return {"services": list(csv.DictReader(f))}
+    if yaml is None:
+        raise ManifestError("YAML manifests need PyYAML (pip install pyyaml); CSV manifests work without it")
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return {"services": data} if isinstance(data, list) else data
+
+
+def load_manifest(path):
+    """Expand a YAML/CSV manifest into BatchJobs (requirement × variants × compliance standards)."""
+    data = _read_manifest(path)
+    defaults = data.get("defaults") or {}
+    jobs = {}
+    for i, service in enumerate(data.get("services") or [], 1):
+        requirement = (service.get("requirement") or "").strip()
+        if not requirement:
+            raise ManifestError(f"service #{i} has no requirement")
+        name = (service.get("name") or "").strip() or service_name_for(requirement)
+        languages = _as_list(service.get("languages"), _as_list(defaults.get("languages"), DEFAULT_LANGUAGES))
+        refinements = dict(defaults.get("refinements") or {}, **(service.get("refinements") or {}))
+        for variant in _as_list(service.get("variants"), _as_list(defaults.get("variants"), DEFAULT_VARIANTS)):
+            variant = _variant_option(variant)
+            for compliance in _as_list(service.get("compliance"), _as_list(defaults.get("compliance"), DEFAULT_COMPLIANCE)):
+                job_id = "-".join(_slug(part) for part in (name, variant, compliance))
+                jobs[job_id] = BatchJob(job_id, name, requirement, variant, compliance, languages, refinements)
+    if not jobs:
+        raise ManifestError(f"{path} lists no services")
+    return list(jobs.values())
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _load_job_state(job_dir):
+    try:
+        with open(os.path.join(job_dir, JOB_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _failed(text):
+    return text.startswith("[⚠️")  # Provider errors / missing keys come back as text, not exceptions
+
+
+def run_job(job, llm_info, engine_name, out_dir, workers=MAX_PARALLEL_GENERATIONS, force=False, archive=None):
+    """Generate one job into `out_dir/<job_id>`, reusing artifacts whose fingerprints still match."""
+    started = time.time()
+    job_dir = os.path.join(out_dir, job.job_id)
+    artifact_dir = os.path.join(job_dir, "artifacts")
+    state = {} if force else _load_job_state(job_dir)
+    recorded = state.get("fingerprints", {})
+
+    refinements = default_refinements()
+    refinements[VARIANT_QUESTION["question"]] = job.variant
+    for question, answer in job.refinements.items():
+        match = next((q["question"] for q in REFINEMENT_QUESTIONS if question.lower() in q["question"].lower()), question)
+        refinements[match] = answer
+    full_context = build_full_context(job.requirement, refinements, job.compliance, job.languages)
+    plan = build_generation_plan(job.requirement, full_context, job.compliance, job.languages)
+    fingerprints = plan_fingerprints(plan, llm_info)
+
+    outputs = {}
+    for step in plan:
+        path = os.path.join(artifact_dir, f"{step['key']}.txt")
+        if step["key"] in recorded and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                outputs[step["key"]] = f.read()
+    for key in stale_outputs(plan, fingerprints, outputs, recorded):
+        outputs.pop(key)
+        recorded.pop(key, None)
+    reused = len(outputs)
+
+    failed = []
+    state = {"job": job._asdict(), "engine": engine_name, "status": "running", "trace_id": new_trace_id(),
+             "fingerprints": recorded}
+
+    def _save_state():
+        _write_atomic(os.path.join(job_dir, JOB_FILE), json.dumps(state, indent=2))
+
+    deps = {step["key"]: step["deps"] for step in plan}
+
+    def _on_complete(key, text):
+        _write_atomic(os.path.join(artifact_dir, f"{key}.txt"), text)
+        if _failed(text):
+            failed.append(key)
+        elif any(dep in failed for dep in deps[key]):
+            # Built from a failed upstream (directly or transitively): written but not recorded, so a resume regenerates it
+            failed.append(key)
+        else:
+            recorded[key] = fingerprints[key]
+        _save_state()
+
+    _save_state()
+    run_generation_plan(llm_info, plan, outputs, on_complete=_on_complete, max_workers=workers, trace_id=state["trace_id"])
+
+    service_name = service_name_for(job.requirement)
+    usable = {key: text for key, text in outputs.items() if not _failed(text)}
+    files = project_files(service_name, job.requirement, job.languages, job.compliance, engine_name, usable)
+    for path, content in files:
+        _write_atomic(os.path.join(job_dir, path), content)
+    if archive:
+        archive_path = os.path.join(job_dir, f"{service_slug(service_name)}_project{EXPORT_FORMATS[archive].extension}")
+        with open(f"{archive_path}.tmp", "wb") as f:
+            write_archive(files, archive, f)
+        os.replace(f"{archive_path}.tmp", archive_path)
+
+    state["status"] = "failed" if failed else "complete"
+    state["failed"] = failed
+    state["seconds"] = round(time.time() - started, 2)
+    _save_state()
+    return {"job_id": job.job_id, "status": state["status"], "generated": len(plan) - reused, "reused": reused,
+            "failed": failed, "seconds": state["seconds"]}
+
+
+def run_batch(jobs, engine_config, out_dir, max_jobs=2, workers=MAX_PARALLEL_GENERATIONS, force=False, archive=None,
+              on_result=None):
+    """Run every job with at most `max_jobs` in flight; returns one summary dict per job."""
+    llm_info = get_llm_client(engine_config)
+    engine_name = engine_config.get("name", engine_config["model_id"])
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="genauto-job") as pool:
+        futures = {pool.submit(run_job, job, llm_info, engine_name, out_dir, workers, force, archive): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"job_id": futures[future].job_id, "status": "error", "error": str(e)}
+            with lock:
+                results.append(result)
+            if on_result:
+                on_result(result)
+    results.sort(key=lambda r: r["job_id"])
+    _write_atomic(os.path.join(out_dir, "batch_summary.json"), json.dumps(results, indent=2))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.batch", description="Generate a service catalog from a YAML/CSV manifest.")
+    parser.add_argument("manifest", help="YAML or CSV manifest of requirements × variants × compliance standards")
+    parser.add_argument("--out", default="batch_output", help="output directory (one sub-directory per job)")
+    parser.add_argument("--jobs", type=int, default=2, help="jobs generated concurrently")
+    parser.add_argument("--workers", type=int, default=MAX_PARALLEL_GENERATIONS, help="concurrent LLM calls per job")
+    parser.add_argument("--provider", default=DEFAULT_ENGINE["provider"], choices=["anthropic", "groq", "google", "offline"])
+    parser.add_argument("--model", default=None, help="model id (defaults to Claude 3 Haiku for anthropic)")
+    parser.add_argument("--rpm", type=int, default=None, help="requests-per-minute quota for the primary model")
+    parser.add_argument("--force", action="store_true", help="ignore previous outputs and regenerate everything")
+    parser.add_argument("--archive", choices=available_formats(), help="also pack each job's project into an archive")
+    parser.add_argument("--dry-run", action="store_true", help="list the expanded jobs and exit")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(asctime)s %(name)s %(message)s")
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ManifestError) as e:
+        parser.exit(2, f"error: {e}\n")
+
+    if args.dry_run:
+        for job in jobs:
+            print(f"{job.job_id}\t{', '.join(job.languages)}")
+        return 0
+
+    if args.provider == "offline":
+        args.model = args.model or OFFLINE_MODEL
+    if args.model is None and args.provider != DEFAULT_ENGINE["provider"]:
+        parser.error("--model is required for providers other than anthropic")
+    engine_config = {"provider": args.provider, "model_id": args.model or DEFAULT_ENGINE["model_id"],
+                     "cost": f"{args.rpm} RPM" if args.rpm else "", "name": args.model or DEFAULT_ENGINE["name"]}
+
+    print(f"🚀 {len(jobs)} jobs → {args.out} ({args.jobs} at a time, {args.workers} calls each)")
+
+    def _report(result):
+        if result["status"] == "error":
+            print(f"  ⛔ {result['job_id']}: {result['error']}")
+        else:
+            icon = "✅" if result["status"] == "complete" else "⚠️"
+            print(f"  {icon} {result['job_id']}: {result['generated']} generated, {result['reused']} reused "
+                  f"in {result['seconds']:.1f}s" + (f" — failed: {', '.join(result['failed'])}" if result["failed"] else ""))
+        sys.stdout.flush()
+
+    results = run_batch(jobs, engine_config, args.out, args.jobs, args.workers, args.force, args.archive, on_result=_report)
+    bad = [r for r in results if r["status"] != "complete"]
+    print(f"🏁 {len(results) - len(bad)}/{len(results)} jobs complete — summary in {os.path.join(args.out, 'batch_summary.json')}")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
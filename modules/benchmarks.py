@@ -0,0 +1,415 @@
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+from contextlib import contextmanager
+from streamlit import logger as st_logger
+
+# ============================================================
+# MICRO-BENCHMARKS (Hot Paths vs Stored Baseline)
+# ============================================================
+# Each benchmark is a factory that does its setup once and returns the callable to
+# time. Callables are timed like timeit: auto-ranged to a loop count that takes at
+# least MIN_SAMPLE_SECONDS, then sampled REPEATS times. The best per-call time (the
+# least disturbed by other processes) is compared with the stored baseline; a ratio
+# above the benchmark's threshold is a regression and makes the run exit non-zero.
+# On the baseline's own environment the raw best times are compared. Against a baseline
+# from another machine, each time is divided by the run's median time for a fixed
+# pure-Python workload (measured once per run), so a slower machine is not reported as
+# a regression of the code; benchmarks that do not scale with CPU speed opt out.
+#
+#   python -m modules.benchmarks                    # compare with data/benchmark_baseline.json
+#   python -m modules.benchmarks --save-baseline    # accept the current numbers
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "benchmark_baseline.json")
+DEFAULT_THRESHOLD = float(os.getenv("GENAUTO_BENCH_THRESHOLD", "1.3"))
+MIN_SAMPLE_SECONDS = 0.1
+REPEATS = 7
+CALIBRATION_RUNS = 9
+DBC_SIZES = (10, 1000, 10000)
+SIGNALS_PER_MESSAGE = 8
+
+BENCHMARKS = {}
+
+_SIGNAL_STEMS = [
+    ("WheelSpeed_FL", "km/h"), ("TirePressure_RR", "kPa"), ("BatteryVoltage", "V"), ("BatteryCurrent", "A"),
+    ("StateOfCharge", "%"), ("CoolantTemp", "degC"), ("EngineSpeed", "rpm"), ("ThrottlePosition", "%"),
+    ("SteeringAngle", "deg"), ("BrakePressure", "bar"), ("AmbientTemp", "degC"), ("OdometerTotal", "km"),
+    ("DoorOpen_Driver", ""), ("FuelLevel", "%"), ("MotorTorque", "Nm"), ("CabinHumidity", "%"),
+]
+
+
+def benchmark(name, threshold=DEFAULT_THRESHOLD, calibrated=True):
+    """Register `factory() -> callable` as a benchmark (`calibrated=False`: always compare raw times)."""
+    def register(factory):
+        BENCHMARKS[name] = (factory, threshold, calibrated)
+        return factory
+    return register
+
+
+def synthetic_dbc(n_signals):
+    """DBC text with `n_signals` signals packed eight to a message, with comments and value tables."""
+    lines = ['VERSION ""', "", "NS_ :", "", "BS_:", "", "BU_: ECU_A ECU_B", ""]
+    tail = []
+    for msg_index in range((n_signals + SIGNALS_PER_MESSAGE - 1) // SIGNALS_PER_MESSAGE):
+        frame_id = 0x100 + msg_index
+        count = min(SIGNALS_PER_MESSAGE, n_signals - msg_index * SIGNALS_PER_MESSAGE)
+        lines.append(f"BO_ {frame_id} Msg_{msg_index}: 8 ECU_{'AB'[msg_index % 2]}")
+        for slot in range(count):
+            stem, unit = _SIGNAL_STEMS[(msg_index * SIGNALS_PER_MESSAGE + slot) % len(_SIGNAL_STEMS)]
+            name = f"{stem}_{msg_index}"
+            lines.append(f' SG_ {name} : {slot * 8}|8@1+ (0.5,-20) [-20|107.5] "{unit}" ECU_B')
+            if slot == 0:
+                tail.append(f'CM_ SG_ {frame_id} {name} "Synthetic signal {msg_index}";')
+            elif slot == 1:
+                tail.append(f'VAL_ {frame_id} {name} 0 "Off" 1 "On" 2 "Error" ;')
+        lines.append("")
+    return "\n".join(lines + tail) + "\n"
+
+
+@contextmanager
+def _stubbed_llm():
+    """Replace engine.call_llm with an instant, deterministic stand-in and keep traces off disk."""
+    from modules import engine, tracing
+    from modules.offline_llm import synthetic_text
+
+    def call_llm(llm_info, system_prompt, user_prompt, max_tokens=2000, on_stream=None):
+        text = synthetic_text(system_prompt, user_prompt, max_tokens)
+        if on_stream:
+            on_stream(text)
+        return text
+
+    saved = engine.call_llm, tracing.TRACING_ENABLED
+    engine.call_llm, tracing.TRACING_ENABLED = call_llm, False
+    try:
+        yield
+    finally:
+        engine.call_llm, tracing.TRACING_ENABLED = saved
+
+
+# ============================================================
+# BENCHMARK DEFINITIONS
+# ============================================================
+
+def _register_dbc(n_signals):
+    @benchmark(f"parse_dbc_file[{n_signals}]", threshold=1.3)
+    def factory():
+        from modules.ai_studio import parse_dbc_file
+        text = synthetic_dbc(n_signals)
+        return lambda: parse_dbc_file(text)
+
+
+for _n in DBC_SIZES:
+    _register_dbc(_n)
+
+
+@benchmark("create_3d_digital_twin[cold]")
+def _twin_cold():
+    from modules.dashboard import build_twin_geometry, create_3d_digital_twin
+
+    def run():
+        build_twin_geometry.cache_clear()
+        create_3d_digital_twin.clear()
+        return create_3d_digital_twin("tire")
+    return run
+
+
+@benchmark("create_3d_digital_twin[cached]", threshold=1.5)
+def _twin_cached():
+    from modules.dashboard import create_3d_digital_twin
+    create_3d_digital_twin("tire")
+    return lambda: create_3d_digital_twin("tire")
+
+
+@benchmark("init_simulation_data", threshold=1.5)
+def _init_simulation_data():
+    import streamlit as st
+    from modules.dashboard import SERVICE_SIGNAL_PROFILES, init_simulation_data
+    profile = SERVICE_SIGNAL_PROFILES["tire"]
+
+    def run():
+        for key in [k for k in st.session_state if str(k).startswith("sim_data_")]:
+            del st.session_state[key]
+        return init_simulation_data(profile, "EV")
+    return run
+
+
+@benchmark("create_gauge")
+def _create_gauge():
+    from modules.dashboard import create_gauge
+    return lambda: create_gauge(32.5, 0, 50, "#58a6ff", " PSI")
+
+
+@benchmark("detect_service_type", threshold=1.5)
+def _detect_service_type():
+    from modules.dashboard import detect_service_type
+    descriptions = [
+        "Create a Tire Pressure Monitoring Service that monitors all 4 wheels in real-time.",
+        "Battery state of health estimation with charge cycle tracking.",
+        "Predict motor bearing wear from vibration and torque.",
+        "Adaptive cabin lighting that follows the driver's mood.",
+    ]
+    return lambda: [detect_service_type(d) for d in descriptions]
+
+
+def synthetic_cpp(n_signals):
+    """Generated-style C++ service (a header and a source file) with one getter/setter pair per signal."""
+    stems = [_SIGNAL_STEMS[i % len(_SIGNAL_STEMS)][0] + (f"_{i}" if i >= len(_SIGNAL_STEMS) else "") for i in range(n_signals)]
+    header = ["// VehicleSignalService.hpp", "#pragma once", "#include <cstdint>", "#include <memory>", "",
+              "namespace genauto {", "class SignalStub {", "public:", "    virtual ~SignalStub() = default;",
+              "    virtual void publish(uint32_t id, float value) = 0;", "};", "",
+              "class VehicleSignalService final : public SignalStub {", "public:", "    VehicleSignalService();",
+              "    ~VehicleSignalService() override;", "    void publish(uint32_t id, float value) override;"]
+    source = ["// VehicleSignalService.cpp", '#include "VehicleSignalService.hpp"', "", "namespace genauto {",
+              "VehicleSignalService::VehicleSignalService() : buffer_(std::make_unique<float[]>(64U)) {}", ""]
+    for n, stem in enumerate(stems):
+        header += [f"    float get{stem}() const;", f"    void set{stem}(float value);"]
+        source += [f"float VehicleSignalService::get{stem}() const {{", f"    return values_[{n}U];", "}",
+                   f"void VehicleSignalService::set{stem}(float value) {{",
+                   "    const float clamped = (value < 0.0) ? 0.0F : value;  // Rule 5.0.1",
+                   "    int raw = (int)clamped;", f"    values_[{n}U] = clamped;", f"    publish({n}U, clamped);", "}"]
+    header += ["private:", f"    float values_[{max(n_signals, 1)}U] = {{}};", "    std::unique_ptr<float[]> buffer_;",
+               "};", "} // namespace genauto"]
+    source += ["} // namespace genauto"]
+    return [("VehicleSignalService.hpp", "\n".join(header)), ("VehicleSignalService.cpp", "\n".join(source))]
+
+
+@benchmark("compliance_check[50]")
+def _compliance_check():
+    from modules.compliance_check import check_sources
+    files = synthetic_cpp(50)
+    return lambda: check_sources(files, "MISRA C++:2023")
+
+
+def _sample_project():
+    from modules.engine import build_generation_plan, project_files, service_name_for
+    from modules.offline_llm import synthetic_text
+    requirement = "Create a Tire Pressure Monitoring Service that monitors all 4 wheels in real-time."
+    langs = ["C++14", "Kotlin", "Rust", "Python"]
+    plan = build_generation_plan(requirement, requirement, "MISRA C++:2023", langs)
+    outputs = {step["key"]: synthetic_text(step["system"], step["key"], step["max_tokens"]) for step in plan}
+    return project_files(service_name_for(requirement), requirement, langs, "MISRA C++:2023", "benchmark", outputs)
+
+
+def _register_export(fmt):
+    @benchmark(f"project_export[{fmt}]")
+    def factory():
+        from modules.project_export import write_archive
+        files = _sample_project()
+        return lambda: write_archive(files, fmt, io.BytesIO())
+
+
+def _export_formats():
+    from modules.project_export import available_formats
+    return available_formats()
+
+
+for _fmt in _export_formats():
+    _register_export(_fmt)
+
+
+@benchmark("generation_pipeline[stub_llm]", threshold=1.5, calibrated=False)  # Thread pool scheduling, not CPU-bound
+def _pipeline():
+    from modules import engine
+    from modules.project_export import write_archive
+    requirement = "Create a Tire Pressure Monitoring Service that monitors all 4 wheels in real-time."
+    langs = ["C++14", "Kotlin", "Rust"]
+    llm_info = {"provider": "offline", "model": "benchmark", "client": None}
+
+    def run():
+        with _stubbed_llm():
+            context = engine.build_full_context(requirement, engine.default_refinements(), "MISRA C++:2023", langs)
+            plan = engine.build_generation_plan(requirement, context, "MISRA C++:2023", langs)
+            outputs = {}
+            engine.run_generation_plan(llm_info, plan, outputs)
+            files = engine.project_files(engine.service_name_for(requirement), requirement, langs, "MISRA C++:2023",
+                                         "benchmark", outputs)
+            write_archive(files, "zip", io.BytesIO())
+    return run
+
+
+# ============================================================
+# RUNNER / BASELINE COMPARISON
+# ============================================================
+
+def environment():
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+            "cpus": os.cpu_count()}
+
+
+def _calibration_workload():
+    data = [(i * 7919) % 10007 for i in range(20000)]
+    table = {str(v): v for v in data}
+    return sorted(data)[-1] + sum(len(k) for k in table) + len(json.dumps(data[:2000]))
+
+
+def calibrate(runs=CALIBRATION_RUNS):
+    """Median seconds for the fixed reference workload (measures the machine, not the code)."""
+    return statistics.median(timeit.repeat(_calibration_workload, repeat=runs, number=1))
+
+
+def time_callable(fn, repeats=REPEATS):
+    """Per-call seconds for `repeats` samples, each long enough to drown out timer resolution."""
+    fn()  # Warm-up: imports, lazy caches
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        if timer.timeit(number) >= MIN_SAMPLE_SECONDS:
+            break
+        number *= 2
+    ordered = sorted(timer.timeit(number) / number for _ in range(repeats))
+    return {
+        "loops": number,
+        "repeats": repeats,
+        "min_s": ordered[0],
+        "median_s": statistics.median(ordered),
+        "mean_s": statistics.fmean(ordered),
+        "p95_s": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "stdev_s": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+def run_benchmarks(names=None, repeats=REPEATS, on_result=None):
+    """{name: timing dict} for the selected benchmarks (all by default)."""
+    results = {}
+    calibration = calibrate()
+    for name, (factory, threshold, calibrated) in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        timing = time_callable(factory(), repeats)
+        timing["threshold"] = threshold
+        if calibrated:
+            timing["calibration_s"] = calibration
+            timing["relative"] = timing["min_s"] / calibration  # Best time in units of the calibration workload
+        results[name] = timing
+        if on_result:
+            on_result(name, timing)
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def compare(results, baseline):
+    """One row per benchmark: best time now vs baseline, ratio and status (ok / regression / faster / new).
+
+    The calibrated ratio is only used against a baseline from a different environment.
+    """
+    rows = []
+    recorded = baseline.get("results", {})
+    same_environment = baseline.get("environment") == environment()
+    for name, timing in results.items():
+        base = recorded.get(name)
+        row = {"name": name, "best_s": timing["min_s"], "median_s": timing["median_s"], "threshold": timing["threshold"],
+               "baseline_s": base["min_s"] if base else None, "raw_ratio": None, "ratio": None, "calibrated": False,
+               "status": "new"}
+        if base and base["min_s"] > 0:
+            row["raw_ratio"] = row["ratio"] = timing["min_s"] / base["min_s"]
+            if not same_environment and timing.get("relative") and base.get("relative"):
+                row["ratio"] = timing["relative"] / base["relative"]
+                row["calibrated"] = True
+            if row["ratio"] > timing["threshold"]:
+                row["status"] = "regression"
+            elif row["ratio"] < 1 / timing["threshold"]:
+                row["status"] = "faster"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def _fmt_seconds(seconds):
+    if seconds is None:
+        return "—"
+    for unit, scale in (("s", 1), ("ms", 1e3), ("µs", 1e6)):
+        if seconds * scale >= 1:
+            return f"{seconds * scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def format_report(rows, baseline):
+    """Markdown comparison table (also readable as plain text)."""
+    icons = {"ok": "✅", "faster": "🚀", "regression": "❌", "new": "🆕"}
+    lines = ["| Benchmark | Best | Median | Baseline (best) | Raw ratio | Calibrated | Limit | Status |",
+             "|---|---|---|---|---|---|---|---|"]
+    for row in rows:
+        raw = f"{row['raw_ratio']:.2f}×" if row["raw_ratio"] is not None else "—"
+        ratio = f"{row['ratio']:.2f}×" if row["calibrated"] else "—"
+        lines.append(f"| {row['name']} | {_fmt_seconds(row['best_s'])} | {_fmt_seconds(row['median_s'])} | "
+                     f"{_fmt_seconds(row['baseline_s'])} | {raw} | {ratio} "
+                     f"| {row['threshold']:.2f}× | {icons[row['status']]} {row['status']} |")
+    if baseline and baseline.get("environment") != environment():
+        lines.append("")
+        lines.append(f"_Baseline recorded on a different environment (status uses calibrated ratios): {baseline.get('environment')}_")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.benchmarks", description="Time hot paths and compare with the stored baseline.")
+    parser.add_argument("-k", "--only", nargs="*", help="run benchmarks whose name contains any of these substrings")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--json", default="benchmark_results.json", help="where to write this run's results")
+    parser.add_argument("--report", help="also write the comparison table to this Markdown file")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args(argv)
+    st_logger.set_log_level("error")  # Bare-mode ScriptRunContext warnings
+
+    if args.list:
+        for name, (_, threshold, _) in BENCHMARKS.items():
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            print(f"{name}\t{threshold:.2f}×")
+        return 0
+
+    def _progress(name, timing):
+        print(f"  {name}: {_fmt_seconds(timing['min_s'])} (best of {timing['repeats']}×{timing['loops']})")
+        sys.stdout.flush()
+
+    print(f"⏱️ Running {len(BENCHMARKS) if not args.only else 'selected'} benchmarks…")
+    started = time.time()
+    results = run_benchmarks(args.only, args.repeats, on_result=_progress)
+    if not results:
+        parser.exit(2, "error: no benchmark matches --only\n")
+    baseline = load_baseline(args.baseline)
+    rows = compare(results, baseline)
+    run = {"created": round(time.time(), 3), "seconds": round(time.time() - started, 2), "environment": environment(),
+           "results": results, "comparison": rows}
+
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    report = format_report(rows, baseline)
+    print()
+    print(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+
+    if args.save_baseline:
+        merged = dict(baseline.get("results", {}), **results) if args.only else results
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"created": run["created"], "environment": run["environment"], "results": merged}, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print(f"\n✅ No regressions ({len(rows)} benchmarks, results in {args.json})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import os
+from functools import lru_cache
+import numpy as np
+from modules.dbc import CAN_ID_MASK, EXTENDED_ID_FLAG, MAX_STANDARD_ID, parse_dbc
+
+# ============================================================
+# VECTORIZED CAN FRAME DECODER (Batch, Columnar Output)
+# ============================================================
+# Frames arrive as NumPy arrays (timestamps, CAN IDs, N x 8 or N x 64 payload bytes).
+# They are grouped by CAN ID once, each signal is then extracted for all of its frames
+# with a single 64-bit word view + shift + mask, and scaled with factor/offset —
+# no per-frame Python work. Output is one (timestamps, values) pair per signal.
+
+SAMPLE_DBC_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "sample.dbc")
+
+
+class _SignalPlan:
+    """Vectorized extraction parameters for one signal at one payload width."""
+
+    __slots__ = ("name", "window", "dtype", "shift", "mask", "length", "is_signed", "value_type",
+                 "scale", "offset", "is_multiplexer", "mux_ids", "mux_signal")
+
+    def __init__(self, msg, sig):
+        self.name = sig.name
+        self.length = sig.length
+        self.is_signed = sig.is_signed
+        self.value_type = sig.value_type
+        self.scale = sig.scale
+        self.offset = sig.offset
+        self.is_multiplexer = sig.is_multiplexer
+        self.mux_ids = np.array(sorted(sig.mux_ids), dtype=np.uint64) if sig.mux_ids is not None else None
+        self.mux_signal = sig.mux_signal or (msg.multiplexer.name if msg.multiplexer is not None else None)
+        self.mask = np.uint64((1 << sig.length) - 1)
+
+        # Pick the 8-byte window that holds the whole signal and the shift inside it
+        if sig.byte_order == "little_endian":
+            lsb = sig.start
+            self.window = min(lsb // 8, max(0, msg.length - 8))
+            self.dtype = np.dtype("<u8")
+            self.shift = lsb - 8 * self.window
+        else:
+            msb = (sig.start // 8) * 8 + (7 - sig.start % 8)
+            self.window = min(msb // 8, max(0, msg.length - 8))
+            self.dtype = np.dtype(">u8")
+            self.shift = 64 + 8 * self.window - (msb + sig.length)
+        if self.shift < 0 or self.shift + sig.length > 64:
+            raise ValueError(f"signal {sig.name} spans more than 8 bytes")
+
+    def extract(self, word):
+        raw = (word >> np.uint64(self.shift)) & self.mask
+        if self.value_type == "float":
+            return raw.astype(np.uint32).view(np.float32).astype(np.float64)
+        if self.value_type == "double":
+            return raw.view(np.float64)
+        if self.is_signed:
+            if self.length == 64:
+                return raw.view(np.int64)
+            sign = np.int64(1 << (self.length - 1))
+            return (raw.astype(np.int64) ^ sign) - sign
+        return raw
+
+
+class BatchDecoder:
+    """Decodes batches of frames for every message in a DbcDatabase."""
+
+    def __init__(self, db):
+        self.db = db
+        self._plans = {}
+        self.skipped_signals = []
+
+    def _plan(self, frame_id):
+        if frame_id not in self._plans:
+            msg = self.db.message(frame_id)
+            plans = []
+            if msg is not None:
+                for sig in msg.signals:
+                    try:
+                        plans.append(_SignalPlan(msg, sig))
+                    except ValueError:
+                        self.skipped_signals.append((msg.name, sig.name))
+                plans.sort(key=lambda p: not p.is_multiplexer)  # Switches first so muxed signals can be filtered
+            self._plans[frame_id] = (msg, plans)
+        return self._plans[frame_id]
+
+    def decode(self, timestamps, can_ids, payloads, scaled=True):
+        """Decode a frame batch into {(message, signal): (timestamps, values)}."""
+        ts = np.asarray(timestamps, dtype=np.float64)
+        ids = np.asarray(can_ids).astype(np.uint32) & np.uint32(CAN_ID_MASK | EXTENDED_ID_FLAG)  # Drop RTR/error bits only
+        ids[(ids & np.uint32(CAN_ID_MASK)) > MAX_STANDARD_ID] |= np.uint32(EXTENDED_ID_FLAG)  # One key per 29-bit ID
+        data = np.asarray(payloads, dtype=np.uint8)
+        if data.ndim == 1:
+            data = data.reshape(len(ids), -1)
+        if data.shape[1] < 8:
+            data = np.pad(data, ((0, 0), (0, 8 - data.shape[1])))
+
+        # Group frames by CAN ID once: one stable sort, then contiguous runs per ID
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+        unique_ids, starts = np.unique(sorted_ids, return_index=True)
+        bounds = np.append(starts, len(ids))
+
+        out = {}
+        for k, frame_id in enumerate(unique_ids.tolist()):
+            msg, plans = self._plan(frame_id)
+            if not plans:
+                continue
+            rows = order[bounds[k]:bounds[k + 1]]
+            frames = data[rows]
+            frame_ts = ts[rows]
+
+            words = {}
+            switches = {}
+            for plan in plans:
+                key = (plan.window, plan.dtype)
+                if key not in words:
+                    block = np.ascontiguousarray(frames[:, plan.window:plan.window + 8])
+                    words[key] = block.view(plan.dtype)[:, 0]
+                raw = plan.extract(words[key])
+                if plan.is_multiplexer:
+                    switches[plan.name] = raw
+
+                if plan.mux_ids is not None and plan.mux_signal in switches:
+                    present = np.isin(switches[plan.mux_signal], plan.mux_ids)
+                    raw, sig_ts = raw[present], frame_ts[present]
+                else:
+                    sig_ts = frame_ts
+
+                if scaled:
+                    values = raw.astype(np.float64)
+                    if plan.scale != 1:
+                        values *= plan.scale
+                    if plan.offset:
+                        values += plan.offset
+                else:
+                    values = raw
+                out[(msg.name, plan.name)] = (sig_ts, values)
+        return out
+
+
+def to_vss_columns(decoded, vss_map):
+    """Re-key decoded signals by VSS path using {signal name: vss path}; unmapped signals keep `Message.Signal`.
+
+    Two signals mapped to the same path stay separate as `path[Signal]` rather than being interleaved.
+    """
+    columns = {}
+    for (msg_name, sig_name), series in decoded.items():
+        path = vss_map.get(sig_name)
+        if not path or path == "—":
+            key = f"{msg_name}.{sig_name}"
+        elif path in columns:
+            key = f"{path}[{sig_name}]"
+        else:
+            key = path
+        columns[key] = series
+    return columns
+
+
+def encode_message(msg, values):
+    """Build one payload from {signal: physical value} (used to synthesise frames)."""
+    little = big = 0
+    for sig in msg.signals:
+        if sig.name not in values:
+            continue
+        raw = int(round((values[sig.name] - sig.offset) / sig.scale)) & sig.mask
+        if sig.byte_order == "little_endian":
+            little |= raw << sig.shift
+        else:
+            big |= raw << sig.shift
+    little_bytes = little.to_bytes(msg.length, "little")
+    big_bytes = big.to_bytes(msg.length, "big")
+    return bytes(a | b for a, b in zip(little_bytes, big_bytes))
+
+
+@lru_cache(maxsize=1)
+def sample_database():
+    """The bundled data/sample.dbc, parsed once per process."""
+    with open(SAMPLE_DBC_PATH, encoding="utf-8") as f:
+        return parse_dbc(f.read())
+
+
+def decode_example(db, signal_name, physical_value):
+    """Encode one value into its frame and run it back through the batch decoder (pipeline panels)."""
+    for msg, sig in db.iter_signals():
+        if sig.name != signal_name:
+            continue
+        value = min(max(physical_value, sig.minimum), sig.maximum)
+        payload = encode_message(msg, {sig.name: value})
+        decoded = BatchDecoder(db).decode([0.0], [msg.raw_id], np.frombuffer(payload, dtype=np.uint8).reshape(1, -1))
+        _, physical = decoded[(msg.name, sig.name)]
+        return {
+            "can_id": f"0x{msg.frame_id:03X}",
+            "message": msg.name,
+            "payload": payload.hex(" ").upper(),
+            "signal": sig.name,
+            "layout": sig.layout,
+            "factor": sig.scale,
+            "offset": sig.offset,
+            "raw": int(round((float(physical[0]) - sig.offset) / sig.scale)),
+            "value": round(float(physical[0]), 2),
+            "unit": sig.unit,
+        }
+    return None
@@ -0,0 +1,460 @@
+import base64
+import bisect
+import mmap
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+from modules.can_decoder import BatchDecoder, to_vss_columns
+from modules.dbc import EXTENDED_ID_FLAG
+
+# ============================================================
+# CAN LOG INGESTION (Memory-Mapped, Chunked) + REPLAY
+# ============================================================
+# Trace files are memory-mapped and parsed CHUNK_BYTES at a time (cut on line
+# boundaries), so multi-gigabyte drive logs never have to fit in memory. Each parsed
+# chunk is recorded in a sparse time index (byte range + first/last timestamp), which
+# makes seeking a bisect plus one chunk parse. Supported formats:
+#   candump -l   (1436509052.249713) can0 185#480D0000
+#   Vector ASC      0.012345 1  185             Rx   d 4 48 0D 00 00
+#   CSV          header with timestamp / id / data (hex or base64) or d0..dN byte columns; IDs are
+#                0x-prefixed hex, or bare hex / decimal (detected from the file, or pass id_base)
+
+LOG_DIR = os.getenv("GENAUTO_CAN_LOG_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data"))
+LOG_EXTENSIONS = (".log", ".asc", ".csv")
+SAMPLE_LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "sample_drive.log")
+CHUNK_BYTES = 4 * 1024 * 1024
+CSV_SNIFF_BYTES = 8192
+REPLAY_TICK_SECONDS = 0.05
+REPLAY_SPEEDS = {"1x": 1.0, "2x": 2.0, "5x": 5.0, "10x": 10.0, "Max": None}
+
+FrameBatch = namedtuple("FrameBatch", ["timestamps", "can_ids", "dlc", "payloads"])
+
+_CANDUMP_RE = re.compile(rb"\((\d+\.\d+)\)\s+\S+\s+([0-9A-Fa-f]{1,8})#(?:#[0-9A-Fa-f])?([0-9A-Fa-f]*)(?=\s|$)", re.M)
+_ASC_RE = re.compile(rb"^\s*(\d+\.\d+)\s+\d+\s+([0-9A-Fa-f]{1,8}x?)\s+(?:Rx|Tx)\s+d\s+[0-9A-Fa-f]{1,2}((?:[ \t]+[0-9A-Fa-f]{2})*)", re.M)
+_HEX_LUT = np.zeros(256, dtype=np.uint8)
+_HEX_VALID = np.zeros(256, dtype=bool)
+for _i, _c in enumerate(b"0123456789abcdef"):
+    _HEX_LUT[_c] = _HEX_LUT[bytes([_c]).upper()[0]] = _i
+    _HEX_VALID[_c] = _HEX_VALID[bytes([_c]).upper()[0]] = True
+
+_CSV_TIME = ("timestamp", "time", "ts", "t")
+_CSV_ID = ("id", "can_id", "canid", "arbitration_id", "identifier")
+_CSV_DATA = ("data", "payload", "bytes")
+_CSV_DLC = ("dlc", "len", "length")
+
+
+def _hex_matrix(strings, n_chars, right_align=False):
+    """Decode equal-width hex strings to an (N, n_chars // 2) uint8 matrix in one vectorized pass."""
+    pad = (lambda s: s.rjust(n_chars, b"0")) if right_align else (lambda s: s.ljust(n_chars, b"0"))
+    nibbles = _HEX_LUT[np.frombuffer(b"".join(map(pad, strings)), dtype=np.uint8)].reshape(len(strings), n_chars)
+    return (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+
+
+def _gather_hex(buf, starts, lengths, n_chars, right_align=False):
+    """Vectorized hex decode of variable-length fields located at `starts` inside a byte buffer.
+
+    Returns None if any field contains a non-hex character.
+    """
+    offsets = np.arange(n_chars)
+    if right_align:
+        pos = (starts + lengths - n_chars)[:, None] + offsets
+        valid = offsets >= (n_chars - lengths)[:, None]
+    else:
+        pos = starts[:, None] + offsets
+        valid = offsets < lengths[:, None]
+    chars = buf[np.clip(pos, 0, len(buf) - 1)]
+    if (valid & ~_HEX_VALID[chars]).any():
+        return None
+    nibbles = np.where(valid, _HEX_LUT[chars], 0).astype(np.uint8)
+    return (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+
+
+def _gather_decimal(buf, starts, width):
+    """Vectorized parse of fixed-width ASCII digit runs into int64."""
+    digits = buf[starts[:, None] + np.arange(width)].astype(np.int64) - ord("0")
+    return digits @ (10 ** np.arange(width - 1, -1, -1, dtype=np.int64))
+
+
+def _parse_candump_fast(text):
+    """Parse well-formed candump -l text with pure array ops; returns None to fall back to the regex."""
+    buf = np.frombuffer(text, dtype=np.uint8)
+    opens = np.flatnonzero(buf == ord("("))
+    closes = np.flatnonzero(buf == ord(")"))
+    dots = np.flatnonzero(buf == ord("."))
+    hashes = np.flatnonzero(buf == ord("#"))
+    n = len(opens)
+    if not n or not (len(closes) == len(dots) == len(hashes) == n):
+        return None  # CAN FD (##), remote frames, comments or odd interface names
+    line_ends = np.append(np.flatnonzero(buf == ord("\n")), len(buf))
+    ends = line_ends[np.searchsorted(line_ends, hashes)]
+    while True:  # Trim trailing whitespace (\r, flags separator) from payload fields
+        trailing = (ends > hashes + 1) & np.isin(buf[np.maximum(ends - 1, 0)], (ord("\r"), ord(" "), ord("\t")))
+        if not trailing.any():
+            break
+        ends = ends - trailing
+    spaces = np.flatnonzero((buf == ord(" ")) | (buf == ord("\t")))
+    id_starts = spaces[np.searchsorted(spaces, hashes) - 1] + 1
+    int_width = dots - opens - 1
+    frac_width = closes - dots - 1
+    id_len = hashes - id_starts
+    data_len = ends - hashes - 1
+    if (not (opens < dots).all() or not (dots < closes).all() or not (closes < id_starts).all()
+            or (int_width != int_width[0]).any() or (frac_width != frac_width[0]).any()
+            or (id_len < 1).any() or (id_len > 8).any() or (data_len % 2).any() or (data_len > 128).any()):
+        return None
+
+    seconds = _gather_decimal(buf, opens + 1, int(int_width[0]))
+    fraction = _gather_decimal(buf, dots + 1, int(frac_width[0]))
+    timestamps = seconds + fraction / 10.0 ** int(frac_width[0])
+    id_bytes = _gather_hex(buf, id_starts, id_len, 8, right_align=True)
+    width = 8 if data_len.max() <= 16 else 64
+    payloads = _gather_hex(buf, hashes + 1, data_len, width * 2)
+    if id_bytes is None or payloads is None:
+        return None
+    can_ids = id_bytes.view(">u4").ravel().astype(np.uint32)
+    can_ids[id_len > 3] |= np.uint32(EXTENDED_ID_FLAG)  # candump prints 3 hex digits for standard, 8 for extended IDs
+    return FrameBatch(timestamps, can_ids, (data_len // 2).astype(np.uint8), payloads)
+
+
+def _payload_matrix(hex_payloads):
+    lengths = np.fromiter(map(len, hex_payloads), dtype=np.int64, count=len(hex_payloads)) // 2
+    width = 8 if not len(lengths) or lengths.max() <= 8 else 64
+    return lengths.astype(np.uint8), _hex_matrix(hex_payloads, width * 2)
+
+
+def _empty_batch():
+    return FrameBatch(np.empty(0), np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint8), np.empty((0, 8), dtype=np.uint8))
+
+
+def available_logs(directory=LOG_DIR):
+    """File names of the replayable traces in the log directory (the only ones the UI may open)."""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(n for n in names if n.lower().endswith(LOG_EXTENSIONS) and os.path.isfile(os.path.join(directory, n)))
+
+
+def detect_format(head):
+    """Guess the trace format from the first few KB of the file."""
+    if _CANDUMP_RE.search(head):
+        return "candump"
+    if _ASC_RE.search(head) or head.lstrip().lower().startswith((b"date ", b"base ")):
+        return "asc"
+    first = head.split(b"\n", 1)[0].lower()
+    if b"," in first:
+        return "csv"
+    raise ValueError("unrecognised CAN log format (expected candump -l, Vector ASC or CSV)")
+
+
+class CanLog:
+    """Memory-mapped CAN trace with chunked parsing and an incremental time index."""
+
+    def __init__(self, path, fmt=None, chunk_bytes=CHUNK_BYTES, id_base=None):
+        self.path = path
+        self.chunk_bytes = chunk_bytes
+        self._mm = b""
+        self._file = open(path, "rb")
+        try:
+            self.size = os.fstat(self._file.fileno()).st_size
+            head = self._file.read(8192)
+            self.format = fmt or detect_format(head)
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+            self.data_start = 0
+            self._asc_decimal = self.format == "asc" and b"base dec" in head.lower()
+            self._csv = None
+            if self.format == "csv":
+                header_end = self._mm.find(b"\n") + 1 or self.size
+                self._csv = self._csv_columns(self._mm[:header_end])
+                self._csv["id_base"] = id_base or self._csv_id_base(self._csv, self._mm[header_end:header_end + CSV_SNIFF_BYTES])
+                self.data_start = header_end
+        except Exception:
+            self.close()
+            raise
+        self.index = []          # (start, end, first_ts, last_ts, frames) per parsed chunk
+        self._indexed_until = self.data_start
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- chunk parsing ----
+
+    def _chunk_end(self, start):
+        end = min(self.size, start + self.chunk_bytes)
+        if end < self.size:
+            newline = self._mm.find(b"\n", end)
+            end = self.size if newline < 0 else newline + 1
+        return end
+
+    def _parse(self, text):
+        if self.format == "candump":
+            batch = _parse_candump_fast(text)
+            if batch is not None:
+                return batch
+            rows = _CANDUMP_RE.findall(text)
+            if not rows:
+                return _empty_batch()
+            ts, ids, data = zip(*rows)
+            extended = np.array([len(i) > 3 for i in ids], dtype=bool)
+        elif self.format == "asc":
+            rows = _ASC_RE.findall(text)
+            if not rows:
+                return _empty_batch()
+            ts, ids, data = zip(*rows)
+            extended = np.array([i.endswith(b"x") for i in ids], dtype=bool)  # ASC suffixes extended IDs with x
+            ids = [i.rstrip(b"x") for i in ids]
+            data = [d.replace(b" ", b"").replace(b"\t", b"") for d in data]
+        else:
+            return self._parse_csv(text)
+
+        timestamps = np.array(ts).astype(np.float64)
+        if self._asc_decimal:
+            can_ids = np.array([int(i) for i in ids], dtype=np.uint32)
+        else:
+            can_ids = _hex_matrix(ids, 8, right_align=True).view(">u4").ravel().astype(np.uint32)
+        can_ids[extended] |= np.uint32(EXTENDED_ID_FLAG)
+        dlc, payloads = _payload_matrix(data)
+        return FrameBatch(timestamps, can_ids, dlc, payloads)
+
+    @staticmethod
+    def _csv_columns(header):
+        names = [h.strip().strip(b'"').decode("ascii", "ignore").lower() for h in header.strip().split(b",")]
+
+        def find(options):
+            return next((names.index(o) for o in options if o in names), None)
+
+        cols = {"ts": find(_CSV_TIME), "id": find(_CSV_ID), "data": find(_CSV_DATA), "dlc": find(_CSV_DLC)}
+        cols["bytes"] = [i for i, n in enumerate(names) if re.fullmatch(r"(d|b|byte|data)_?\d+", n)]
+        cols["id_hex"] = cols["id"] is not None and names[cols["id"]] == "arbitration_id"  # python-can writes hex
+        if cols["ts"] is None or cols["id"] is None or (cols["data"] is None and not cols["bytes"]):
+            raise ValueError(f"CSV header needs timestamp, id and data columns, got {names}")
+        return cols
+
+    @staticmethod
+    def _csv_id_base(cols, sample):
+        """16 if the ID column is hex (hex letters, python-can's arbitration_id), else 10 (Excel / cantools)."""
+        if cols["id_hex"]:
+            return 16
+        lines = sample.split(b"\n")
+        for line in lines[:-1] if len(sample) == CSV_SNIFF_BYTES else lines:  # A full sample may end mid-field
+            fields = line.strip().split(b",")
+            if len(fields) > cols["id"]:
+                raw_id = fields[cols["id"]].strip().strip(b'"').lower()
+                if not raw_id.startswith(b"0x") and re.search(rb"[a-f]", raw_id):
+                    return 16
+        return 10
+
+    def _parse_csv(self, text):
+        cols = self._csv
+        ts, ids, data = [], [], []
+        for line in text.split(b"\n"):
+            fields = line.strip().split(b",")
+            if len(fields) <= max(cols["ts"], cols["id"]):
+                continue
+            try:
+                t = float(fields[cols["ts"]])
+                raw_id = fields[cols["id"]].strip().strip(b'"').lower()
+                can_id = int(raw_id, 16 if raw_id.startswith(b"0x") else cols["id_base"])
+            except ValueError:
+                continue
+            if cols["data"] is not None:
+                payload = fields[cols["data"]].strip().strip(b'"').replace(b" ", b"")
+                try:
+                    bytes.fromhex(payload.decode("ascii"))
+                except ValueError:
+                    try:
+                        payload = base64.b64decode(payload, validate=True).hex().encode()  # python-can CSV stores base64
+                    except ValueError:
+                        continue
+            else:
+                payload = b"".join(fields[i].strip().rjust(2, b"0") for i in cols["bytes"] if i < len(fields) and fields[i].strip())
+            if cols["dlc"] is not None and cols["dlc"] < len(fields) and fields[cols["dlc"]].strip().isdigit():
+                payload = payload[:int(fields[cols["dlc"]]) * 2]
+            ts.append(t)
+            ids.append(can_id)
+            data.append(payload)
+        if not ts:
+            return _empty_batch()
+        dlc, payloads = _payload_matrix(data)
+        return FrameBatch(np.array(ts, dtype=np.float64), np.array(ids, dtype=np.uint32), dlc, payloads)
+
+    # ---- iteration, index, seeking ----
+
+    def _read_chunk(self, start):
+        """Parse the chunk starting at `start`, extending the time index if it is the next unindexed one."""
+        end = self._chunk_end(start)
+        batch = self._parse(self._mm[start:end])
+        if start == self._indexed_until:
+            if len(batch.timestamps):
+                self.index.append((start, end, float(batch.timestamps[0]), float(batch.timestamps[-1]), len(batch.timestamps)))
+            self._indexed_until = end
+        return batch, end
+
+    def iter_chunks(self, start_time=None, end_time=None):
+        """Yield FrameBatch objects in file order, optionally clipped to [start_time, end_time]."""
+        start = self.seek(start_time) if start_time is not None else self.data_start
+        while start < self.size:
+            batch, start = self._read_chunk(start)
+            if not len(batch.timestamps):
+                continue
+            past_end = end_time is not None and batch.timestamps[-1] > end_time
+            if start_time is not None or end_time is not None:
+                keep = np.ones(len(batch.timestamps), dtype=bool)
+                if start_time is not None:
+                    keep &= batch.timestamps >= start_time
+                if end_time is not None:
+                    keep &= batch.timestamps <= end_time
+                batch = FrameBatch(*(column[keep] for column in batch))
+            if len(batch.timestamps):
+                yield batch
+            if past_end:
+                return
+
+    def seek(self, timestamp):
+        """Byte offset of the chunk holding `timestamp`, indexing forward only as far as needed."""
+        while self._indexed_until < self.size and (not self.index or self.index[-1][3] < timestamp):
+            self._read_chunk(self._indexed_until)
+        if not self.index:
+            return self.data_start
+        i = bisect.bisect_left([entry[3] for entry in self.index], timestamp)
+        return self.index[min(i, len(self.index) - 1)][0]
+
+    def build_index(self):
+        """Index the whole file (one streaming pass) and return it."""
+        self.seek(float("inf"))
+        return self.index
+
+    @property
+    def fully_indexed(self):
+        return self._indexed_until >= self.size
+
+    def stats(self):
+        frames = sum(entry[4] for entry in self.index)
+        return {
+            "path": self.path,
+            "format": self.format,
+            "size_mb": self.size / 1024 / 1024,
+            "indexed_pct": 100.0 * (self._indexed_until - self.data_start) / max(1, self.size - self.data_start),
+            "chunks": len(self.index),
+            "frames": frames,
+            "start": self.index[0][2] if self.index else None,
+            "end": self.index[-1][3] if self.index else None,
+        }
+
+
+# ============================================================
+# REPLAY INTO THE TELEMETRY STORE
+# ============================================================
+
+class LogReplayer:
+    """Background thread that decodes a CanLog and writes VSS-mapped values into a TimeSeriesStore.
+
+    Log time is rebased to wall-clock time: at 1x/Nx the writer sleeps so samples land when they
+    are due; at max speed (speed=None) each chunk is written as soon as it is decoded, its samples
+    spread over the wall time that took, so no sample is ever stamped in the future.
+    """
+
+    def __init__(self, log, db, vss_map, store, speed=1.0, start_time=None, on_finish=None):
+        self.log = log
+        self.decoder = BatchDecoder(db)
+        self.vss_map = vss_map
+        self.store = store
+        self.speed = speed
+        self.start_time = start_time
+        self.paths = sorted({p for p in vss_map.values() if p in store})
+        self.frames = 0
+        self.samples = 0
+        self.position = None
+        self.error = None
+        self.finished = False
+        self._on_finish = on_finish     # Called on the writer thread once it is done writing (end of log, stop or error)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="can-log-replay", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Signal the writer to stop and wait up to `timeout` seconds; check `running` afterwards."""
+        self._stop.set()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join(timeout=timeout)
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def _write(self, columns, cursor, upto, log_origin, wall_origin, scale):
+        """Write samples up to log time `upto` (all if None), at wall_origin + (ts - log_origin) * scale."""
+        for path, (ts, values) in columns.items():
+            stop = len(ts) if upto is None else int(np.searchsorted(ts, upto, side="right"))
+            begin = cursor.get(path, 0)
+            if stop > begin:
+                wall = wall_origin + (ts[begin:stop] - log_origin) * scale
+                self.store.extend(path, wall, values[begin:stop].astype(np.float32))
+                self.samples += stop - begin
+                cursor[path] = stop
+
+    def _run(self):
+        try:
+            # Rebase after anything already in the rings so timestamps stay monotonic
+            latest = [self.store.series[p].raw.latest()[0] for p in self.paths]
+            base = max([time.time()] + [t + 1e-3 for t in latest if t is not None])
+            wall_start = time.time()
+            log_start = None
+            for batch in self.log.iter_chunks(self.start_time):
+                if self._stop.is_set():
+                    return
+                if log_start is None:
+                    log_start = float(batch.timestamps[0])
+                decoded = self.decoder.decode(batch.timestamps, batch.can_ids, batch.payloads)
+                columns = {p: s for p, s in to_vss_columns(decoded, self.vss_map).items() if p in self.paths}
+                self.frames += len(batch.timestamps)
+                cursor = {}
+                chunk_end = float(batch.timestamps[-1])
+                if self.speed is None:
+                    # Map the log time since the previous chunk onto the wall time since it was written
+                    now = max(time.time(), base)
+                    self._write(columns, cursor, None, log_start, base, (now - base) / max(chunk_end - log_start, 1e-9))
+                    base, log_start = now, chunk_end
+                    self.position = chunk_end
+                    continue
+                while not self._stop.is_set():
+                    upto = log_start + (time.time() - wall_start) * self.speed
+                    self._write(columns, cursor, upto, log_start, base, 1.0 / self.speed)
+                    self.position = min(upto, chunk_end)
+                    if upto >= chunk_end:
+                        break
+                    self._stop.wait(REPLAY_TICK_SECONDS)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished = True
+            if self._on_finish is not None:
+                self._on_finish()
+
+    def stats(self):
+        log_stats = self.log.stats()
+        return {
+            "running": self.running,
+            "finished": self.finished,
+            "speed": self.speed,
+            "frames": self.frames,
+            "samples": self.samples,
+            "position": None if self.position is None or log_stats["start"] is None else self.position - log_stats["start"],
+            "paths": len(self.paths),
+            "error": self.error,
+            **{f"log_{k}": v for k, v in log_stats.items()},
+        }
@@ -0,0 +1,963 @@
+import re
+import time
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+# ============================================================
+# LOCAL COMPLIANCE CHECKER (MISRA C++:2023 / MISRA C:2012 / AUTOSAR C++14)
+# ============================================================
+# Deterministic rule checker for the generated C++, replacing the LLM review call.
+# Sources are tokenized (so comments and string literals never trigger findings), one
+# structural pass recovers classes, functions and their parameters, and every rule in
+# the registry walks a file and yields (line, message) pairs. A rule is registered once
+# with the id and category it carries in each standard, following the bullets of
+# engine.get_compliance_rules. The work is pure-Python and CPU-bound, so files are checked
+# sequentially; a whole generated service takes a few milliseconds, so pages can simply re-run it.
+#
+# Deliberately heuristic: no preprocessor and no type resolution. A finding is a line
+# worth reviewing rather than a proof, but the same code always yields the same report.
+
+MISRA_CPP = "MISRA C++:2023"
+MISRA_C = "MISRA C:2012"
+AUTOSAR = "AUTOSAR C++14"
+
+CHECKER_VERSION = "2"  # Part of the report's fingerprint: bump when rules change so reports regenerate
+MAX_REPORTED_VIOLATIONS = 100
+CATEGORY_WEIGHTS = {"Mandatory": 3, "Required": 2, "Advisory": 1}
+CRITICAL_CATEGORIES = ("Mandatory", "Required")
+
+KEYWORDS = {
+    "alignas", "alignof", "asm", "auto", "bool", "break", "case", "catch", "char", "char8_t", "char16_t",
+    "char32_t", "class", "const", "consteval", "constexpr", "constinit", "const_cast", "continue", "decltype",
+    "default", "delete", "do", "double", "dynamic_cast", "else", "enum", "explicit", "export", "extern", "false",
+    "float", "for", "friend", "goto", "if", "inline", "int", "long", "mutable", "namespace", "new", "noexcept",
+    "nullptr", "operator", "private", "protected", "public", "register", "reinterpret_cast", "return", "short",
+    "signed", "sizeof", "static", "static_assert", "static_cast", "struct", "switch", "template", "this",
+    "thread_local", "throw", "true", "try", "typedef", "typeid", "typename", "union", "unsigned", "using",
+    "virtual", "void", "volatile", "wchar_t", "while",
+}
+INT_TYPES = {"int", "short", "long", "signed", "unsigned"}
+BUILTIN_TYPES = INT_TYPES | {"char", "bool", "float", "double", "void", "wchar_t", "char8_t", "char16_t", "char32_t"}
+QUALIFIERS = {"const", "volatile", "static", "constexpr", "mutable", "register", "thread_local", "inline", "extern"}
+CONTROL_KEYWORDS = {"if", "for", "while", "switch", "catch", "return", "sizeof", "alignof", "decltype", "typeid",
+                    "noexcept", "static_assert", "throw", "case", "do", "else", "new", "delete", "co_return"}
+C_HEAP_FUNCTIONS = {"malloc", "calloc", "realloc", "free", "aligned_alloc"}
+C_IO_FUNCTIONS = {"printf", "fprintf", "sprintf", "snprintf", "vprintf", "vsprintf", "vsnprintf", "scanf", "fscanf",
+                  "sscanf", "puts", "fputs", "gets", "fgets", "getchar", "putchar", "fopen", "fclose", "fread",
+                  "fwrite", "fseek", "ftell", "fflush", "perror", "remove", "rename", "tmpfile"}
+INIT_FUNCTION_RE = re.compile(r"^(?:init|setup|configure|create|make|build|load|register|on_?init)", re.I)
+HEADER_EXTENSIONS = (".h", ".hh", ".hpp", ".hxx")
+
+Token = namedtuple("Token", ["kind", "text", "line"])
+Violation = namedtuple("Violation", ["file", "line", "rule_id", "category", "key", "message"])
+Rule = namedtuple("Rule", ["key", "title", "ids", "check"])  # ids: {standard: (rule id, category)}
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>[ \t\r\n\f\v]+|\\\n)
+  | (?P<ident>(?!(?:u8|[uUL])?R?["'])[A-Za-z_]\w*)
+  | (?P<punct>\.\.\.|<<=|>>=|->\*?|::|\+\+|--|<<|>>|&&|\|\||[-+*/%&|^!=<>]=|[{}()\[\];,?:~!%^&*+\-=<>|]|\.(?!\d)|/(?![/*]))
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<preproc>\#(?:[^\n\\]|\\.)*)
+  | (?P<string>(?:u8|[uUL])?R"(?P<delim>[^()\\\s]{0,16})\(.*?\)(?P=delim)"|(?:u8|[uUL])?"(?:[^"\\\n]|\\.)*")
+  | (?P<char>(?:u8|[uUL])?'(?:[^'\\\n]|\\.)*')
+  | (?P<number>\.?\d(?:[eEpP][+-]|[\w.'])*)
+  | (?P<other>.)
+""", re.S | re.X)  # Most frequent alternatives first; identifiers give way to u8"", L'', R"()" literals
+
+
+def tokenize(code):
+    """(tokens, preprocessor directives) of C/C++ source; comments and whitespace are dropped."""
+    tokens, directives = [], []
+    line = 1
+    for m in _TOKEN_RE.finditer(code):
+        kind, text = m.lastgroup, m.group()
+        if kind == "ident":
+            tokens.append(Token("keyword" if text in KEYWORDS else "ident", text, line))
+        elif kind == "punct":
+            tokens.append(Token(kind, text, line))
+        else:
+            if kind == "preproc":
+                directives.append(Token(kind, text, line))
+            elif kind not in ("space", "comment"):
+                tokens.append(Token(kind, text, line))
+            line += text.count("\n")
+    return tokens, directives
+
+
+def is_float_literal(text):
+    if text[:2] in ("0x", "0X", "0b", "0B"):
+        return False
+    return "." in text or "e" in text.lower().rstrip("fl")
+
+
+# ============================================================
+# STRUCTURAL PASS (Classes, Functions, Statements)
+# ============================================================
+
+class ClassInfo:
+    def __init__(self, name, kind, line, final, bases):
+        self.name, self.kind, self.line, self.final, self.bases = name, kind, line, final, bases
+        self.methods = []
+
+
+class FunctionInfo:
+    def __init__(self, name, line, owner, params, leading, specifiers, cls=None, parent=None):
+        self.name, self.line, self.owner, self.params = name, line, owner, params
+        self.leading, self.specifiers = leading, specifiers  # texts before the name / after the parameter list
+        self.cls = cls          # ClassInfo the function is declared inside, if any
+        self.parent = parent    # Enclosing function of a lambda
+        self.body = None        # (first, last) token index of a definition's body
+
+    @property
+    def is_lambda(self):
+        return self.name == "<lambda>"
+
+    @property
+    def is_ctor(self):
+        return self.owner is not None and self.name == self.owner
+
+    @property
+    def is_init(self):
+        return self.is_ctor or bool(INIT_FUNCTION_RE.match(self.name))
+
+    @property
+    def display(self):
+        return f"{self.owner}::{self.name}" if self.owner else self.name
+
+    @property
+    def virtual_key(self):
+        """Name a base/derived pair shares: destructors match each other whatever the class name."""
+        return "~" if self.name.startswith("~") else self.name
+
+    @property
+    def declares_virtual(self):
+        return "virtual" in self.leading or bool({"override", "final"} & self.specifiers)
+
+
+def _match(tokens, i, open_text, close_text):
+    """Index of the token closing the bracket opened at i (or the last index if unbalanced)."""
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j].text == open_text:
+            depth += 1
+        elif tokens[j].text == close_text:
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(tokens) - 1
+
+
+def _split_top_level(tokens):
+    """Split a parameter / base list on commas outside (), [], {} and template brackets."""
+    parts, current, depth = [], [], 0
+    for tok in tokens:
+        if tok.text in ("(", "[", "{", "<"):
+            depth += 1
+        elif tok.text in (")", "]", "}", ">"):
+            depth -= 1
+        elif tok.text == ">>":
+            depth -= 2
+        elif tok.text == "," and depth <= 0:
+            parts.append(current)
+            current = []
+            continue
+        current.append(tok)
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _skip_template_prefix(texts):
+    if not texts or texts[0] != "template":
+        return 0
+    depth = 0
+    for j, text in enumerate(texts):
+        depth += {"<": 1, ">": -1, ">>": -2}.get(text, 0)
+        if j and depth <= 0:
+            return j + 1
+    return len(texts)
+
+
+class SourceFile:
+    """One tokenized file plus the classes, functions and statements found in it."""
+
+    def __init__(self, name, code):
+        self.name = name
+        self.tokens, self.directives = tokenize(code)
+        self.classes = []
+        self.functions = []                        # Definitions and declarations, in source order
+        self.owner = [None] * len(self.tokens)     # Innermost function / lambda whose body holds each token
+        self.stmt_of = [0] * len(self.tokens)      # Index of the first token of each token's statement
+        self._memo = {}
+        self._parse()
+
+    def memo(self, fn):
+        """fn(self), computed once per file for helpers several rules share."""
+        if fn not in self._memo:
+            self._memo[fn] = fn(self)
+        return self._memo[fn]
+
+    @property
+    def is_header(self):
+        return self.name.lower().endswith(HEADER_EXTENSIONS)
+
+    def _parse(self):
+        toks = self.tokens
+        stack = []  # (kind, info, paren depth to restore)
+        paren, start = 0, 0
+        current = None
+        for i, tok in enumerate(toks):
+            self.stmt_of[i] = start
+            self.owner[i] = current
+            text = tok.text
+            if tok.kind != "punct":
+                continue
+            if text in ("(", "["):
+                paren += 1
+            elif text in (")", "]"):
+                paren = max(0, paren - 1)
+            elif text == "{":
+                kind, info = self._open_scope(start, i, paren, stack)
+                stack.append((kind, info, paren))
+                paren = 0
+                if kind in ("function", "lambda"):
+                    info.body = (i + 1, i + 1)
+                    current = info
+                if kind != "member-init":
+                    start = i + 1
+            elif text == "}":
+                if stack:
+                    kind, info, paren = stack.pop()
+                    if kind in ("function", "lambda"):
+                        info.body = (info.body[0], i)
+                        current = info.parent
+                    if kind == "member-init":
+                        continue  # Still inside the constructor's declarator
+                start = i + 1
+            elif text == ";" and paren == 0:
+                if not stack or stack[-1][0] in ("class", "namespace"):
+                    self._declaration(start, i, stack)
+                start = i + 1
+            elif text == ":" and paren == 0 and i and toks[i - 1].text in ("public", "private", "protected"):
+                start = i + 1
+
+    def _enclosing(self, stack, kinds):
+        for kind, info, _ in reversed(stack):
+            if kind in kinds:
+                return kind, info
+        return None, None
+
+    def _open_scope(self, start, i, paren, stack):
+        toks = self.tokens
+        decl = toks[start:i]
+        texts = [t.text for t in decl]
+        if not decl:
+            return "block", None
+        lam = self._lambda_start(texts)
+        if texts[-1] in ("=", ",", "(", "[", "{", "return", "?", ":"):
+            return "block", None  # Braced initializer
+        if paren:
+            return ("lambda", self._lambda(stack, decl, lam)) if lam is not None else ("block", None)
+        if texts[0] == "extern" and len(texts) == 2 and decl[1].kind == "string":
+            return "namespace", None
+
+        first = _skip_template_prefix(texts)
+        for j in range(first, len(texts)):
+            if texts[j] in ("(", "="):
+                break
+            if texts[j] == "namespace":
+                return "namespace", None
+            if texts[j] == "enum":
+                return "block", None
+            if texts[j] in ("class", "struct", "union"):
+                return "class", self._class(decl, j)
+
+        if lam is not None:
+            return "lambda", self._lambda(stack, decl, lam)
+        fn = self._function(decl, stack)
+        if fn is None:
+            return "block", None
+        if fn == "member-init":
+            return "member-init", None
+        self.functions.append(fn)
+        if fn.cls is not None:
+            fn.cls.methods.append(fn)
+        return "function", fn
+
+    @staticmethod
+    def _lambda_start(texts):
+        for j, text in enumerate(texts):
+            if text == "[" and (j == 0 or texts[j - 1] in ("=", "(", ",", "return", "{")):
+                return j
+        return None
+
+    def _lambda(self, stack, decl, lam):
+        _, parent = self._enclosing(stack, ("function", "lambda"))
+        params = []
+        capture_end = _match(decl, lam, "[", "]")
+        if capture_end + 1 < len(decl) and decl[capture_end + 1].text == "(":
+            params = _split_top_level(decl[capture_end + 2:_match(decl, capture_end + 1, "(", ")")])
+        fn = FunctionInfo("<lambda>", decl[lam].line, None, params, set(), set(), parent=parent)
+        self.functions.append(fn)
+        return fn
+
+    def _class(self, decl, j):
+        kw = decl[j]
+        rest = decl[j + 1:]
+        name, k = None, 0
+        while k < len(rest) and rest[k].text not in (":", "final"):
+            if rest[k].kind == "ident":
+                name = rest[k].text
+            elif rest[k].text in ("(", "["):  # alignas(...) / [[attributes]]
+                k = _match(rest, k, rest[k].text, ")" if rest[k].text == "(" else "]")
+            k += 1
+        final = any(t.text == "final" for t in rest)
+        bases = []
+        colon = next((n for n, t in enumerate(rest) if t.text == ":"), None)
+        if colon is not None:
+            for part in _split_top_level(rest[colon + 1:]):
+                depth, base = 0, None
+                for tok in part:
+                    depth += {"<": 1, ">": -1, ">>": -2}.get(tok.text, 0)
+                    if depth == 0 and tok.kind == "ident":
+                        base = tok.text
+                if base:
+                    bases.append(base)
+        info = ClassInfo(name, kw.text, kw.line, final, bases)
+        self.classes.append(info)
+        return info
+
+    def _function(self, decl, stack):
+        """FunctionInfo for a declarator ending at `{` or `;`, "member-init" for a brace in a ctor init list, else None."""
+        texts = [t.text for t in decl]
+        operator = "operator" in texts
+        p = texts.index("operator") + 1 if operator else _skip_template_prefix(texts)
+        while p < len(texts) and texts[p] != "(":
+            if texts[p] == "=" and not operator:
+                return None
+            p += 1
+        if operator and p < len(texts) and texts[p] == "(" and p + 1 < len(texts) and texts[p + 1] == ")":
+            p = p + 2 if p + 2 < len(texts) and texts[p + 2] == "(" else p  # operator()(...)
+        if p >= len(texts) or p == 0:
+            return None
+        n = p - 1
+        if operator:
+            n = texts.index("operator")
+            name = "operator" + "".join(texts[n + 1:p])
+        elif decl[n].kind == "ident":
+            name = texts[n]
+            if n and texts[n - 1] == "~":
+                name, n = "~" + name, n - 1
+        else:
+            return None
+        if any(t in CONTROL_KEYWORDS for t in texts[:n]):
+            return None
+        close = _match(decl, p, "(", ")")
+        after = texts[close + 1:]
+        if ":" in after:
+            init = after.index(":")
+            if after[-1] not in (")", "}") and after[init + 1:]:
+                return "member-init"
+            after = after[:init]
+        params = _split_top_level(decl[p + 1:close])
+        owner = texts[n - 2] if n >= 2 and texts[n - 1] == "::" else None
+        cls = None
+        kind, info = self._enclosing(stack, ("class", "function", "lambda"))
+        if kind == "class" and owner is None:
+            cls, owner = info, info.name
+        return FunctionInfo(name, decl[n].line, owner, params,
+                            set(texts[:n]), set(after), cls=cls)
+
+    def _declaration(self, start, i, stack):
+        """Record function declarations (prototypes, member declarations) ending at a `;`."""
+        decl = self.tokens[start:i]
+        texts = [t.text for t in decl]
+        if not decl or "(" not in texts or texts[0] in ("typedef", "using", "friend", "return", "static_assert"):
+            return
+        fn = self._function(decl, stack)
+        if not isinstance(fn, FunctionInfo):
+            return
+        # `Foo bar(1);` is a variable with constructor arguments, not a prototype
+        for param in fn.params:
+            head = param[:next((k for k, t in enumerate(param) if t.text == "="), len(param))]
+            if any(t.kind in ("number", "string", "char") or t.text in ("this", "nullptr", "true", "false") for t in head):
+                return
+        self.functions.append(fn)
+        if fn.cls is not None:
+            fn.cls.methods.append(fn)
+
+    def enclosing_function(self, i):
+        """Named function whose body holds token i (lambdas resolve to the function they sit in)."""
+        fn = self.owner[i]
+        while fn is not None and fn.is_lambda:
+            fn = fn.parent
+        return fn
+
+    def statement(self, i):
+        """(first, end) token indices of the statement holding token i, stopping at `;`, `{` or `}`."""
+        end = i
+        while end < len(self.tokens) and self.tokens[end].text not in (";", "{", "}"):
+            end += 1
+        return self.stmt_of[i], end
+
+
+class Project:
+    """Cross-file view used by rules that need more than one file: class hierarchy and call graph."""
+
+    def __init__(self, sources):
+        self.sources = sources
+        self.classes = {}
+        for src in sources:
+            for cls in src.classes:
+                if cls.name:
+                    self.classes.setdefault(cls.name, cls)
+        self.base_names = {base for cls in self.classes.values() for base in cls.bases}
+        self._recursive = None
+
+    def inherited_virtuals(self, cls):
+        """{method key: base class name} for virtual methods of the known (in-project) bases of cls."""
+        found, seen = {}, set()
+        todo = list(cls.bases)
+        while todo:
+            base = self.classes.get(todo.pop(0))
+            if base is None or base.name in seen:
+                continue
+            seen.add(base.name)
+            for method in base.methods:
+                if method.declares_virtual:
+                    found.setdefault(method.virtual_key, base.name)
+            todo.extend(base.bases)
+        return found
+
+    def recursive_functions(self):
+        """{FunctionInfo: call path} for every defined function that can reach itself."""
+        if self._recursive is None:
+            self._recursive = _find_recursion(self.sources)
+        return self._recursive
+
+
+def _find_recursion(sources):
+    defined = {}
+    for src in sources:
+        for fn in src.functions:
+            if fn.body and not fn.is_lambda:
+                defined.setdefault(fn.display, fn)
+
+    calls = {key: set() for key in defined}
+    for src in sources:
+        toks = src.tokens
+        for i, tok in enumerate(toks[:-1]):
+            if tok.kind != "ident" or toks[i + 1].text != "(":
+                continue
+            fn = src.enclosing_function(i)
+            if fn is None or fn.display not in calls:
+                continue
+            prev = toks[i - 1].text if i else ""
+            member = f"{fn.owner}::{tok.text}"
+            if prev in (".", "->"):
+                target = member if i >= 2 and toks[i - 2].text == "this" else None  # Else another object's method
+            elif prev == "::":
+                target = f"{toks[i - 2].text}::{tok.text}"
+            else:
+                target = member if fn.owner and member in defined else tok.text
+            if target in defined:
+                calls[fn.display].add(target)
+
+    recursive = {}
+    for key in defined:
+        path = _cycle_path(key, calls)
+        if path:
+            recursive[defined[key]] = path
+    return recursive
+
+
+def _cycle_path(start, calls):
+    """Shortest call path from start back to itself, or None."""
+    parents = {}
+    frontier = [start]
+    while frontier:
+        nxt = []
+        for node in frontier:
+            for callee in sorted(calls.get(node, ())):
+                if callee == start:
+                    path = [node]
+                    while path[-1] != start:
+                        path.append(parents[path[-1]])
+                    return path[::-1] + [start]
+                if callee not in parents and callee != start:
+                    parents[callee] = node
+                    nxt.append(callee)
+        frontier = nxt
+    return None
+
+
+# ============================================================
+# RULE REGISTRY
+# ============================================================
+
+RULES = []
+
+
+def rule(key, title, ids):
+    """Register a check `fn(src, project)` yielding (line, message) under its id/category per standard."""
+    def register(fn):
+        RULES.append(Rule(key, title, ids, fn))
+        return fn
+    return register
+
+
+def rules_for(standard):
+    """[(rule id, category, Rule)] checked for one compliance standard."""
+    return [(r.ids[standard][0], r.ids[standard][1], r) for r in RULES if standard in r.ids]
+
+
+def _next(toks, i):
+    return toks[i + 1].text if i + 1 < len(toks) else ""
+
+
+def _prev(toks, i):
+    return toks[i - 1].text if i > 0 else ""
+
+
+def _allocations(src):
+    """[(token index, kind, spelling)] of every heap allocation / deallocation expression."""
+    toks = src.tokens
+    found = []
+    for i, tok in enumerate(toks):
+        prev, nxt = _prev(toks, i), _next(toks, i)
+        if tok.kind == "keyword" and tok.text in ("new", "delete"):
+            if prev in ("operator", "="):
+                continue  # `operator new` overloads and `= delete`d functions
+            if tok.text == "new" and nxt == "(":
+                close = _match(toks, i + 1, "(", ")")
+                if not any(t.text == "nothrow" for t in toks[i + 1:close]):
+                    continue  # Placement new constructs into existing storage
+            found.append((i, tok.text, tok.text + ("[]" if nxt == "[" else "")))
+        elif tok.kind == "ident" and nxt == "(" and tok.text in C_HEAP_FUNCTIONS and prev not in (".", "->"):
+            found.append((i, "c", f"{tok.text}()"))
+        elif tok.kind == "ident" and tok.text in ("make_unique", "make_shared", "allocate_shared") and nxt in ("<", "("):
+            found.append((i, "smart", f"std::{tok.text}"))
+    return found
+
+
+@rule("dynamic-memory-after-init", "No dynamic memory after initialization",
+      {MISRA_CPP: ("Rule 18.0.1", "Required"), AUTOSAR: ("A18-5-7", "Required")})
+def _check_dynamic_after_init(src, project):
+    for i, kind, spelling in src.memo(_allocations):
+        fn = src.enclosing_function(i)
+        if fn is not None and not fn.is_init:
+            yield src.tokens[i].line, f"`{spelling}` in `{fn.display}` runs after initialization — allocate in the constructor or an init function"
+
+
+@rule("raw-new-delete", "No raw new/delete (use smart pointers)",
+      {MISRA_CPP: ("Rule 21.6.2", "Required"), AUTOSAR: ("A18-5-2", "Required")})
+def _check_raw_new_delete(src, project):
+    for i, kind, spelling in src.memo(_allocations):
+        if kind in ("new", "delete"):
+            yield src.tokens[i].line, f"raw `{spelling}` — use std::unique_ptr / std::make_unique"
+
+
+@rule("c-heap", "No malloc/calloc/realloc/free",
+      {MISRA_C: ("Rule 21.3", "Required"), AUTOSAR: ("A18-5-1", "Required")})
+def _check_c_heap(src, project):
+    for i, kind, spelling in src.memo(_allocations):
+        if kind == "c":
+            yield src.tokens[i].line, f"`{spelling}` from <stdlib.h> allocates on the heap"
+
+
+def _pointer_names(src):
+    """{function or None: names declared as pointers} from parameters and declaration statements."""
+    toks = src.tokens
+    names = {}
+    for fn in src.functions:
+        if fn.body:
+            for param in fn.params:
+                head = param[:next((k for k, t in enumerate(param) if t.text == "="), len(param))]
+                if len(head) >= 2 and head[-1].kind == "ident" and any(t.text == "*" for t in head):
+                    key = fn
+                    while key is not None and key.is_lambda:
+                        key = key.parent
+                    names.setdefault(key, set()).add(head[-1].text)
+    for i, tok in enumerate(toks):
+        if tok.text != "*" or src.stmt_of[i] == i:
+            continue
+        j = i
+        while j + 1 < len(toks) and toks[j + 1].text in ("*", "const", "volatile"):
+            j += 1
+        if j + 2 >= len(toks) or toks[j + 1].kind != "ident" or toks[j + 2].text not in ("=", ";", ",", "[", "{"):
+            continue
+        span = toks[src.stmt_of[i]:i]
+        if all((t.kind in ("ident", "keyword") and t.text not in CONTROL_KEYWORDS) or t.text in ("::", "<", ">", ",")
+               for t in span):
+            names.setdefault(src.enclosing_function(i), set()).add(toks[j + 1].text)
+    return names
+
+
+@rule("pointer-arithmetic", "No pointer arithmetic except array indexing",
+      {MISRA_CPP: ("Rule 8.7.1", "Required"), MISRA_C: ("Rule 18.4", "Advisory"), AUTOSAR: ("M5-0-15", "Required")})
+def _check_pointer_arithmetic(src, project):
+    names = _pointer_names(src)
+    if not names:
+        return
+    toks = src.tokens
+    unary_context = {"(", ",", "=", "return", "{", ";", "+", "-", "*", "/", "&&", "||", "!", "?", ":"}
+    for i, tok in enumerate(toks):
+        if tok.kind != "ident":
+            continue
+        fn = src.enclosing_function(i)
+        if tok.text not in names.get(fn, ()) and tok.text not in names.get(None, ()):
+            continue
+        prev, nxt = _prev(toks, i), _next(toks, i)
+        if prev in (".", "->", "::"):
+            continue
+        if nxt in ("++", "--", "+=", "-=") or prev in ("++", "--"):
+            yield tok.line, f"`{tok.text}` is a pointer modified with `{nxt if nxt in ('++', '--', '+=', '-=') else prev}` — index an array instead"
+        elif nxt in ("+", "-") and not (prev == "*" and _prev(toks, i - 1) in unary_context):
+            yield tok.line, f"`{tok.text} {nxt} …` is pointer arithmetic — index an array instead"
+
+
+@rule("exceptions", "Prefer ara::core::Result over exceptions",
+      {AUTOSAR: ("Guideline", "Advisory")})
+def _check_exceptions(src, project):
+    toks = src.tokens
+    for i, tok in enumerate(toks):
+        if tok.kind == "keyword" and tok.text in ("throw", "try", "catch"):
+            if tok.text == "throw" and _next(toks, i) == "(" and _prev(toks, i) == ")":
+                continue  # Dynamic exception specification, not a throw
+            yield tok.line, f"`{tok.text}` — return ara::core::Result<T> (or an error code) instead of using exceptions"
+
+
+@rule("override", "Overriders use exactly one of virtual/override/final",
+      {MISRA_CPP: ("Rule 13.3.1", "Required"), AUTOSAR: ("A10-3-1", "Required")})
+def _check_override(src, project):
+    for fn in src.functions:
+        if fn.cls is None or fn.is_ctor:
+            continue
+        marked = {"override", "final"} & fn.specifiers
+        if "virtual" in fn.leading and marked:
+            yield fn.line, f"`{fn.display}` combines `virtual` with `{sorted(marked)[0]}` — keep only `{sorted(marked)[0]}`"
+            continue
+        base = project.inherited_virtuals(fn.cls).get(fn.virtual_key)
+        if base and not marked:
+            yield fn.line, f"`{fn.display}` overrides a virtual of `{base}` without `override`"
+
+
+def _fixed_width_for(words):
+    unsigned = "unsigned" in words
+    if "char" in words:
+        bits = 8
+    elif "short" in words:
+        bits = 16
+    elif "long" in words:
+        bits = 64  # long is 64-bit on the LP64 targets (Linux / QNX on AArch64) the services run on
+    else:
+        bits = 32
+    return f"{'u' if unsigned else ''}int{bits}_t"
+
+
+@rule("fixed-width-types", "Use fixed-width integer types (uint8_t, int32_t, ...)",
+      {MISRA_CPP: ("Rule 6.9.2", "Advisory"), MISRA_C: ("Dir 4.6", "Advisory"), AUTOSAR: ("A3-9-1", "Required")})
+def _check_fixed_width(src, project):
+    toks = src.tokens
+    for i, tok in enumerate(toks):
+        if tok.kind != "keyword" or tok.text not in INT_TYPES or _prev(toks, i) in INT_TYPES | {"char"}:
+            continue
+        j = i
+        while j < len(toks) and toks[j].text in INT_TYPES | {"char"}:
+            j += 1
+        words = [t.text for t in toks[i:j]]
+        if j < len(toks) and toks[j].text == "double":
+            continue  # long double
+        if j + 1 < len(toks) and toks[j].text == "main" and toks[j + 1].text == "(":
+            continue  # int main() is exempt
+        yield tok.line, f"`{' '.join(words)}` — use `{_fixed_width_for(words)}`"
+
+
+def _is_type_word(tok):
+    return (tok.kind == "keyword" and tok.text in BUILTIN_TYPES) or (tok.kind == "ident" and tok.text.endswith("_t"))
+
+
+@rule("c-style-casts", "No C-style casts — use static_cast",
+      {MISRA_CPP: ("Rule 8.2.2", "Required"), AUTOSAR: ("A5-2-2", "Required")})
+def _check_casts(src, project):
+    toks = src.tokens
+    functional_context = {"=", "(", ",", "return", "+", "-", "/", "?", ":", "==", "!=", "<=", ">=", "+=", "-=",
+                          "*=", "/=", "&&", "||", "{", "[", "!"}
+    for i, tok in enumerate(toks):
+        prev = toks[i - 1] if i else None
+        if tok.text == "(":
+            if prev is not None and (prev.kind in ("ident", "number", "string") or prev.text in (")", "]", ">", "operator")
+                                     or (prev.kind == "keyword" and prev.text not in ("return", "case", "else", "do"))):
+                continue
+            close = _match(toks, i, "(", ")")
+            inner = toks[i + 1:close]
+            if (not inner or not any(_is_type_word(t) for t in inner)
+                    or not all(_is_type_word(t) or t.text in ("const", "volatile", "*", "&", "::", "std")
+                               for t in inner)
+                    or [t.text for t in inner] == ["void"] or close + 1 >= len(toks)):
+                continue
+            after = toks[close + 1]
+            if after.kind in ("ident", "number", "string", "char", "keyword") or after.text in ("(", "-", "~", "!", "*", "&"):
+                spelled = " ".join(t.text for t in inner).replace(" *", "*").replace(" :: ", "::")
+                yield tok.line, f"C-style cast `({spelled})` — use static_cast<{spelled}>"
+        elif (_is_type_word(tok) and tok.text != "void" and _next(toks, i) == "("
+              and prev is not None and prev.text in functional_context):
+            yield tok.line, f"functional cast `{tok.text}(…)` — use static_cast<{tok.text}>"
+
+
+@rule("float-suffix", "F suffix on float literals (no implicit double → float conversion)",
+      {MISRA_CPP: ("Rule 5.0.1", "Required")})
+def _check_float_suffix(src, project):
+    toks = src.tokens
+    float_names = set()
+    for i, tok in enumerate(toks):
+        if tok.text == "float":
+            j = i + 1
+            while j < len(toks) and toks[j].text in ("*", "&", "const"):
+                j += 1
+            if j + 1 < len(toks) and toks[j].kind == "ident" and toks[j + 1].text != "(":
+                float_names.add(toks[j].text)
+    for i, tok in enumerate(toks):
+        if tok.kind != "number" or not is_float_literal(tok.text) or tok.text[-1] in "fFlL":
+            continue
+        first, end = src.statement(i)
+        if any(t.text == "float" or (t.kind == "ident" and t.text in float_names) for t in toks[first:end]):
+            yield tok.line, f"`{tok.text}` is a double literal in a float expression — write `{tok.text}F`"
+
+
+@rule("single-exit", "Single return per function",
+      {MISRA_CPP: ("Rule 15.5.1", "Advisory"), MISRA_C: ("Rule 15.5", "Advisory")})
+def _check_single_exit(src, project):
+    for fn in src.functions:
+        if not fn.body:
+            continue
+        returns = [i for i in range(*fn.body) if src.tokens[i].text == "return" and src.owner[i] is fn]
+        if len(returns) > 1:
+            yield src.tokens[returns[1]].line, f"`{fn.display}` has {len(returns)} return statements"
+
+
+def _is_unnamed(param):
+    head = param[:next((k for k, t in enumerate(param) if t.text == "="), len(param))]
+    texts = [t.text for t in head]
+    if not head or texts == ["void"] or "..." in texts or texts[-1] in (")", "]"):
+        return False
+    last = head[-1]
+    if last.kind != "ident":
+        return True  # Ends in a type keyword, `*`, `&` or `>`
+    names, depth, joined = 0, 0, False
+    for tok in head:
+        depth += {"<": 1, ">": -1, ">>": -2}.get(tok.text, 0)
+        if depth > 0 or tok.text in ("<", ">", ">>"):
+            continue
+        if tok.text == "::":
+            joined = True
+        elif tok.kind == "ident" or (tok.kind == "keyword" and tok.text in BUILTIN_TYPES):
+            names += 0 if joined else 1
+            joined = False
+    return names < 2
+
+
+@rule("named-parameters", "All function parameters must be named",
+      {MISRA_CPP: ("Rule 8.4.4", "Required"), MISRA_C: ("Rule 8.2", "Required")})
+def _check_named_parameters(src, project):
+    for fn in src.functions:
+        for n, param in enumerate(fn.params, 1):
+            if _is_unnamed(param):
+                spelled = " ".join(t.text for t in param)
+                yield param[0].line, f"parameter {n} (`{spelled}`) of `{fn.display}` has no name"
+
+
+@rule("goto", "No goto",
+      {MISRA_CPP: ("Rule 9.6.1", "Advisory"), MISRA_C: ("Rule 15.1", "Advisory"), AUTOSAR: ("A6-6-1", "Required")})
+def _check_goto(src, project):
+    for tok in src.tokens:
+        if tok.text == "goto":
+            yield tok.line, "`goto` — restructure with loops / early-exit flags"
+
+
+@rule("recursion", "No recursion",
+      {MISRA_CPP: ("Rule 8.2.10", "Required"), MISRA_C: ("Rule 17.2", "Required"), AUTOSAR: ("A7-5-2", "Required")})
+def _check_recursion(src, project):
+    recursive = project.recursive_functions()
+    for fn in src.functions:
+        path = recursive.get(fn)
+        if path:
+            how = "calls itself" if len(path) == 2 else "is recursive via " + " → ".join(f"`{p}`" for p in path)
+            yield fn.line, f"`{fn.display}` {how}"
+
+
+@rule("include-guards", "All #include guards mandatory",
+      {MISRA_C: ("Dir 4.10", "Required"), AUTOSAR: ("M16-2-3", "Required")})
+def _check_include_guards(src, project):
+    if not src.is_header:
+        return
+    texts = [" ".join(d.text[1:].split()) for d in src.directives[:2]]
+    if texts and texts[0] == "pragma once":
+        return
+    if len(texts) == 2 and texts[0].startswith("ifndef ") and texts[1].startswith("define ") \
+            and texts[0].split()[1] == texts[1].split()[1]:
+        return
+    if texts and texts[0].startswith("if !defined"):
+        return
+    yield 1, f"`{src.name}` has no include guard (#pragma once or #ifndef/#define)"
+
+
+@rule("c-stdio", "No C standard I/O (<cstdio>)",
+      {MISRA_CPP: ("Rule 30.0.1", "Required"), MISRA_C: ("Rule 21.6", "Required")})
+def _check_stdio(src, project):
+    toks = src.tokens
+    for i, tok in enumerate(toks):
+        if tok.kind == "ident" and tok.text in C_IO_FUNCTIONS and _next(toks, i) == "(" and _prev(toks, i) not in (".", "->"):
+            yield tok.line, f"`{tok.text}()` from <cstdio>"
+
+
+@rule("initialized-variables", "All variables must be initialized at declaration",
+      {MISRA_CPP: ("Rule 11.6.2", "Mandatory"), MISRA_C: ("Rule 9.1", "Mandatory"), AUTOSAR: ("A8-5-0", "Required")})
+def _check_initialized(src, project):
+    toks = src.tokens
+    for i, tok in enumerate(toks):
+        if src.stmt_of[i] != i or src.owner[i] is None:
+            continue
+        j = i
+        while j < len(toks) and toks[j].text in QUALIFIERS - {"const", "constexpr"}:
+            j += 1
+        if any(t.text in ("static", "thread_local") for t in toks[i:j]):
+            continue  # Zero-initialized
+        k = j
+        while k < len(toks) and (_is_type_word(toks[k]) or toks[k].text in ("std", "::")):
+            k += 1
+        if k == j or k >= len(toks) or toks[k].kind != "ident" or toks[k - 1].text == "void":
+            continue
+        while k < len(toks) and toks[k].kind == "ident":
+            name, k = toks[k].text, k + 1
+            if k < len(toks) and toks[k].text == "[":
+                k = _match(toks, k, "[", "]") + 1
+            if k >= len(toks) or toks[k].text not in (";", ","):
+                break
+            yield toks[k - 1].line, f"`{name}` is declared without an initializer"
+            if toks[k].text == ";":
+                break
+            k += 1
+
+
+@rule("final-classes", "Use 'final' on classes",
+      {MISRA_CPP: ("Guideline", "Advisory")})
+def _check_final_classes(src, project):
+    for cls in src.classes:
+        if cls.kind != "class" or not cls.name or cls.final or cls.name in project.base_names:
+            continue
+        if any("virtual" in m.leading and not ({"override", "final"} & m.specifiers) for m in cls.methods):
+            continue  # Declares new virtuals: meant to be derived from
+        yield cls.line, f"class `{cls.name}` has no derived classes — declare it `final`"
+
+
+# ============================================================
+# RUNNING CHECKS & REPORTS
+# ============================================================
+
+class ComplianceResult:
+    """Violations of one standard across a set of files, with per-rule counts and a weighted score."""
+
+    def __init__(self, standard, rules, violations, files, seconds):
+        self.standard = standard
+        self.rules = rules
+        self.violations = violations
+        self.files = files
+        self.seconds = seconds
+        self.counts = Counter(v.key for v in violations)
+
+    @property
+    def critical(self):
+        return sum(1 for v in self.violations if v.category in CRITICAL_CATEGORIES)
+
+    @property
+    def compliant(self):
+        return self.critical == 0
+
+    @property
+    def score(self):
+        """Percentage of rules passed, weighted Mandatory 3 / Required 2 / Advisory 1."""
+        total = sum(CATEGORY_WEIGHTS[category] for _, category, _ in self.rules)
+        if not total:
+            return 0
+        passed = sum(CATEGORY_WEIGHTS[category] for _, category, r in self.rules if not self.counts[r.key])
+        return round(100 * passed / total)
+
+
+def _check_file(src, project, rules):
+    found = []
+    for rule_id, category, r in rules:
+        for line, message in r.check(src, project):
+            found.append(Violation(src.name, line, rule_id, category, r.key, message))
+    found.sort(key=lambda v: v.line)
+    return found
+
+
+def check_sources(files, standard):
+    """Check [(file name, code)] against one standard: parse every file, then run the rules per file."""
+    started = time.perf_counter()
+    rules = rules_for(standard)
+    sources = [SourceFile(*f) for f in files]
+    project = Project(sources)
+    violations = [v for src in sources for v in _check_file(src, project, rules)]
+    return ComplianceResult(standard, rules, violations, [name for name, _ in files], time.perf_counter() - started)
+
+
+_FENCE_RE = re.compile(r"^```([\w+-]*)[^\n]*\n(.*?)^```", re.M | re.S)
+_CODE_FENCES = ("", "cpp", "c++", "cxx", "cc", "c", "h", "hpp")
+_FILE_MARKER_RE = re.compile(
+    r"^[ \t]*(?://|/\*)[ \t=*-]*(?:file(?:name)?:[ \t]*)?([\w./-]+\.(?:hpp|hh|hxx|h|cpp|cc|cxx|c))[ \t=*/-]*$",
+    re.M | re.I)
+
+
+def split_sources(text, default_name="main.cpp"):
+    """[(file name, code)] of a generated C++ artifact: fenced blocks and `// name.hpp` marker comments start files."""
+    pieces = []
+    fences = _FENCE_RE.findall(text)
+    blocks = [code for lang, code in fences if lang.lower() in _CODE_FENCES] if fences else [text]
+    for block in blocks:
+        markers = list(_FILE_MARKER_RE.finditer(block))
+        head = block[:markers[0].start()] if markers else block
+        if head.strip():
+            pieces.append((default_name, head))
+        for m, nxt in zip(markers, markers[1:] + [None]):
+            pieces.append((m.group(1).rsplit("/", 1)[-1], block[m.start():nxt.start() if nxt else len(block)]))
+    files, seen = [], Counter()
+    for name, code in pieces:
+        seen[name] += 1
+        if seen[name] > 1:
+            stem, dot, ext = name.rpartition(".")
+            name = f"{stem}_{seen[name]}.{ext}" if dot else f"{name}_{seen[name]}"
+        files.append((name, code))
+    return files
+
+
+@lru_cache(maxsize=32)
+def check_code(text, standard):
+    """Cached check of one generated C++ artifact (pages re-run this on every rerun)."""
+    return check_sources(split_sources(text), standard)
+
+
+def compliance_report(result, max_rows=MAX_REPORTED_VIOLATIONS):
+    """Markdown report: verdict line, one row per rule, then the violations with file and line."""
+    if not result.rules:
+        return f"_No local rule set for {result.standard}._"
+    verdict = "✅ Compliant" if result.compliant else f"❌ {result.critical} required/mandatory violation(s)"
+    lines = [
+        f"**Status:** {verdict} · **Score:** {result.score}% · {len(result.rules)} rules · "
+        f"{len(result.files)} file(s) · checked locally in {result.seconds * 1000:.1f} ms",
+        "",
+        "| Rule | Category | Description | Status |",
+        "|---|---|---|---|",
+    ]
+    for rule_id, category, r in result.rules:
+        n = result.counts[r.key]
+        status = "✅ PASS" if not n else (f"⚠️ ADVISORY ({n})" if category == "Advisory" else f"❌ FAIL ({n})")
+        lines.append(f"| {rule_id} | {category} | {r.title} | {status} |")
+    if result.violations:
+        lines += ["", "### Violations", "", "| File | Line | Rule | Finding |", "|---|---|---|---|"]
+        for v in result.violations[:max_rows]:
+            lines.append(f"| {v.file} | {v.line} | {v.rule_id} | {v.message.replace('|', '¦')} |")
+        if len(result.violations) > max_rows:
+            lines.append(f"\n_…and {len(result.violations) - max_rows} more._")
+    return "\n".join(lines)
@@ -1,6 +1,14 @@
 import streamlit as st
 import time
+import os
+from functools import lru_cache
+import numpy as np
 import plotly.graph_objects as go
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from modules.can_decoder import decode_example, sample_database
+from modules.can_log import LOG_DIR, REPLAY_SPEEDS, SAMPLE_LOG_PATH, CanLog, available_logs
+from modules.telemetry import get_telemetry_engine
+from modules.vss_catalog import get_vss_catalog
 
 # ============================================================
 # SERVICE-AWARE SIGNAL DEFINITIONS
@@ -89,6 +97,28 @@ SERVICE_SIGNAL_PROFILES = {
 }
 
 
+# Every signal the telemetry engine streams (all profiles, so switching service is instant)
+ALL_SIGNALS = [sig for p in SERVICE_SIGNAL_PROFILES.values() for sig in p["primary_signals"]]
+
+DASH_REFRESH_SECONDS = float(os.getenv("GENAUTO_DASH_REFRESH", "1.0"))
+TREND_WINDOW_SECONDS = 30
+TREND_MAX_POINTS = 1500
+PREDICTION_WINDOW_SECONDS = 60
+
+# sample.dbc signal carrying each profile's first primary signal (others show vehicle speed)
+PIPELINE_DBC_SIGNALS = {"tire": "TirePressure_FL_PSI", "battery": "BatteryVoltage"}
+
+# DBC signal -> dashboard VSS path used when replaying recorded CAN logs
+REPLAY_VSS_MAP = {
+    "TirePressure_FL_PSI": "Vehicle.Chassis.Axle.Row1.Wheel.Left.Tire.Pressure",
+    "TirePressure_FR_PSI": "Vehicle.Chassis.Axle.Row1.Wheel.Right.Tire.Pressure",
+    "TirePressure_RL_PSI": "Vehicle.Chassis.Axle.Row2.Wheel.Left.Tire.Pressure",
+    "TirePressure_RR_PSI": "Vehicle.Chassis.Axle.Row2.Wheel.Right.Tire.Pressure",
+    "BatteryVoltage": "Vehicle.Powertrain.TractionBattery.Voltage",
+    "BatterySoC": "Vehicle.Powertrain.TractionBattery.StateOfCharge",
+}
+
+
 def detect_service_type(description):
     """Detect service type from description keywords."""
     desc = description.lower()
@@ -102,7 +132,11 @@ def detect_service_type(description):
 
 
 def init_simulation_data(profile, variant):
-    """Initialize stable simulation values in session_state (NOT random on every render)."""
+    """Initialize stable simulation values in session_state (NOT random on every render).
+    
+    Live signal values and trends come from the telemetry engine; this snapshot only covers
+    the prediction baselines and the core vehicle readouts.
+    """
     import hashlib, struct
     
     key = f"sim_data_{profile['name']}_{variant}"
@@ -111,16 +145,6 @@ def init_simulation_data(profile, variant):
         seed_str = f"{profile['name']}_{variant}_{time.strftime('%Y%m%d%H')}"
         h = hashlib.md5(seed_str.encode()).digest()
         
-        signal_values = []
-        for i, sig in enumerate(profile["primary_signals"]):
-            # Deterministic value within normal range
-            frac = struct.unpack('B', h[i:i+1])[0] / 255.0
-            center = (sig["normal_min"] + sig["normal_max"]) / 2
-            spread = (sig["normal_max"] - sig["normal_min"]) / 2
-            value = center + (frac - 0.5) * spread * 1.2
-            value = max(sig["min"], min(sig["max"], round(value, 1)))
-            signal_values.append(value)
-        
         pred_values = []
         for i, pred in enumerate(profile["predictions"]):
             # Use base value with slight deterministic offset
@@ -128,17 +152,8 @@ def init_simulation_data(profile, variant):
             offset = (frac - 0.5) * pred["base"] * 0.1
             pred_values.append(round(pred["base"] + offset, 1))
         
-        # Generate trend data (deterministic)
-        trend = []
-        base_val = signal_values[0] if signal_values else 32
-        for j in range(50):
-            frac = struct.unpack('B', h[(j % 16):(j % 16)+1])[0] / 255.0
-            trend.append(round(base_val + (frac - 0.5) * 3, 1))
-        
         st.session_state[key] = {
-            "signal_values": signal_values,
             "pred_values": pred_values,
-            "trend": trend,
             "speed": int(struct.unpack('B', h[12:13])[0] / 255.0 * 80 + 40),
             "steering": round((struct.unpack('B', h[13:14])[0] / 255.0 - 0.5) * 60, 1),
             "ev_range": int(struct.unpack('B', h[14:15])[0] / 255.0 * 140 + 180),
@@ -167,64 +182,99 @@ def create_gauge(value, min_val, max_val, color, suffix=""):
     return fig
 
 
-def create_3d_digital_twin(highlight_part):
-    """Generate a high-tech 3D point cloud of the vehicle with active subsystem highlighted."""
-    import numpy as np
-    
-    # Generate vehicle shape (simplified coupe)
-    x, y, z = [], [], []
-    colors = []
-    sizes = []
-    
-    # Grid/Road (Base holographic plane)
-    for i in range(-25, 25, 5):
-        for j in range(-15, 15, 5):
-             x.append(i); y.append(j); z.append(-2); colors.append('#1a202c'); sizes.append(2)
-
-    # Chassis points (BRIGHT GREY for visibility)
-    for i in range(-20, 20, 2):
-        for j in range(-8, 8, 2):
-            # Floor
-            x.append(i); y.append(j); z.append(0); colors.append('#a0aec0'); sizes.append(4)
-            # Roof
-            if -10 < i < 10 and -6 < j < 6:
-                x.append(i); y.append(j); z.append(10); colors.append('#a0aec0'); sizes.append(4)
-    
-    # Wheels (Very bright)
-    wheels = [(-15, -8, 2), (-15, 8, 2), (15, -8, 2), (15, 8, 2)]
-    for wx, wy, wz in wheels:
-        is_highlight = highlight_part == 'tire'
-        c = '#00ffff' if is_highlight else '#e2e8f0' # Cyan or White
-        s = 15 if is_highlight else 8
-        
-        # Draw wheel clusters
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                 x.append(wx+dx); y.append(wy+dy); z.append(wz); colors.append(c); sizes.append(s)
-        
-        # Add glow if highlighted (Huge glow points)
-        if is_highlight:
-             x.append(wx); y.append(wy); z.append(wz); colors.append('#e0f2fe'); sizes.append(35) 
+# ============================================================
+# 3D DIGITAL TWIN GEOMETRY (Vectorized + Memoized)
+# ============================================================
+
+# Mesh density multiplier: 1 = classic look (~300 points), 4 ≈ 5k, 8 ≈ 19k, 12 ≈ 43k points
+TWIN_RESOLUTION = int(os.getenv("GENAUTO_TWIN_RESOLUTION", "1"))
+
+TWIN_PALETTE = np.array([
+    '#1a202c',  # 0 road grid
+    '#a0aec0',  # 1 chassis (BRIGHT GREY for visibility)
+    '#e2e8f0',  # 2 wheel (white)
+    '#00ffff',  # 3 wheel highlighted (cyan)
+    '#e0f2fe',  # 4 wheel glow
+    '#00ff00',  # 5 battery (bright green)
+    '#ccffdd',  # 6 battery glow
+    '#ff9900',  # 7 motor (bright orange)
+    '#ffeebb',  # 8 motor glow
+], dtype=object)
+
+WHEEL_CENTERS = np.array([(-15, -8, 2), (-15, 8, 2), (15, -8, 2), (15, 8, 2)], dtype=np.float32)
+
 
-    # Battery Pack (Bright Green)
+def _plane(x_range, y_range, step, z):
+    """Regular grid of points on a horizontal plane, as an (n, 3) float32 array."""
+    xs = np.arange(x_range[0], x_range[1], step, dtype=np.float32)
+    ys = np.arange(y_range[0], y_range[1], step, dtype=np.float32)
+    gx, gy = np.meshgrid(xs, ys, indexing="ij")
+    return np.stack([gx.ravel(), gy.ravel(), np.full(gx.size, z, dtype=np.float32)], axis=1)
+
+
+@lru_cache(maxsize=32)
+def build_twin_geometry(highlight_part, resolution=1):
+    """Point cloud of the vehicle as read-only (xyz, sizes, color_idx) arrays, built once per part/resolution."""
+    res = max(1, int(resolution))
+    fine = 1.0 / res
+    
+    road = _plane((-25, 25), (-15, 15), 5 * fine, -2)
+    floor = _plane((-20, 20), (-8, 8), 2 * fine, 0)
+    roof = floor[(np.abs(floor[:, 0]) < 10) & (np.abs(floor[:, 1]) < 6)] + np.float32([0, 0, 10])
+    
+    # Wheel clusters: every wheel centre broadcast against a square of offsets
+    offs = np.linspace(-1, 1, 2 * res + 1, dtype=np.float32)
+    ox, oy = np.meshgrid(offs, offs, indexing="ij")
+    offsets = np.stack([ox.ravel(), oy.ravel(), np.zeros(ox.size, dtype=np.float32)], axis=1)
+    wheels = (WHEEL_CENTERS[:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+    
+    is_tire = highlight_part == 'tire'
+    segments = [
+        (road, 0, 2),
+        (floor, 1, 4 / res ** 0.5),
+        (roof, 1, 4 / res ** 0.5),
+        (wheels, 3 if is_tire else 2, (15 if is_tire else 8) / res ** 0.5),
+    ]
+    if is_tire:
+        segments.append((WHEEL_CENTERS, 4, 35))  # Huge glow points
     if highlight_part == 'battery':
-        for i in range(-6, 6, 2):
-            for j in range(-4, 4, 2):
-                x.append(i); y.append(j); z.append(1); colors.append('#00ff00'); sizes.append(10)
-        # Core glow
-        x.append(0); y.append(0); z.append(1); colors.append('#ccffdd'); sizes.append(40)
-    
-    # Motor (Bright Orange)
+        pack = _plane((-6, 6), (-4, 4), 2 * fine, 1)
+        segments += [(pack, 5, 10 / res ** 0.5), (np.float32([[0, 0, 1]]), 6, 40)]
     if highlight_part == 'motor':
-        for j in range(-4, 4, 2):
-            x.append(14); y.append(j); z.append(2); colors.append('#ff9900'); sizes.append(12)
-        # Core glow
-        x.append(14); y.append(0); z.append(2); colors.append('#ffeebb'); sizes.append(40)
+        js = np.arange(-4, 4, 2 * fine, dtype=np.float32)
+        motor = np.stack([np.full(js.size, 14, dtype=np.float32), js, np.full(js.size, 2, dtype=np.float32)], axis=1)
+        segments += [(motor, 7, 12 / res ** 0.5), (np.float32([[14, 0, 2]]), 8, 40)]
+    
+    # Single preallocation, then slice-fill each subsystem
+    total = sum(len(pts) for pts, _, _ in segments)
+    xyz = np.empty((total, 3), dtype=np.float32)
+    sizes = np.empty(total, dtype=np.float32)
+    color_idx = np.empty(total, dtype=np.uint8)
+    start = 0
+    for pts, color, size in segments:
+        end = start + len(pts)
+        xyz[start:end] = pts
+        sizes[start:end] = size
+        color_idx[start:end] = color
+        start = end
+    
+    for arr in (xyz, sizes, color_idx):
+        arr.flags.writeable = False
+    return xyz, sizes, color_idx
+
 
+@st.cache_resource(show_spinner=False, max_entries=32)
+def create_3d_digital_twin(highlight_part, resolution=TWIN_RESOLUTION):
+    """Generate a high-tech 3D point cloud of the vehicle with active subsystem highlighted.
+    
+    The figure is cached per (part, resolution) and shared across reruns and sessions — treat it as read-only.
+    """
+    xyz, sizes, color_idx = build_twin_geometry(highlight_part, resolution)
+    
     fig = go.Figure(data=[go.Scatter3d(
-        x=x, y=y, z=z,
+        x=xyz[:, 0], y=xyz[:, 1], z=xyz[:, 2],
         mode='markers',
-        marker=dict(size=sizes, color=colors, opacity=1.0, line=dict(width=0))
+        marker=dict(size=sizes, color=TWIN_PALETTE[color_idx], opacity=1.0, line=dict(width=0))
     )])
     
     fig.update_layout(
@@ -244,6 +294,130 @@ def create_3d_digital_twin(highlight_part):
     return fig
 
 
+# ============================================================
+# LIVE TELEMETRY FRAGMENTS (Auto-Refresh)
+# ============================================================
+
+def _signal_color(sig, value):
+    if sig["normal_min"] <= value <= sig["normal_max"]:
+        return "#00ff88"
+    elif value < sig["normal_min"]:
+        return "#ffaa00"
+    return "#ff4444"
+
+
+@st.fragment(run_every=DASH_REFRESH_SECONDS)
+def _render_live_gauges(profile):
+    """Gauge grid redrawn from the latest ring-buffer samples without rerunning the page."""
+    engine = get_telemetry_engine(ALL_SIGNALS)
+    sig_cols = st.columns(2)
+    for i, sig in enumerate(profile["primary_signals"]):
+        value = round(engine.latest(sig["vss"]), 1)
+        with sig_cols[i % 2]:
+            st.plotly_chart(create_gauge(value, sig["min"], sig["max"], _signal_color(sig, value), f" {sig['unit']}"),
+                            width="stretch", key=f"gauge_{sig['vss']}")  # Equal readings would otherwise collide
+    st.caption(f"⚡ Streaming at {engine.rate_hz} Hz per signal | {engine.samples_generated:,} samples generated")
+    if engine.replay is not None:
+        rs = engine.replay.stats()
+        state = "finished" if rs["finished"] else "replaying"
+        st.caption(f"📼 {os.path.basename(rs['log_path'])} {state} — {rs['frames']:,} frames, "
+                   f"{rs['position'] or 0:.1f} s into the log, {rs['paths']} signals from CAN")
+
+
+@st.fragment(run_every=DASH_REFRESH_SECONDS)
+def _render_signal_trend(profile):
+    """Trend chart drawn from a zero-copy store window, LTTB-downsampled for plotting."""
+    engine = get_telemetry_engine(ALL_SIGNALS)
+    sig = profile["primary_signals"][0]
+    ts, values = engine.store.plot_view(sig["vss"], TREND_WINDOW_SECONDS, TREND_MAX_POINTS)
+    
+    st.markdown(f"### 📈 Signal Trend — {sig['name']} (Last {TREND_WINDOW_SECONDS} s @ {engine.rate_hz} Hz)")
+    
+    x = ts - (ts[-1] if len(ts) else 0)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=x, y=values, mode="lines", name=sig["name"],
+        line=dict(color="#00e5ff", width=2),
+        fill="tozeroy", fillcolor="rgba(0,229,255,0.1)"
+    ))
+    fig.add_hline(y=sig["normal_max"], line_dash="dash", line_color="#ffaa00",
+                  annotation_text=f"Upper ({sig['normal_max']} {sig['unit']})")
+    fig.add_hline(y=sig["normal_min"], line_dash="dash", line_color="#ff4444",
+                  annotation_text=f"Lower ({sig['normal_min']} {sig['unit']})")
+    
+    fig.update_layout(
+        height=280, paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+        font={"color": "#8b949e"}, xaxis=dict(gridcolor="#21262d", title="Seconds ago"),
+        yaxis=dict(gridcolor="#21262d", title=f"{sig['unit']}"),
+        margin=dict(l=50, r=20, t=20, b=50), showlegend=False
+    )
+    st.plotly_chart(fig)
+
+
+def predict_from_telemetry(profile, baselines, store):
+    """Scale each model baseline by how the last PREDICTION_WINDOW_SECONDS of signals behaved.
+    
+    Out-of-band time and drift away from the band centre raise risk-style predictions
+    (those with `good_below`) and lower health-style ones.
+    """
+    out_of_band, drift = [], []
+    for sig in profile["primary_signals"]:
+        _, values = store.window(sig["vss"], PREDICTION_WINDOW_SECONDS)
+        if len(values) == 0:
+            continue
+        center = (sig["normal_min"] + sig["normal_max"]) / 2
+        half = (sig["normal_max"] - sig["normal_min"]) / 2 or 1.0
+        inside = (values >= sig["normal_min"]) & (values <= sig["normal_max"])
+        out_of_band.append(1.0 - inside.mean())
+        drift.append(min(1.0, abs(float(values.mean()) - center) / half))
+    
+    # Out-of-band share at full weight plus drift at 0.2; no readings at all means no stress
+    stress = 1.0 + ((float(np.mean(out_of_band)) + (0.2 * float(np.mean(drift)))) if drift else 0.0)
+    return [
+        round(base * stress if pred["good_below"] is not None else base / stress, 1)
+        for pred, base in zip(profile["predictions"], baselines)
+    ]
+
+
+def _session_id():
+    """Identifies this browser session as the owner of a replay it starts."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+def _render_log_replay(engine):
+    """Controls for replaying a recorded CAN trace into the live telemetry store."""
+    with st.expander("📼 CAN Log Replay (candump / ASC / CSV)", expanded=engine.replay is not None):
+        st.caption("Memory-mapped, chunked ingestion — decoded with sample.dbc and written into the live signal store")
+        c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
+        logs = available_logs()
+        default = os.path.basename(SAMPLE_LOG_PATH)
+        name = c1.selectbox("Trace file", logs, index=logs.index(default) if default in logs else 0, key="replay_log")
+        speed = c2.selectbox("Speed", list(REPLAY_SPEEDS), key="replay_speed")
+        owner = _session_id()
+        in_control = engine.can_control_replay(owner)
+        if c3.button("▶️ Replay", key="replay_start", disabled=not logs or not in_control):
+            try:
+                engine.start_replay(CanLog(os.path.join(LOG_DIR, name)), sample_database(), REPLAY_VSS_MAP,
+                                    REPLAY_SPEEDS[speed], owner=owner)
+            except (OSError, ValueError, RuntimeError) as e:
+                st.error(f"❌ Cannot replay `{name}`: {e}")
+        if c4.button("⏹️ Stop", key="replay_stop", disabled=engine.replay is None or not in_control):
+            if not engine.stop_replay(owner):
+                st.warning("⏳ Replay is still shutting down — press Stop again in a moment")
+        if not engine.can_control_replay(owner):
+            st.caption("🔒 Another session is replaying a log into the shared signal store")
+        
+        if engine.replay is not None:
+            rs = engine.replay.stats()
+            if rs["error"]:
+                st.error(f"❌ Replay failed: {rs['error']}")
+            st.caption(f"{rs['log_format']} | {rs['log_size_mb']:.1f} MB | indexed {rs['log_indexed_pct']:.0f}% "
+                       f"({rs['log_chunks']} chunks, {rs['log_frames']:,} frames) | "
+                       f"speed {'max' if rs['speed'] is None else str(rs['speed']) + 'x'}")
+
+
 # ============================================================
 # MAIN RENDER
 # ============================================================
@@ -265,6 +439,10 @@ def render():
     # Initialize stable simulation data
     sim = init_simulation_data(profile, variant)
     
+    # Live signal values from the background telemetry engine
+    engine = get_telemetry_engine(ALL_SIGNALS)
+    signal_values = [round(engine.latest(sig["vss"]), 1) for sig in profile["primary_signals"]]
+    
     # --- Top metrics ---
     m1, m2, m3, m4 = st.columns(4)
     m1.metric("Connection", "Active ✅")
@@ -273,6 +451,8 @@ def render():
     m3.metric("Data Latency", f"{latency} ms")
     m4.metric("Service", f"{profile['icon']} {profile['name'][:20]}")
     
+    _render_log_replay(engine)
+    
     st.divider()
 
     # --- DIGITAL TWIN & SIGNALS ---
@@ -280,7 +460,7 @@ def render():
     
     with col_twin:
         st.markdown("##### 🧬 Digital Twin State")
-        st.plotly_chart(create_3d_digital_twin(service_type), use_container_width=True)
+        st.plotly_chart(create_3d_digital_twin(service_type), width="stretch")
         st.caption("Real-time VSS state synchronization")
     
     with col_sigs:
@@ -288,34 +468,26 @@ def render():
         if service_ctx:
             st.caption(f"Source: **{service_ctx['name']}** (Container ID: a1b2c3d4)")
         
-        # Grid of signals
-        sig_cols = st.columns(2)
-        for i, sig in enumerate(profile["primary_signals"]):
-            value = sim["signal_values"][i]
-            
-            if sig["normal_min"] <= value <= sig["normal_max"]:
-                color = "#00ff88"
-            elif value < sig["normal_min"]:
-                color = "#ffaa00"
-            else:
-                color = "#ff4444"
-            
-            with sig_cols[i % 2]:
-                st.plotly_chart(create_gauge(value, sig["min"], sig["max"], color, f" {sig['unit']}"), use_container_width=True)
+        # Grid of signals (auto-refreshing fragment)
+        _render_live_gauges(profile)
 
     
     # --- CORE VEHICLE SIGNALS ---
     st.markdown("### 🚗 Core Vehicle Signals")
     
+    catalog = get_vss_catalog()
+    st.caption(f"📚 VSS catalog: {len(catalog.for_variant(variant))} of {len(catalog)} signals available on {variant}")
+    
     vc1, vc2, vc3, vc4 = st.columns(4)
-    vc1.metric("Speed", f"{sim['speed']} km/h", "VSS: Vehicle.Speed")
-    vc2.metric("Gear", "D", "VSS: Vehicle.Powertrain.Transmission")
+    vc1.metric("Speed", f"{sim['speed']} {catalog.get('Vehicle.Speed')['unit']}", "VSS: Vehicle.Speed")
+    vc2.metric("Gear", "D", "VSS: Vehicle.Powertrain.Transmission.CurrentGear")
     vc3.metric("Steering", f"{sim['steering']}°", "← Left" if sim['steering'] < 0 else "→ Right")
     
-    if variant == "EV":
+    soc_path = "Vehicle.Powertrain.TractionBattery.StateOfCharge.Current"
+    if variant == "EV" and catalog.available("Vehicle.Powertrain.Range", variant):
         vc4.metric("EV Range", f"{sim['ev_range']} km", "VSS: Vehicle.Powertrain.Range")
-    elif variant == "Hybrid":
-        vc4.metric("Battery SoC", f"{min(85, sim['fuel'] + 20)}%", "VSS: Vehicle.Powertrain.Battery.SoC")
+    elif catalog.available(soc_path, variant):
+        vc4.metric("Battery SoC", f"{min(85, sim['fuel'] + 20)}%", f"VSS: {soc_path}")
     else:
         vc4.metric("Fuel Level", f"{sim['fuel']}%", "VSS: Vehicle.Powertrain.FuelSystem")
     
@@ -325,8 +497,9 @@ def render():
     st.markdown(f"### 🤖 AI Predictions — {profile['name']}")
     
     pred_cols = st.columns(len(profile["predictions"]))
+    pred_values = predict_from_telemetry(profile, sim["pred_values"], engine.store)
     for i, pred in enumerate(profile["predictions"]):
-        val = sim["pred_values"][i]
+        val = pred_values[i]
         
         if pred["good_below"] is not None:
             status_icon = "🟢" if val < pred["good_below"] else "🔴"
@@ -340,28 +513,7 @@ def render():
     st.divider()
     
     # --- SIGNAL TREND ---
-    st.markdown(f"### 📈 Signal Trend — {profile['primary_signals'][0]['name']} (Last 50 readings)")
-    
-    sig = profile["primary_signals"][0]
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        y=sim["trend"], mode="lines", name=sig["name"],
-        line=dict(color="#00e5ff", width=2),
-        fill="tozeroy", fillcolor="rgba(0,229,255,0.1)"
-    ))
-    fig.add_hline(y=sig["normal_max"], line_dash="dash", line_color="#ffaa00",
-                  annotation_text=f"Upper ({sig['normal_max']} {sig['unit']})")
-    fig.add_hline(y=sig["normal_min"], line_dash="dash", line_color="#ff4444",
-                  annotation_text=f"Lower ({sig['normal_min']} {sig['unit']})")
-    
-    fig.update_layout(
-        height=280, paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
-        font={"color": "#8b949e"}, xaxis=dict(gridcolor="#21262d", title="Reading"),
-        yaxis=dict(gridcolor="#21262d", title=f"{sig['unit']}"),
-        margin=dict(l=50, r=20, t=20, b=50), showlegend=False
-    )
-    st.plotly_chart(fig)
+    _render_signal_trend(profile)
     
     st.divider()
     
@@ -373,7 +525,7 @@ def render():
     with an1:
         # Score based on actual signal health
         healthy = sum(1 for i, s in enumerate(profile["primary_signals"]) 
-                      if s["normal_min"] <= sim["signal_values"][i] <= s["normal_max"])
+                      if s["normal_min"] <= signal_values[i] <= s["normal_max"])
         score = int(healthy / len(profile["primary_signals"]) * 100)
         
         st.metric("Efficiency Score", f"{score} / 100")
@@ -426,11 +578,17 @@ border-radius:10px;padding:15px;text-align:center;">
     with st.expander("🔄 Data Transformation Pipeline", expanded=False):
         c1, c2, c3, c4 = st.columns(4)
         sig0 = profile['primary_signals'][0]
+        # Encode the live reading into its sample.dbc frame and decode it back
+        dbc_signal = PIPELINE_DBC_SIGNALS.get(service_type)
+        if dbc_signal:
+            vss_path, frame = sig0['vss'], decode_example(sample_database(), dbc_signal, signal_values[0])
+        else:
+            vss_path, frame = "Vehicle.Speed", decode_example(sample_database(), "VehicleSpeed_kmh", sim['speed'])
         with c1:
-            st.markdown(f"**📡 Raw CAN**\n```\nID: 0x185\nBytes: [48 00 1C A0]\n```")
+            st.markdown(f"**📡 Raw CAN**\n```\nID: {frame['can_id']}\nBytes: [{frame['payload']}]\n```")
         with c2:
-            st.markdown(f"**🔢 DBC Decode**\n```\nFactor: 0.01\nOffset: 0\nParsed: Float\n```")
+            st.markdown(f"**🔢 DBC Decode**\n```\nFactor: {frame['factor']}\nOffset: {frame['offset']}\nRaw: {frame['raw']}\n```")
         with c3:
-            st.markdown(f"**🌐 VSS Signal**\n```\n{sig0['vss'][-30:]}\nValue: {sim['signal_values'][0]} {sig0['unit']}\n```")
+            st.markdown(f"**🌐 VSS Signal**\n```\n{vss_path[-30:]}\nValue: {frame['value']} {frame['unit']}\n```")
         with c4:
             st.markdown("**📊 SOME/IP**\n```\nService: 0x1234\nMethod: 0x0001\nPublished ✅\n```")
@@ -0,0 +1,310 @@
+import re
+import struct
+from functools import lru_cache
+
+# ============================================================
+# DBC PARSER (Compiled Message / Signal Index)
+# ============================================================
+# Parses Vector DBC files into messages keyed by (CAN ID, is_extended). Every signal carries its
+# precomputed shift and mask, so decoding a frame is one integer conversion plus a
+# shift/and per signal. Covers BO_/SG_ (incl. simple and extended multiplexing),
+# CM_ comments, VAL_/VAL_TABLE_ value tables, SIG_VALTYPE_ float signals and BA_ attributes.
+
+EXTENDED_ID_FLAG = 0x80000000
+CAN_ID_MASK = 0x1FFFFFFF
+MAX_STANDARD_ID = 0x7FF
+INDEPENDENT_SIG_MSG_ID = 0xC0000000   # VECTOR__INDEPENDENT_SIG_MSG: holds unassigned signals, never on the bus
+
+_MESSAGE_RE = re.compile(r"BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)\s+(\S+)")
+_SIGNAL_RE = re.compile(
+    r"SG_\s+(\w+)\s*(M|m\d+M?)?\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*"
+    r"\(\s*([^,\s]+)\s*,\s*([^)\s]+)\s*\)\s*\[\s*([^|\s]+)\s*\|\s*([^\]\s]+)\s*\]\s*"
+    r"\"((?:[^\"\\]|\\.)*)\"\s*(.*)"
+)
+_COMMENT_RE = re.compile(
+    r"CM_\s+(?:(BU_|BO_|SG_|EV_)\s+(\w+)\s+(?:(\w+)\s+)?)?\"((?:[^\"\\]|\\.)*)\"\s*;", re.S
+)
+_VALUES_RE = re.compile(r"VAL_\s+(\d+)\s+(\w+)\s+((?:-?\d+\s+\"(?:[^\"\\]|\\.)*\"\s*)*);")
+_VALUE_TABLE_RE = re.compile(r"VAL_TABLE_\s+(\w+)\s+((?:-?\d+\s+\"(?:[^\"\\]|\\.)*\"\s*)*);")
+_CHOICE_RE = re.compile(r"(-?\d+)\s+\"((?:[^\"\\]|\\.)*)\"")
+_VALTYPE_RE = re.compile(r"SIG_VALTYPE_\s+(\d+)\s+(\w+)\s*:?\s*([0-3])\s*;")
+_MUX_VAL_RE = re.compile(r"SG_MUL_VAL_\s+(\d+)\s+(\w+)\s+(\w+)\s+([\d\s,\-]+);")
+_ATTRIBUTE_RE = re.compile(r"BA_\s+\"(\w+)\"\s+(?:(BU_|BO_|SG_|EV_)\s+(\w+)\s+(?:(\w+)\s+)?)?(\"[^\"]*\"|[^;\s]+)\s*;")
+
+
+class DbcParseError(Exception):
+    """Raised when a DBC file contains no message definitions at all."""
+
+
+def frame_key(frame_id):
+    """(11/29-bit ID, is_extended) for a raw ID; the extended flag or an ID wider than 11 bits marks an extended frame."""
+    can_id = frame_id & CAN_ID_MASK
+    return can_id, bool(frame_id & EXTENDED_ID_FLAG) or can_id > MAX_STANDARD_ID
+
+
+@lru_cache(maxsize=4096)
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+class Signal:
+    """One SG_ definition plus its compiled bit extraction parameters."""
+
+    __slots__ = ("name", "start", "length", "byte_order", "is_signed", "scale", "offset",
+                 "minimum", "maximum", "unit", "receivers", "is_multiplexer", "mux_ids",
+                 "mux_signal", "value_type", "choices", "comment", "attributes", "shift", "mask")
+
+    def __init__(self, name, start, length, byte_order, is_signed, scale, offset, minimum, maximum, unit, receivers):
+        self.name = name
+        self.start = start
+        self.length = length
+        self.byte_order = byte_order        # "little_endian" (Intel, @1) or "big_endian" (Motorola, @0)
+        self.is_signed = is_signed
+        self.scale = scale
+        self.offset = offset
+        self.minimum = minimum
+        self.maximum = maximum
+        self.unit = unit
+        self.receivers = receivers
+        self.is_multiplexer = False
+        self.mux_ids = None                 # Multiplexer values this signal is present for (None = always)
+        self.mux_signal = None              # Name of the multiplexer switch (extended multiplexing)
+        self.value_type = "integer"         # "integer", "float" or "double" (SIG_VALTYPE_)
+        self.choices = {}
+        self.comment = None
+        self.attributes = {}
+        self.shift = 0
+        self.mask = (1 << length) - 1
+
+    def compile(self, frame_bytes):
+        """Precompute the shift into the frame integer (little-endian int for Intel, big-endian for Motorola)."""
+        if self.byte_order == "little_endian":
+            self.shift = self.start
+            end = self.start + self.length
+        else:
+            # Motorola start bit is the MSB in sawtooth numbering; convert to a linear MSB-first index
+            msb = (self.start // 8) * 8 + (7 - self.start % 8)
+            end = msb + self.length
+            self.shift = frame_bytes * 8 - end
+        if self.shift < 0 or end > frame_bytes * 8:
+            raise ValueError(f"signal {self.name} ({self.start}|{self.length}) does not fit a {frame_bytes}-byte frame")
+
+    @property
+    def layout(self):
+        """DBC-style bit layout, e.g. `0|16@1+`."""
+        return f"{self.start}|{self.length}@{1 if self.byte_order == 'little_endian' else 0}{'-' if self.is_signed else '+'}"
+
+    def raw_value(self, frame_int):
+        raw = (frame_int >> self.shift) & self.mask
+        if self.value_type == "float":
+            return struct.unpack("<f", raw.to_bytes(4, "little"))[0]
+        if self.value_type == "double":
+            return struct.unpack("<d", raw.to_bytes(8, "little"))[0]
+        if self.is_signed and raw >> (self.length - 1):
+            raw -= 1 << self.length
+        return raw
+
+    def physical(self, raw):
+        return raw * self.scale + self.offset
+
+
+class Message:
+    """One BO_ definition with its signals in definition order."""
+
+    def __init__(self, frame_id, name, length, sender):
+        self.frame_id, self.is_extended = frame_key(frame_id)
+        self.name = name
+        self.length = length
+        self.sender = sender
+        self.signals = []
+        self.comment = None
+        self.attributes = {}
+        self.multiplexer = None
+        self.invalid_signals = []
+
+    @property
+    def raw_id(self):
+        """ID with the extended flag set for 29-bit frames (DBC / SocketCAN convention)."""
+        return self.frame_id | EXTENDED_ID_FLAG if self.is_extended else self.frame_id
+
+    @property
+    def cycle_time(self):
+        return self.attributes.get("GenMsgCycleTime")
+
+    def signal(self, name):
+        return next((s for s in self.signals if s.name == name), None)
+
+    def decode(self, data, scaled=True):
+        """Decode one payload into {signal: value}, honouring multiplexing."""
+        data = bytes(data[:self.length]).ljust(self.length, b"\x00")
+        little = int.from_bytes(data, "little")
+        big = int.from_bytes(data, "big")
+        switches = {}
+        for sig in self.signals:
+            if sig.is_multiplexer:
+                switches[sig.name] = sig.raw_value(little if sig.byte_order == "little_endian" else big)
+
+        decoded = {}
+        for sig in self.signals:
+            if sig.mux_ids is not None:
+                switch = switches.get(sig.mux_signal or (self.multiplexer and self.multiplexer.name))
+                if switch not in sig.mux_ids:
+                    continue
+            raw = sig.raw_value(little if sig.byte_order == "little_endian" else big)
+            if not scaled:
+                decoded[sig.name] = raw
+            elif sig.value_type == "integer" and raw in sig.choices:
+                decoded[sig.name] = sig.choices[raw]
+            else:
+                decoded[sig.name] = sig.physical(raw)
+        return decoded
+
+
+class DbcDatabase:
+    """Parsed DBC: messages indexed by CAN ID and by name."""
+
+    def __init__(self):
+        self.version = ""
+        self.nodes = []
+        self.messages = {}        # (frame_id, is_extended) -> Message
+        self.by_name = {}         # message name -> Message
+        self.value_tables = {}
+        self.comment = None
+        self.node_comments = {}
+        self.attributes = {}
+
+    def __len__(self):
+        return len(self.messages)
+
+    def message(self, frame_id):
+        """Message for a raw ID (extended flag honoured); None for unknown IDs and the independent-signal holder."""
+        if frame_id == INDEPENDENT_SIG_MSG_ID:
+            return None
+        return self.messages.get(frame_key(frame_id))
+
+    def iter_signals(self):
+        for msg in self.messages.values():
+            for sig in msg.signals:
+                yield msg, sig
+
+    @property
+    def signal_count(self):
+        return sum(len(m.signals) for m in self.messages.values())
+
+    def decode(self, frame_id, data, scaled=True):
+        msg = self.message(frame_id)
+        return msg.decode(data, scaled) if msg else None
+
+
+def _parse_choices(text):
+    return {int(v): desc for v, desc in _CHOICE_RE.findall(text)}
+
+
+def parse_dbc(text):
+    """Parse DBC source text into a compiled DbcDatabase."""
+    db = DbcDatabase()
+    current = None
+
+    # BO_/SG_ are line-oriented and make up the bulk of real files — dispatch on the line prefix
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("SG_ "):
+            if current is None:
+                continue
+            m = _SIGNAL_RE.match(line)
+            if not m:
+                continue
+            name, mux, start, length, order, sign, scale, offset, lo, hi, unit, receivers = m.groups()
+            sig = Signal(name, int(start), int(length), "little_endian" if order == "1" else "big_endian",
+                         sign == "-", _number(scale), _number(offset), _number(lo), _number(hi),
+                         unit, receivers.replace(",", " ").split())
+            if mux:
+                if mux.endswith("M"):
+                    sig.is_multiplexer = True
+                    current.multiplexer = current.multiplexer or sig
+                if mux.startswith("m"):
+                    sig.mux_ids = {int(mux[1:].rstrip("M"))}
+            current.signals.append(sig)
+        elif line.startswith("BO_ "):
+            m = _MESSAGE_RE.match(line)
+            if not m or int(m.group(1)) == INDEPENDENT_SIG_MSG_ID:
+                current = None
+                continue
+            current = Message(int(m.group(1)), m.group(2), int(m.group(3)), m.group(4))
+            db.messages[current.frame_id, current.is_extended] = current
+            db.by_name[current.name] = current
+        elif line.startswith("VERSION"):
+            db.version = line.partition(" ")[2].strip().strip('"')
+        elif line.startswith("BU_"):
+            db.nodes = line.partition(":")[2].split()
+
+    if not db.messages:
+        raise DbcParseError("no BO_ message definitions found")
+
+    # Trailing sections reference messages by ID and may span lines — match them over the full text
+    for kind, target, sig_name, comment in _COMMENT_RE.findall(text):
+        comment = comment.replace('\\"', '"')
+        if not kind:
+            db.comment = comment
+        elif kind == "BU_":
+            db.node_comments[target] = comment
+        elif kind in ("BO_", "SG_"):
+            msg = db.message(int(target))
+            owner = msg if kind == "BO_" or msg is None else msg.signal(sig_name)
+            if owner is not None:
+                owner.comment = comment
+
+    for name, body in _VALUE_TABLE_RE.findall(text):
+        db.value_tables[name] = _parse_choices(body)
+
+    for frame_id, sig_name, body in _VALUES_RE.findall(text):
+        msg = db.message(int(frame_id))
+        sig = msg.signal(sig_name) if msg else None
+        if sig is not None:
+            sig.choices = _parse_choices(body)
+
+    for frame_id, sig_name, value_type in _VALTYPE_RE.findall(text):
+        msg = db.message(int(frame_id))
+        sig = msg.signal(sig_name) if msg else None
+        if sig is not None and value_type in ("1", "2"):
+            sig.value_type = "float" if value_type == "1" else "double"
+
+    for frame_id, sig_name, switch, ranges in _MUX_VAL_RE.findall(text):
+        msg = db.message(int(frame_id))
+        sig = msg.signal(sig_name) if msg else None
+        if sig is None:
+            continue
+        ids = set()
+        for part in ranges.split(","):
+            lo, _, hi = part.strip().partition("-")
+            if lo:
+                ids.update(range(int(lo), int(hi or lo) + 1))
+        sig.mux_signal, sig.mux_ids = switch, ids
+
+    for attr, kind, target, sig_name, value in _ATTRIBUTE_RE.findall(text):
+        value = value.strip('"') if value.startswith('"') else _number(value)
+        if not kind:
+            db.attributes[attr] = value
+        elif kind in ("BO_", "SG_"):
+            msg = db.message(int(target))
+            owner = msg if kind == "BO_" or msg is None else msg.signal(sig_name)
+            if owner is not None:
+                owner.attributes[attr] = value
+
+    # Compile bit positions; signals that overflow their frame are kept aside rather than failing the file
+    for msg in db.messages.values():
+        valid = []
+        for sig in msg.signals:
+            try:
+                sig.compile(msg.length)
+                valid.append(sig)
+            except ValueError:
+                msg.invalid_signals.append(sig)
+        msg.signals = valid
+        if msg.multiplexer is not None and msg.multiplexer not in valid:
+            msg.multiplexer = None
+
+    return db
@@ -0,0 +1,949 @@
+import hashlib
+import logging
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import streamlit as st
+from dotenv import load_dotenv
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from modules.artifact_patch import PatchError, apply_patch, patch_prompts
+from modules.compliance_check import CHECKER_VERSION, check_code, compliance_report
+from modules.llm_cache import get_response_cache
+from modules.llm_clients import checkout_client, record_client_result, resolve_client
+from modules.llm_router import AllProvidersFailed, record_provider_latency, route_call
+from modules.offline_llm import OFFLINE_API_KEY, get_recorder
+from modules.tracing import new_trace_id, span
+from modules.rate_limiter import (
+    MAX_RETRY_AFTER_SECONDS, RATE_LIMIT_RETRIES, estimate_tokens, get_rate_limiter,
+    parse_rpm, register_quota, retry_after_seconds,
+)
+
+# ============================================================
+# GENERATION ENGINE (Importable, Streamlit-Optional)
+# ============================================================
+# Everything needed to turn a requirement into a project: provider clients with
+# routing/fallback, compliance-aware prompt builders, the artifact DAG scheduler and
+# the static Docker/CMake templates. AI Studio renders on top of it; the batch CLI
+# (modules/batch.py) drives it headless, where toasts become log lines and API keys
+# come from the environment only.
+
+load_dotenv()
+log = logging.getLogger("genauto.engine")
+
+
+def _in_streamlit():
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+
+def _notify(message):
+    """Toast inside the app, log line when running headless."""
+    if _in_streamlit():
+        st.toast(message)
+    else:
+        log.info(message)
+
+
+# ============================================================
+# MULTI-PROVIDER LLM CLIENT
+# ============================================================
+
+PROVIDER_KEY_ENV = {"anthropic": "ANTHROPIC_API_KEY", "groq": "GROQ_API_KEY", "google": "GOOGLE_API_KEY"}
+PROVIDER_LABELS = {"anthropic": "Anthropic", "groq": "Groq", "google": "Google AI", "offline": "Offline (local)"}
+
+FALLBACK_ENGINES = [
+    {"provider": "anthropic", "model": "claude-3-haiku-20240307", "name": "Claude Haiku"},
+    {"provider": "groq", "model": "llama-3.3-70b-versatile", "name": "Llama 3.3 70B"},
+    {"provider": "google", "model": "gemini-2.0-flash", "name": "Gemini 2.0 Flash"},
+]
+
+
+def _get_api_key(provider):
+    """Check session state first (keys entered in the sidebar), then env."""
+    env_key = PROVIDER_KEY_ENV[provider]
+    if _in_streamlit():
+        return st.session_state.get(env_key, os.getenv(env_key, ""))
+    return os.getenv(env_key, "")
+
+
+def get_llm_client(engine_config):
+    """Return the pooled LLM client for the selected engine (built once per process, not per rerun)."""
+    provider = engine_config["provider"]
+    api_key = _get_api_key(provider) if provider in PROVIDER_KEY_ENV else ""
+    if provider == "offline":
+        api_key = OFFLINE_API_KEY  # Local stand-in needs no credentials
+    
+    # Enforce the quota advertised in LLM_ENGINES (e.g. "Free (30 RPM)")
+    register_quota(provider, engine_config.get("model_id"), rpm=parse_rpm(engine_config.get("cost")))
+    
+    if api_key:
+        try:
+            return checkout_client(provider, api_key, engine_config["model_id"])
+        except Exception as e:
+            if _in_streamlit():
+                st.warning(f"⚠️ {PROVIDER_LABELS[provider]} init failed: {e}")
+            else:
+                log.warning("%s init failed: %s", PROVIDER_LABELS[provider], e)
+    
+    return None
+
+
+# Sampling temperature per provider (None = provider default); part of the cache key
+PROVIDER_TEMPERATURE = {"groq": 0.3}
+
+
+def _tokens_used(usage, system_prompt, user_prompt, text):
+    """Tokens an attempt cost: the provider's count when reported, else an estimate of what was produced."""
+    if usage:
+        return (usage.get("input_tokens") or 0) + (usage.get("output_tokens") or 0)
+    return estimate_tokens(system_prompt, user_prompt, text) if text else 0
+
+
+def _record_usage(usage, input_tokens, output_tokens):
+    if usage is not None and input_tokens is not None:
+        usage["input_tokens"], usage["output_tokens"] = input_tokens, output_tokens
+
+
+def _request_provider(llm_info, system_prompt, user_prompt, max_tokens, usage=None):
+    """Direct call to a single provider; provider-reported token counts are written into `usage`."""
+    provider = llm_info["provider"]
+    
+    if provider == "anthropic":
+        response = resolve_client(llm_info).messages.create(
+            model=llm_info["model"],
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_prompt}]
+        )
+        if response.usage:
+            _record_usage(usage, response.usage.input_tokens, response.usage.output_tokens)
+        return response.content[0].text
+    
+    elif provider == "google":
+        full_prompt = f"{system_prompt}\n\n---\n\n{user_prompt}"
+        response = resolve_client(llm_info).generate_content(full_prompt)
+        meta = getattr(response, "usage_metadata", None)
+        if meta:
+            _record_usage(usage, meta.prompt_token_count, meta.candidates_token_count)
+        return response.text
+    
+    elif provider == "groq":
+        response = resolve_client(llm_info).chat.completions.create(
+            model=llm_info["model"],
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=PROVIDER_TEMPERATURE["groq"]
+        )
+        if response.usage:
+            _record_usage(usage, response.usage.prompt_tokens, response.usage.completion_tokens)
+        return response.choices[0].message.content
+    
+    elif provider == "offline":
+        return resolve_client(llm_info).complete(system_prompt, user_prompt, max_tokens, usage)
+
+
+def _stream_provider(llm_info, system_prompt, user_prompt, max_tokens, usage=None):
+    """Streaming call to a single provider — yields text chunks as they arrive (token counts land in `usage`)."""
+    provider = llm_info["provider"]
+    
+    if provider == "anthropic":
+        with resolve_client(llm_info).messages.stream(
+            model=llm_info["model"],
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_prompt}]
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+            final = stream.get_final_message()
+            if final.usage:
+                _record_usage(usage, final.usage.input_tokens, final.usage.output_tokens)
+    
+    elif provider == "google":
+        full_prompt = f"{system_prompt}\n\n---\n\n{user_prompt}"
+        for chunk in resolve_client(llm_info).generate_content(full_prompt, stream=True):
+            meta = getattr(chunk, "usage_metadata", None)
+            if meta:
+                _record_usage(usage, meta.prompt_token_count, meta.candidates_token_count)
+            if chunk.parts and chunk.text:  # .text raises on part-less chunks (usage-only or safety-blocked)
+                yield chunk.text
+    
+    elif provider == "groq":
+        stream = resolve_client(llm_info).chat.completions.create(
+            model=llm_info["model"],
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=PROVIDER_TEMPERATURE["groq"],
+            stream=True
+        )
+        for chunk in stream:
+            # Groq reports usage on the final chunk under x_groq
+            chunk_usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or getattr(chunk, "usage", None)
+            if chunk_usage:
+                _record_usage(usage, chunk_usage.prompt_tokens, chunk_usage.completion_tokens)
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+    
+    elif provider == "offline":
+        yield from resolve_client(llm_info).stream(system_prompt, user_prompt, max_tokens, usage)
+
+
+def _call_provider(llm_info, system_prompt, user_prompt, max_tokens, on_stream=None, trace=None):
+    """Call a single provider, served from the persistent response cache when possible.
+    
+    With `on_stream`, the response is streamed and `on_stream(text_so_far)` is called per chunk.
+    With `trace` (a tracing.Span), the attempt is recorded as one hop of that span.
+    """
+    hop = trace.hop(llm_info["provider"], llm_info["model"]) if trace is not None else {}
+    called = time.time()
+    cache = get_response_cache()
+    key = None
+    if cache is not None:
+        provider = llm_info["provider"]
+        key = cache.make_key(provider, llm_info["model"], system_prompt, user_prompt, max_tokens, PROVIDER_TEMPERATURE.get(provider))
+        cached = cache.get(key)
+        if cached is not None:
+            if on_stream:
+                on_stream(cached)
+            elapsed = round(time.time() - called, 4)
+            hop.update(cache_hit=True, ok=True, wall_s=elapsed, ttft_s=elapsed)
+            return cached
+    
+    limiter = get_rate_limiter(llm_info)
+    reserved = estimate_tokens(system_prompt, user_prompt, max_tokens=max_tokens)
+    usage = {}
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            limiter.acquire(reserved)
+        except Exception as e:  # RateLimitTimeout: nothing was reserved or sent, so nothing to settle
+            hop.update(ok=False, error=str(e)[:200], wall_s=round(time.time() - called, 3))
+            raise  # route_call's dispatch releases any half-open probe slot on the way out
+        started = time.time()
+        text = ""
+        usage.clear()  # Only this attempt's usage settles its reservation
+        try:
+            if on_stream is None:
+                text = _request_provider(llm_info, system_prompt, user_prompt, max_tokens, usage)
+                hop["ttft_s"] = round(time.time() - called, 3)  # No earlier token is visible without streaming
+            else:
+                for chunk in _stream_provider(llm_info, system_prompt, user_prompt, max_tokens, usage):
+                    if not text:
+                        hop["ttft_s"] = round(time.time() - called, 3)
+                    text += chunk
+                    on_stream(text)
+            break
+        except Exception as e:
+            hop["retries"] = attempt
+            wait_s = retry_after_seconds(e)
+            if wait_s is not None:
+                # 429: pause the shared queue for Retry-After and retry here rather than burning fallbacks
+                limiter.settle(reserved, 0, counted=False)
+                limiter.backoff(wait_s)
+                if attempt < RATE_LIMIT_RETRIES and wait_s <= MAX_RETRY_AFTER_SECONDS:
+                    continue
+                hop.update(ok=False, error=str(e)[:200], wall_s=round(time.time() - called, 3))
+                raise  # Quota exhaustion is not an outage — leave the circuit breaker alone
+            limiter.settle(reserved, _tokens_used(usage, system_prompt, user_prompt, text), counted=bool(text or usage))
+            record_client_result(llm_info, e)
+            record_provider_latency(llm_info, time.time() - started, ok=False)
+            hop.update(ok=False, error=str(e)[:200], wall_s=round(time.time() - called, 3))
+            raise
+    limiter.settle(reserved, _tokens_used(usage, system_prompt, user_prompt, text) or estimate_tokens(system_prompt, user_prompt))
+    record_client_result(llm_info)
+    record_provider_latency(llm_info, time.time() - started, ok=True)
+    
+    recorder = get_recorder()
+    if recorder is not None and text and llm_info["provider"] != "offline":
+        # Record mode: capture the real response (and its timing) for offline replay
+        recorder.record(system_prompt, user_prompt, max_tokens, text, llm_info["provider"], llm_info["model"],
+                        usage or None, wall_s=round(time.time() - called, 3), ttft_s=hop.get("ttft_s"))
+    
+    if not usage:
+        # Provider did not report usage: fall back to the rate limiter's estimate
+        usage = {"input_tokens": estimate_tokens(system_prompt, user_prompt),
+                 "output_tokens": estimate_tokens(text or ""), "estimated_tokens": True}
+    hop.update(usage, ok=True, wall_s=round(time.time() - called, 3))
+    
+    if key and text:
+        cache.put(key, llm_info["provider"], llm_info["model"], text)
+    return text
+
+
+def _get_fallback_clients():
+    """Build list of fallback LLM clients from the shared client pool (constructed on first use)."""
+    fallbacks = []
+    
+    for engine in FALLBACK_ENGINES:
+        api_key = _get_api_key(engine["provider"])
+        if api_key:
+            try:
+                fb = checkout_client(engine["provider"], api_key, engine["model"], lazy=True)
+                fb["name"] = engine["name"]
+                fallbacks.append(fb)
+            except Exception:
+                pass
+    
+    return fallbacks
+
+
+def _get_demo_fallback(system_prompt, user_prompt):
+    """Return high-quality pre-canned responses for the main demo scenario (Tire Pressure)."""
+    # Detect if this is the Tire Pressure demo
+    if "Tire" in user_prompt or "Tire" in system_prompt:
+        if "Software Requirements" in system_prompt:
+            return """# Software Requirements Specification (SRS)
+## 1. Introduction
+The Tire Pressure Monitoring Service (TPMS) monitors tire pressure and temperature for all 4 wheels.
+
+## 2. Functional Requirements
+- **SWR-001:** Monitor pressure (psi) and temperature (C) at 1Hz.
+- **SWR-002:** Publish `Vehicle.Chassis.Axle.Row1.Wheel.Left.Tire.Pressure` via SOME/IP.
+- **SWR-003:** Alert if pressure drop > 20% within 1 min (Rapid Deflation).
+- **SWR-004:** ASIL-B compliance for alert signal integrity.
+"""
+        elif "Franca IDL" in system_prompt:
+            return """package common.api
+interface TirePressureService {
+    version { major 1 minor 0 }
+    attribute Float tirePressureFL readonly
+    attribute Float tirePressureFR readonly
+    attribute Float tirePressureRL readonly
+    attribute Float tirePressureRR readonly
+    broadcast pressureAlert {
+        out { String status }
+    }
+}"""
+        elif "C++14" in system_prompt:
+            return """#include <CommonAPI/CommonAPI.hpp>
+#include <vsomeip/vsomeip.hpp>
+#include <iostream>
+
+/* MISRA C++:2023 Compliant */
+namespace genauto {
+namespace services {
+
+class TirePressureService : public CommonAPI::Stub<TirePressureStub> {
+public:
+    TirePressureService() = default;
+    virtual ~TirePressureService() = default;
+
+    void checkPressure(float pressure) {
+        if (pressure < 30.0f) {
+            firePressureAlert("LOW_PRESSURE");
+        }
+    }
+};
+
+} // namespace services
+} // namespace genauto
+"""
+        elif "test cases" in system_prompt.lower():
+            return """import pytest
+from services import TirePressureService
+
+def test_initial_pressure():
+    svc = TirePressureService()
+    assert svc.pressure == 0.0
+
+def test_alert_trigger():
+    svc = TirePressureService()
+    svc.set_pressure(25.0)  # Low
+    assert svc.alert_status == "LOW_PRESSURE"
+"""
+    return None
+
+
+def call_llm(llm_info, system_prompt, user_prompt, max_tokens=2000, on_stream=None):
+    """Universal LLM call with latency-aware routing, automatic fallback & DEMO GUARD.
+    
+    The selected engine and every configured fallback are ranked by the router (fastest healthy
+    provider first, open circuits skipped, slow requests hedged). Pass `on_stream(text_so_far)` to
+    receive partial output while the provider is still generating. The call is traced into the
+    span open on this thread (one per artifact in the generation DAG), or a span of its own.
+    """
+    with span("llm_call") as trace:
+        return _route_llm(llm_info, system_prompt, user_prompt, max_tokens, on_stream, trace)
+
+
+def _demo_response(trace, system_prompt, user_prompt, notice):
+    demo_resp = _get_demo_fallback(system_prompt, user_prompt)
+    if demo_resp:
+        trace.hop("demo", "simulation", ok=True, wall_s=0.0, ttft_s=0.0, input_tokens=0, output_tokens=0)
+        _notify(notice)
+    return demo_resp
+
+
+def _route_llm(llm_info, system_prompt, user_prompt, max_tokens, on_stream, trace):
+    candidates = [llm_info] if llm_info else []
+    for fb in _get_fallback_clients():
+        if not any(fb["provider"] == c["provider"] and fb["model"] == c["model"] for c in candidates):
+            candidates.append(fb)
+    
+    if not candidates:
+        # ---> FINAL DEMO GUARD <---
+        demo_resp = _demo_response(trace, system_prompt, user_prompt, "🛡️ APIs Down — Switched to Simulation Mode")
+        if demo_resp:
+            return demo_resp
+        trace.ok, trace.error = False, "no API key configured"
+        return "[⚠️ No API key configured. Add your key in the sidebar → API Keys section]"
+    
+    try:
+        result, served_by = route_call(
+            candidates,
+            lambda info, stream: _call_provider(info, system_prompt, user_prompt, max_tokens, stream, trace),
+            on_stream,
+        )
+    except AllProvidersFailed as e:
+        # ---> FINAL DEMO GUARD (Last Resort) <---
+        demo_resp = _demo_response(trace, system_prompt, user_prompt, "🛡️ All APIs Failed — Switched to Simulation Mode")
+        if demo_resp:
+            return demo_resp
+        trace.ok, trace.error = False, str(e)[:200]
+        return f"[⚠️ All LLMs failed. Primary error: {e}]"
+    
+    trace.served_by = served_by["provider"]
+    if llm_info and served_by is not llm_info:
+        _notify(f"⚡ Auto-switched to {served_by.get('name', served_by['model'])} (primary slow or unavailable)")
+    return result
+
+
+# ============================================================
+# COMPLIANCE-AWARE SYSTEM PROMPTS
+# ============================================================
+
+def get_compliance_rules(compliance):
+    """Return compliance-specific rules for code generation."""
+    if compliance == "MISRA C++:2023":
+        return """MISRA C++:2023 Rules to follow:
+- Use 'final' on classes, 'const' on all possible variables
+- F suffix on float literals (e.g., 28.0F)
+- No C-style casts — use static_cast, dynamic_cast only
+- Single return per function (Rule 15.5.1)
+- All function parameters must be named (Rule 8.4.4)
+- No dynamic memory after initialization (Rule 18.0.1)
+- No implicit type conversions (Rule 5.0.1)
+- Use fixed-width integers (uint8_t, uint16_t, etc.)
+- Add MISRA rule reference comments on each compliance point"""
+    
+    elif compliance == "MISRA C:2012":
+        return """MISRA C:2012 Rules to follow:
+- No dynamic memory allocation (malloc/free forbidden)
+- No recursion allowed
+- All loops must have a fixed bound
+- No pointer arithmetic except array indexing
+- All variables must be initialized at declaration
+- No implicit type conversions between signed/unsigned
+- Use only approved standard library functions
+- No function pointers (use switch-case dispatch)
+- All #include guards mandatory
+- Add MISRA C rule reference comments"""
+    
+    elif compliance == "AUTOSAR C++14":
+        return """AUTOSAR C++14 Coding Guidelines to follow:
+- Use AUTOSAR ara::com API for service communication
+- Prefer ara::core::Result over exceptions
+- Use ara::core::Future for async operations
+- Follow SOME/IP service discovery patterns
+- Use Smart Pointers (unique_ptr, shared_ptr) — no raw new/delete
+- Use constexpr and noexcept where applicable  
+- Namespace must follow AUTOSAR adaptive package naming
+- Service skeleton/proxy pattern for all interfaces
+- Add AUTOSAR guideline reference comments"""
+    
+    return ""
+
+
+def get_srs_prompt(compliance):
+    return f"""You are an automotive software requirements engineer.
+Given a high-level service description, generate a Software Requirements Specification (SRS) as a markdown table.
+Each requirement must have: ID (SWR-001 format), Priority (Must/Should), Description, ASIL level, Variant applicability.
+Generate exactly 12-15 requirements. Include safety, communication (SOME/IP), data format (COVESA VSS), ML prediction, variant support.
+Compliance standard: {compliance} — include a requirement for compliance.
+Output ONLY the markdown table, no explanations."""
+
+
+def get_franca_prompt():
+    return """You are an automotive middleware expert specializing in SOME/IP and Franca IDL.
+Given a service description and its requirements, generate a complete Franca IDL (.fidl) interface definition.
+Include: package declaration, interface with version, methods with in/out/error parameters, broadcasts for events, attributes.
+Use realistic automotive data types. Output ONLY the Franca IDL code."""
+
+
+def get_arxml_prompt():
+    return """You are an AUTOSAR Adaptive Platform expert.
+Given a service description, generate a valid ARXML service interface manifest.
+Include: AR-PACKAGE, SERVICE-INTERFACE, CLIENT-SERVER-OPERATIONs, EVENTs.
+Use proper AUTOSAR R4.0 namespacing. Output ONLY the XML code."""
+
+
+def get_cpp_prompt(compliance):
+    rules = get_compliance_rules(compliance)
+    return f"""You are a senior C++ automotive software engineer.
+Generate a {compliance}-compliant service implementation using vsomeip for SOME/IP communication.
+
+{rules}
+
+Also:
+- Use COVESA VSS signal paths for vehicle data
+- Include namespace, class definition, constructor, and key methods
+- Include ML prediction integration
+Output ONLY the C++ code with compliance comments."""
+
+
+def get_kotlin_prompt():
+    return """You are an Android automotive HMI developer.
+Generate a Kotlin ViewModel for Android Automotive using MVVM architecture.
+Include: data classes, LiveData, viewModelScope coroutines, SOME/IP event handling.
+Use Material3 patterns. Output ONLY the Kotlin code."""
+
+
+def get_rust_prompt():
+    return """You are a Rust systems programmer specializing in automotive services.
+Generate an async Rust service using tokio for the given automotive service.
+Rules: No unsafe blocks, use Result for error handling, async/await, mpsc channels, proper error types.
+Include structs with Serialize/Deserialize derives. Output ONLY the Rust code."""
+
+
+def get_test_prompt(compliance):
+    return f"""You are a QA engineer for automotive software.
+Generate pytest test cases for the given service. Requirements:
+- Each test class maps to a specific SWR requirement (TestSWR001_xxx format)
+- Include MockVssClient class for SOME/IP simulation
+- Test normal cases, edge cases, and error handling
+- Include {compliance} compliance verification test
+- Add test execution summary comment at bottom showing all tests pass
+Output ONLY the Python test code."""
+
+
+def get_mock_prompt():
+    return """You are an automotive test infrastructure engineer.
+Generate a Python mock SOME/IP service class for testing the given service without real vehicle hardware.
+Include: configurable publish frequency, realistic data generation with noise, fault injection support, subscriber pattern.
+Output ONLY the Python code."""
+
+
+# ============================================================
+# GENERATION DAG (Concurrent Artifact Scheduler)
+# ============================================================
+
+MAX_PARALLEL_GENERATIONS = int(os.getenv("GENAUTO_MAX_PARALLEL", "4"))
+STREAM_REFRESH_SECONDS = 0.15  # How often streamed partial output is redrawn
+
+GENERATION_FAILED_PREFIX = "[⚠️ Generation failed"
+PYTHON_PROTOTYPE_PROMPT = "Generate a Python prototype service. Use asyncio, dataclasses, and type hints. Include main() with example usage."
+
+
+def build_generation_plan(user_prompt, full_context, compliance, target_langs):
+    """Describe every LLM artifact with the upstream artifacts its prompt needs."""
+    plan = [
+        {"key": "srs_output", "label": "SRS", "lang": "markdown", "deps": [],
+         "system": get_srs_prompt(compliance),
+         "user": lambda out: f"Generate SRS for: {full_context}",
+         "max_tokens": 1500},
+        {"key": "franca_output", "label": "Franca IDL", "lang": "java", "deps": ["srs_output"],
+         "system": get_franca_prompt(),
+         "user": lambda out: f"Generate Franca IDL for: {user_prompt}\n\nSRS:\n{out.get('srs_output', '')}",
+         "max_tokens": 1500},
+        {"key": "arxml_output", "label": "ARXML", "lang": "xml", "deps": [],
+         "system": get_arxml_prompt(),
+         "user": lambda out: f"Generate ARXML for: {user_prompt}",
+         "max_tokens": 1500},
+    ]
+    
+    if "C++14" in target_langs:
+        plan.append({"key": "cpp_output", "label": "C++", "lang": "cpp", "deps": ["srs_output"],
+                     "system": get_cpp_prompt(compliance),
+                     "user": lambda out: f"Generate C++ service for: {user_prompt}\n\nSRS:\n{out.get('srs_output', '')}",
+                     "max_tokens": 2500})
+    if "Kotlin" in target_langs:
+        plan.append({"key": "kotlin_output", "label": "Kotlin", "lang": "kotlin", "deps": [],
+                     "system": get_kotlin_prompt(),
+                     "user": lambda out: f"Generate Kotlin ViewModel for: {user_prompt}",
+                     "max_tokens": 2000})
+    if "Rust" in target_langs:
+        plan.append({"key": "rust_output", "label": "Rust", "lang": "rust", "deps": [],
+                     "system": get_rust_prompt(),
+                     "user": lambda out: f"Generate Rust service for: {user_prompt}",
+                     "max_tokens": 2000})
+    if "Python" in target_langs:
+        plan.append({"key": "python_output", "label": "Python", "lang": "python", "deps": [],
+                     "system": PYTHON_PROTOTYPE_PROMPT,
+                     "user": lambda out: f"Generate Python prototype for: {user_prompt}",
+                     "max_tokens": 2000})
+    
+    plan += [
+        {"key": "test_output", "label": "Test Cases", "lang": "python", "deps": ["srs_output"],
+         "system": get_test_prompt(compliance),
+         "user": lambda out: f"Generate tests for: {user_prompt}\n\nSRS:\n{out.get('srs_output', '')}",
+         "max_tokens": 2000},
+        {"key": "mock_output", "label": "Mock Service", "lang": "python", "deps": [],
+         "system": get_mock_prompt(),
+         "user": lambda out: f"Generate mock service for: {user_prompt}",
+         "max_tokens": 1500},
+        # Checked locally by the rule checker, no LLM call; "system" versions the rule set for fingerprints
+        {"key": "misra_output", "label": f"{compliance} Report", "lang": "markdown",
+         "deps": ["cpp_output"] if "C++14" in target_langs else [],
+         "system": f"local {compliance} rule checker v{CHECKER_VERSION}",
+         "user": lambda out: out.get('cpp_output', ''),
+         "local": lambda out: compliance_review(compliance, out.get('cpp_output', '')),
+         "max_tokens": 0},
+    ]
+    return plan
+
+
+def compliance_result(compliance, cpp_text):
+    """Local rule-checker result for a C++ artifact, or None when there is no usable code."""
+    if not cpp_text or cpp_text.startswith(GENERATION_FAILED_PREFIX):
+        return None
+    return check_code(cpp_text, compliance)
+
+
+def compliance_review(compliance, cpp_text):
+    """Markdown {compliance} report of the local rule checker (replaces the LLM review step)."""
+    result = compliance_result(compliance, cpp_text)
+    if result is None:
+        return f"_No C++ code to check — {compliance} review skipped._"
+    return compliance_report(result)
+
+
+def _model_id(llm_info):
+    return f"{llm_info['provider']}:{llm_info['model']}" if llm_info else "demo"
+
+
+def plan_fingerprints(plan, llm_info):
+    """Hash what each step is generated from: model, system prompt, user prompt and upstream fingerprints.
+
+    Upstream artifacts enter the user prompt as placeholders carrying their own fingerprint, so a
+    step's hash changes exactly when its own inputs or anything it is derived from changes.
+    """
+    model = _model_id(llm_info)
+    fingerprints = {}
+    for step in plan:  # Plans list every step after its deps
+        upstream = {dep: f"<{dep}:{fingerprints.get(dep, 'missing')}>" for dep in step["deps"]}
+        digest = hashlib.sha256()
+        for part in (model, step["system"], step["user"](upstream), str(step["max_tokens"])):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        fingerprints[step["key"]] = digest.hexdigest()
+    return fingerprints
+
+
+def stale_outputs(plan, fingerprints, outputs, recorded):
+    """Keys in `outputs` that must be regenerated: changed inputs, failed runs, and everything downstream."""
+    regenerate = set()  # Every step that will run: missing, unrecorded, changed, failed, or built on one of those
+    for step in plan:
+        key = step["key"]
+        if (key not in outputs or recorded.get(key) != fingerprints[key]
+                or outputs[key].startswith(GENERATION_FAILED_PREFIX)
+                or any(dep in regenerate for dep in step["deps"])):
+            regenerate.add(key)
+    return regenerate & outputs.keys()
+
+
+def prompt_basis(step, llm_info):
+    """Hash of the model and system prompt; a previous artifact is only patched when this is unchanged."""
+    return hashlib.sha256(f"{_model_id(llm_info)}\0{step['system']}".encode("utf-8")).hexdigest()
+
+
+def generate_step(llm_info, step, outputs, on_stream=None, trace_id=None):
+    """Patch the step's previous artifact when it has one, otherwise (or if the patch fails) generate it in full."""
+    with span(step["key"], trace_id, label=step["label"]) as trace:
+        if "local" in step:
+            trace.attrs["local"] = True
+            return step["local"](outputs)
+        user_prompt = step["user"](outputs)
+        previous = step.get("previous")
+        if previous:
+            system, patch_user = patch_prompts(step["system"], previous, step["requirement_diff"], user_prompt)
+            try:
+                text = apply_patch(previous, call_llm(llm_info, system, patch_user, step["max_tokens"]), step["lang"])
+                step["patched"] = trace.attrs["patched"] = True
+                return text
+            except PatchError as e:
+                trace.attrs["patch_error"] = str(e)  # Fall back to full regeneration below
+        text = call_llm(llm_info, step["system"], user_prompt, step["max_tokens"], on_stream)
+        if text.startswith("[⚠️"):
+            trace.ok, trace.error = False, text[:200]
+        return text
+
+
+def run_generation_plan(llm_info, plan, outputs, on_complete=None, on_partial=None, max_workers=MAX_PARALLEL_GENERATIONS,
+                        trace_id=None):
+    """Generate every step missing from `outputs`, starting each one as soon as its deps are ready.
+    
+    Independent artifacts (SRS, ARXML, Kotlin, Rust...) run concurrently on a thread pool; downstream
+    steps (Franca, C++, tests, MISRA) are submitted the moment their inputs land. `on_complete(key, text)`
+    and `on_partial(key, text_so_far)` are always invoked on the calling thread, so it is safe to touch
+    st.session_state / placeholders there. Passing `on_partial` switches providers to streaming mode.
+    Every step is traced as one span under `trace_id` (a fresh id when omitted).
+    """
+    trace_id = trace_id or new_trace_id()
+    pending = {step["key"]: step for step in plan if step["key"] not in outputs}
+    running = {}
+    updates = queue.Queue() if on_partial else None
+    
+    # Worker threads inherit the script context so call_llm can read keys / raise toasts
+    ctx = get_script_run_ctx(suppress_warning=True)
+    initializer = (add_script_run_ctx, (None, ctx)) if ctx is not None else (None, ())
+    with ThreadPoolExecutor(max_workers=max_workers, initializer=initializer[0], initargs=initializer[1]) as pool:
+        while pending or running:
+            for key, step in list(pending.items()):
+                if all(dep in outputs for dep in step["deps"]):
+                    on_stream = (lambda text, key=key: updates.put((key, text))) if updates else None
+                    future = pool.submit(generate_step, llm_info, step, outputs, on_stream, trace_id)
+                    running[future] = key
+                    del pending[key]
+            
+            if not running:
+                break  # Remaining steps depend on artifacts outside this plan
+            
+            done, _ = wait(running, timeout=STREAM_REFRESH_SECONDS if updates else None, return_when=FIRST_COMPLETED)
+            
+            # Only the newest partial per step is worth redrawing
+            latest = {}
+            while updates:
+                try:
+                    key, text = updates.get_nowait()
+                except queue.Empty:
+                    break
+                latest[key] = text
+            
+            for future in done:
+                key = running.pop(future)
+                try:
+                    outputs[key] = future.result()
+                except Exception as e:
+                    outputs[key] = f"{GENERATION_FAILED_PREFIX}: {e}]"
+                if on_complete:
+                    on_complete(key, outputs[key])
+            
+            for key, text in latest.items():
+                if key not in outputs:
+                    on_partial(key, text)
+    
+    return outputs
+
+
+# ============================================================
+# STATIC TEMPLATES (Docker — no need for LLM)
+# ============================================================
+
+def get_dockerfile(service_name):
+    sn = service_name.lower().replace(" ", "_")
+    return f'''# ================================================
+# Dockerfile — {service_name}
+# Generated by GenAuto-SDV Studio
+# Base: AUTOSAR Adaptive Runtime (Linux/aarch64)
+# ================================================
+
+FROM ubuntu:22.04 AS builder
+
+RUN apt-get update && apt-get install -y \\
+    build-essential cmake libboost-all-dev libvsomeip3-dev \\
+    && rm -rf /var/lib/apt/lists/*
+
+WORKDIR /app
+COPY src/ ./src/
+COPY include/ ./include/
+COPY CMakeLists.txt .
+COPY models/ ./models/
+
+RUN mkdir build && cd build && \\
+    cmake .. -DCMAKE_BUILD_TYPE=Release \\
+             -DENABLE_MISRA_CHECKS=ON \\
+             -DTARGET_PLATFORM=aarch64 && \\
+    make -j$(nproc)
+
+FROM ubuntu:22.04 AS runtime
+RUN apt-get update && apt-get install -y \\
+    libvsomeip3 libboost-system1.74.0 \\
+    && rm -rf /var/lib/apt/lists/*
+
+WORKDIR /opt/genautomotive
+COPY --from=builder /app/build/{sn} .
+COPY --from=builder /app/models/ ./models/
+COPY config/ ./config/
+
+EXPOSE 30490/udp
+HEALTHCHECK --interval=5s CMD ["./{sn}", "--health"]
+ENTRYPOINT ["./{sn}"]'''
+
+
+def get_docker_compose(service_name):
+    svc = service_name.lower().replace(" ", "-")
+    return f'''version: "3.8"
+
+services:
+  {svc}:
+    build: ./services/{svc}
+    container_name: soa-{svc}
+    network_mode: host
+    restart: unless-stopped
+    environment:
+      - SOMEIP_INSTANCE_ID=0x1234
+      - VSS_SERVER=localhost:55555
+
+  diagnostic-aggregator:
+    build: ./services/diagnostic_aggregator
+    container_name: soa-diagnostics
+    depends_on: [{svc}]
+
+  hmi-dashboard:
+    build: ./services/hmi_dashboard
+    container_name: soa-hmi
+    ports: ["8080:8080"]
+    depends_on: [diagnostic-aggregator]'''
+
+
+def get_build_log(service_name, critical_violations=0):
+    t = time.strftime('%H:%M:%S')
+    return f"""[{t}] 🔧 Starting build: {service_name}
+[{t}] 📦 Resolving dependencies...
+[{t}]   ✅ libvsomeip3-dev (3.3.8)
+[{t}]   ✅ libboost-all-dev (1.74.0)
+[{t}]   ✅ cmake (3.22.1)
+[{t}] ⚙️ Compiling src/{service_name.replace(' ','')}Service.cpp...
+[{t}]   🛡️ MISRA Check: {critical_violations} critical violations
+[{t}] 🔗 Linking {service_name.lower().replace(' ','_')}...
+[{t}] ✅ Build successful — Binary: 2.3 MB
+[{t}] 🐳 Packaging Docker image: soa-{service_name.lower().replace(' ','-')}:latest
+[{t}] ✅ Image built: 89 MB (multi-stage optimized)
+[{t}] 🏥 Health check... ✅ Service responding on port 30490
+[{t}] 🚀 Ready for OTA deployment!"""
+
+
+# ============================================================
+# REFINEMENT QUESTIONS
+# ============================================================
+
+REFINEMENT_QUESTIONS = [
+    {"question": "What vehicle types should this service support?", "options": ["ICE Only", "Hybrid Only", "EV Only", "All Variants"], "default": 3},
+    {"question": "What is the Safety Integrity Level (ASIL)?", "options": ["QM (No Safety)", "ASIL-A", "ASIL-B", "ASIL-C", "ASIL-D"], "default": 2},
+    {"question": "Primary communication protocol?", "options": ["SOME/IP (Automotive)", "REST/HTTP (IT)", "Both (Gateway)"], "default": 2},
+    {"question": "Do you have legacy CAN/DBC data to import?", "options": ["No, use COVESA VSS only", "Yes, I have a .dbc file"], "default": 1},
+]
+
+
+# ============================================================
+# PROJECT ASSEMBLY (Context, Naming, Packaged Files)
+# ============================================================
+
+def default_refinements():
+    """{question: answer} with every refinement question at its default option."""
+    return {q["question"]: q["options"][q["default"]] for q in REFINEMENT_QUESTIONS}
+
+
+def build_full_context(user_prompt, refinements, compliance, target_langs, dbc_signals=None):
+    """SRS context from the requirement, refinement answers ({question: answer}), compliance, languages and DBC signals."""
+    refinement_context = "".join(f"{question}: {answer}\n" for question, answer in refinements.items())
+    
+    dbc_context = ""
+    if dbc_signals is not None:
+        dbc_context = "\n\nLegacy CAN signals imported from DBC:\n"
+        for sig in dbc_signals[:5]:
+            dbc_context += f"- {sig['can_signal']} ({sig['can_id']}) → VSS: {sig['vss_path']}\n"
+    
+    return f"""Service Description: {user_prompt}
+
+Refinement:
+{refinement_context}
+Compliance Standard: {compliance}
+Target Languages: {', '.join(target_langs)}
+{dbc_context}"""
+
+
+def service_name_for(user_prompt):
+    """Short service name taken from a "Create a X that ..." requirement."""
+    service_name = user_prompt.split(" that ")[0].replace("Create a ", "").replace("Create an ", "").strip()
+    if not service_name or len(service_name) > 60:
+        service_name = "VehicleService"
+    return service_name
+
+
+def service_slug(service_name):
+    return service_name.replace(" ", "_").lower()[:25]
+
+
+# Generated artifact -> path inside the project (and an optional header wrapper)
+PROJECT_ARTIFACTS = [
+    ("srs_output", "docs/SRS.md", "# Software Requirements Specification\n\n{text}"),
+    ("franca_output", "interfaces/service.fidl", "{text}"),
+    ("arxml_output", "interfaces/service.arxml", "{text}"),
+    ("cpp_output", "src/main.cpp", "{text}"),
+    ("kotlin_output", "android/ServiceHMI.kt", "{text}"),
+    ("rust_output", "rust_service/src/main.rs", "{text}"),
+    ("test_output", "tests/test_service.py", "{text}"),
+    ("misra_output", "reports/misra_report.md", "# {compliance} Report\n\n{text}"),
+]
+
+
+def get_readme(service_name, user_prompt, target_langs, compliance, llm_model_name):
+    svc_snake = service_slug(service_name)
+    return f"""# {service_name}
+> Auto-generated by **GenAuto-SDV Studio v2.0** | Team Greenbytes (DTU)
+
+## Overview
+{user_prompt}
+
+## Tech Stack
+- **Languages:** {', '.join(target_langs)}
+- **Compliance:** {compliance}
+- **Protocols:** SOME/IP, COVESA VSS, REST
+- **AI Engine:** {llm_model_name}
+
+## Build & Run
+```bash
+docker build -t genautomotive/{svc_snake} .
+docker run -p 30490:30490/udp genautomotive/{svc_snake}
+```
+
+## Test
+```bash
+pytest tests/ -v --cov
+```
+
+---
+*Generated on {time.strftime('%Y-%m-%d %H:%M')} by GenAuto-SDV Studio*
+"""
+
+
+def get_cmakelists(service_name, compliance):
+    svc_snake = service_slug(service_name)
+    return f"""cmake_minimum_required(VERSION 3.16)
+project({svc_snake} VERSION 1.0.0 LANGUAGES CXX)
+
+set(CMAKE_CXX_STANDARD 14)
+set(CMAKE_CXX_STANDARD_REQUIRED ON)
+
+option(ENABLE_MISRA_CHECKS "Enable {compliance} checks" ON)
+
+find_package(Boost REQUIRED COMPONENTS system)
+find_package(vsomeip3 REQUIRED)
+
+add_executable(${{PROJECT_NAME}} src/main.cpp)
+target_link_libraries(${{PROJECT_NAME}} PRIVATE vsomeip3 Boost::system)
+
+install(TARGETS ${{PROJECT_NAME}} DESTINATION bin)
+"""
+
+
+def project_files(service_name, user_prompt, target_langs, compliance, llm_model_name, outputs):
+    """(path, content) for every file of the downloadable project, rooted at the service slug."""
+    root = service_slug(service_name)
+    files = [(f"{root}/README.md", get_readme(service_name, user_prompt, target_langs, compliance, llm_model_name))]
+    for key, path, template in PROJECT_ARTIFACTS:
+        if key in outputs:
+            files.append((f"{root}/{path}", template.format(text=outputs[key], compliance=compliance)))
+    files += [
+        (f"{root}/Dockerfile", get_dockerfile(service_name)),
+        (f"{root}/docker-compose.yml", get_docker_compose(service_name)),
+        (f"{root}/CMakeLists.txt", get_cmakelists(service_name, compliance)),
+    ]
+    return files
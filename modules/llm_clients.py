@@ -0,0 +1,143 @@
+import hashlib
+import threading
+import time
+
+# ============================================================
+# PROCESS-WIDE LLM CLIENT REGISTRY
+# ============================================================
+# SDK clients own HTTP connection pools (httpx keep-alive). Building them once per
+# (provider, api key, model) and sharing them across reruns and sessions avoids paying
+# SDK construction and TLS handshakes on every widget interaction.
+
+CLIENT_REBUILD_AFTER_FAILURES = 3  # Drop a client (and its pool) after this many consecutive errors
+
+
+def _key_hash(api_key):
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _build_client(provider, api_key, model):
+    """Construct the provider SDK client (imports are deferred until first use)."""
+    if provider == "anthropic":
+        import anthropic
+        return anthropic.Anthropic(api_key=api_key)
+    elif provider == "groq":
+        from groq import Groq
+        return Groq(api_key=api_key)
+    elif provider == "google":
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel(model)
+    elif provider == "offline":
+        from modules.offline_llm import OfflineClient
+        return OfflineClient(model)
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+class PooledClient:
+    """One lazily-built SDK client plus its health counters."""
+
+    def __init__(self, provider, api_key, model):
+        self.provider = provider
+        self.model = model
+        self.key_hash = _key_hash(api_key)
+        self._api_key = api_key
+        self._client = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_used = None
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = _build_client(self.provider, self._api_key, self.model)
+                self.builds += 1
+            return self._client
+
+    def record_success(self):
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.last_used = time.time()
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error)[:200]
+            self.last_used = time.time()
+            # A run of errors may mean a poisoned connection pool — rebuild on next use
+            if self.consecutive_failures >= CLIENT_REBUILD_AFTER_FAILURES:
+                self._client = None
+
+    @property
+    def healthy(self):
+        return self.consecutive_failures < CLIENT_REBUILD_AFTER_FAILURES
+
+    def stats(self):
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "key": self.key_hash[:8],
+            "built": self._client is not None,
+            "builds": self.builds,
+            "successes": self.successes,
+            "failures": self.failures,
+            "healthy": self.healthy,
+            "last_error": self.last_error,
+        }
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_pooled_client(provider, api_key, model):
+    """Return the shared registry entry for (provider, api key hash, model)."""
+    pool_key = (provider, _key_hash(api_key), model)
+    with _registry_lock:
+        entry = _registry.get(pool_key)
+        if entry is None:
+            entry = _registry[pool_key] = PooledClient(provider, api_key, model)
+        return entry
+
+
+def checkout_client(provider, api_key, model, lazy=False):
+    """Build the `llm_info` dict used by the studio, backed by a pooled client.
+    
+    The SDK client itself is never stored in `llm_info`: `resolve_client` asks the pool on
+    every request, so a client rebuilt after repeated failures replaces the old one everywhere.
+    Without `lazy=True` it is built up front so init errors surface at checkout; with it, only
+    when a request is actually sent, so listing fallbacks costs nothing on the happy path.
+    """
+    entry = get_pooled_client(provider, api_key, model)
+    if not lazy:
+        _ = entry.client  # Build now so init errors surface at checkout
+    return {"provider": provider, "model": model, "pool_entry": entry}
+
+
+def resolve_client(llm_info):
+    """Return the pool's current SDK client for an `llm_info`, (re)building it if needed."""
+    return llm_info["pool_entry"].client
+
+
+def record_client_result(llm_info, error=None):
+    """Feed the outcome of a real provider request back into the pool's health tracking."""
+    entry = llm_info.get("pool_entry")
+    if entry is None:
+        return
+    if error is None:
+        entry.record_success()
+    else:
+        entry.record_failure(error)
+
+
+def client_pool_stats():
+    with _registry_lock:
+        entries = list(_registry.values())
+    return [entry.stats() for entry in entries]
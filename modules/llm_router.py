@@ -0,0 +1,262 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+
+# ============================================================
+# LATENCY-AWARE PROVIDER ROUTING (Circuit Breaker + Hedging)
+# ============================================================
+
+STATS_WINDOW = 50                 # Rolling samples kept per provider/model
+BREAKER_FAILURE_THRESHOLD = 3     # Consecutive failures before the circuit opens
+BREAKER_COOLDOWN_SECONDS = 30     # Open circuit rejects requests for this long, then allows one probe
+PRIMARY_BIAS = 1.25               # Selected engine keeps priority unless others are >25% faster
+HEDGE_MIN_SAMPLES = 5             # Below this, hedge after HEDGE_DEFAULT_SECONDS instead of measured p95
+HEDGE_DEFAULT_SECONDS = float(os.getenv("GENAUTO_HEDGE_AFTER", "20"))
+HEDGING_ENABLED = os.getenv("GENAUTO_HEDGING", "1").lower() not in ("0", "false", "no")
+
+
+class CircuitOpenError(Exception):
+    """Raised for a candidate whose circuit closed to new requests between ordering and dispatch."""
+
+
+class AllProvidersFailed(Exception):
+    """Raised when every routed provider errored; `errors` holds (llm_info, exception) pairs."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(str(errors[0][1]) if errors else "no providers available")
+
+
+class ProviderHealth:
+    """Rolling latency / error statistics and circuit breaker for one provider+model."""
+
+    def __init__(self, provider, model):
+        self.provider = provider
+        self.model = model
+        self.samples = deque(maxlen=STATS_WINDOW)  # (latency_seconds, ok)
+        self.ewma = None
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.samples.append((latency, ok))
+            if ok:
+                self.ewma = latency if self.ewma is None else 0.7 * self.ewma + 0.3 * latency
+                self.consecutive_failures = 0
+                self.opened_at = None
+            else:
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+                    self.opened_at = time.time()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at < BREAKER_COOLDOWN_SECONDS:
+            return "open"
+        return "half-open"
+
+    def allow_request(self):
+        """Closed: always. Open: never. Half-open: only while no probe is in flight. Read-only."""
+        with self._lock:
+            state = self.state
+            return state == "closed" or (state == "half-open" and not self.probe_in_flight)
+
+    def claim(self):
+        """Take the right to send one request now: False if closed (no slot needed), True if this
+        request is the half-open probe, None if the circuit is open or another probe holds the slot."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return False
+            if state == "half-open" and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return None
+
+    def release_probe(self):
+        with self._lock:
+            self.probe_in_flight = False
+
+    def percentile(self, pct):
+        latencies = sorted(lat for lat, ok in list(self.samples) if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))]
+
+    def error_rate(self):
+        samples = list(self.samples)
+        return sum(1 for _, ok in samples if not ok) / len(samples) if samples else 0.0
+
+    def hedge_budget(self):
+        ok_samples = sum(1 for _, ok in list(self.samples) if ok)
+        if ok_samples < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_SECONDS
+        return self.percentile(95)
+
+    def stats(self):
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "state": self.state,
+            "samples": len(self.samples),
+            "ewma": self.ewma,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "error_rate": self.error_rate(),
+        }
+
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def get_health(llm_info):
+    key = (llm_info["provider"], llm_info["model"])
+    with _health_lock:
+        health = _health.get(key)
+        if health is None:
+            health = _health[key] = ProviderHealth(*key)
+        return health
+
+
+def record_provider_latency(llm_info, latency, ok):
+    """Feed one real (non-cached) provider request into routing statistics."""
+    get_health(llm_info).record(latency, ok)
+
+
+def order_candidates(candidates):
+    """Healthy providers, fastest first; the first candidate (selected engine) gets PRIMARY_BIAS.
+
+    Providers with no measurements keep their configured order behind measured ones, except the
+    selected engine, which is always tried first until it has data. Only reads breaker state: the
+    half-open probe slot is claimed by `_dispatch` when a request is actually sent.
+    """
+    allowed = [(i, info) for i, info in enumerate(candidates) if get_health(info).allow_request()]
+    if not allowed:
+        allowed = list(enumerate(candidates))  # Every circuit is open — still try rather than fail blind
+
+    def score(pair):
+        i, info = pair
+        ewma = get_health(info).ewma
+        if ewma is None:
+            return (0, 0.0, i) if i == 0 else (1, 0.0, i)
+        return (0, ewma / PRIMARY_BIAS if i == 0 else ewma, i)
+
+    return [info for _, info in sorted(allowed, key=score)]
+
+
+def _dispatch(call, info, on_stream, forced=False):
+    """Send one attempt, holding the provider's half-open probe slot (if it needs one) until it returns.
+
+    The slot is released however the attempt ends — response, cache hit, 429 or limiter timeout.
+    With `forced` (every circuit open) the attempt is sent even without a slot.
+    """
+    health = get_health(info)
+    probe = health.claim()
+    if probe is None and not forced:
+        raise CircuitOpenError(f"{info['provider']}/{info['model']}: circuit open")
+    try:
+        return call(info, on_stream)
+    finally:
+        if probe:
+            health.release_probe()
+
+
+def _start_attempt(*args):
+    """Run one attempt on its own thread. A shared bounded pool would queue the leader behind other
+    sessions' calls, and that queueing would count against its hedge budget."""
+    future = Future()
+
+    def _run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(_dispatch(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=_run, name="llm-route", daemon=True).start()
+    return future
+
+
+def route_call(candidates, call, on_stream=None):
+    """Run `call(llm_info, on_stream)` against the best provider, hedging and failing over as needed.
+
+    If the leading request has not answered within that provider's p95 latency, the next provider is
+    started in parallel and whichever succeeds first wins. Only one attempt at a time forwards
+    streamed text to `on_stream`. Returns (text, llm_info_that_served_it).
+    """
+    ordered = order_candidates(candidates)
+    forced = not any(get_health(info).allow_request() for info in ordered)
+    if len(ordered) == 1 or not HEDGING_ENABLED:
+        errors = []
+        for info in ordered:
+            try:
+                return _dispatch(call, info, on_stream, forced), info
+            except Exception as e:
+                errors.append((info, e))
+        raise AllProvidersFailed(errors)
+
+    lock = threading.Lock()
+    stream_owner = [None]
+    finished = [False]
+
+    def _stream_for(info):
+        def _forward(text):
+            with lock:
+                if finished[0]:
+                    return
+                if stream_owner[0] is None:
+                    stream_owner[0] = id(info)
+                if stream_owner[0] != id(info):
+                    return
+            on_stream(text)
+        return _forward if on_stream else None
+
+    in_flight = {}
+    errors = []
+    next_idx = 0
+
+    def _start_next():
+        nonlocal next_idx
+        info = ordered[next_idx]
+        next_idx += 1
+        in_flight[_start_attempt(call, info, _stream_for(info), forced)] = info
+        return info
+
+    leader = _start_next()
+    while in_flight:
+        budget = get_health(leader).hedge_budget() if next_idx < len(ordered) else None
+        done, _ = wait(in_flight, timeout=budget, return_when=FIRST_COMPLETED)
+        if not done:
+            leader = _start_next()  # Hedge: leader is slower than its p95
+            continue
+        for future in done:
+            info = in_flight.pop(future)
+            try:
+                text = future.result()
+            except Exception as e:
+                errors.append((info, e))
+                with lock:
+                    if stream_owner[0] == id(info):
+                        stream_owner[0] = None
+                continue
+            with lock:
+                finished[0] = True
+            return text, info
+        if not in_flight and next_idx < len(ordered):
+            leader = _start_next()
+
+    raise AllProvidersFailed(errors)
+
+
+def routing_stats():
+    with _health_lock:
+        entries = list(_health.values())
+    return [health.stats() for health in entries]
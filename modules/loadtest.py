@@ -0,0 +1,333 @@
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+try:
+    import psutil
+except ImportError:  # RSS falls back to /proc (Linux) or the peak from getrusage
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# ============================================================
+# MULTI-SESSION LOAD TEST (AppTest Sessions in One Server Process)
+# ============================================================
+# Every simulated user is an AppTest driving app.py through the same scenario a
+# presenter would: AI Studio generation, the dashboard, the KPI ROI sliders and an OTA
+# deployment. Sessions run concurrently on threads of this process, so they share the
+# caches, the client pool and the rate limiter exactly like sessions of one Streamlit
+# server. LLM calls go to the offline provider (no network, simulated latency).
+# Each AppTest.run() is one rerun; its wall time is the rerun latency. A sampler
+# thread records process RSS and CPU while the sessions run.
+#
+#   python -m modules.loadtest --sessions 8 --iterations 2 --json loadtest.json
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+RERUN_TIMEOUT_SECONDS = 300
+SAMPLE_INTERVAL_SECONDS = 0.25
+OFFLINE_ENGINE = "Offline Replay (Local)"
+PAGES = {"studio": "🧠 AI Development Studio", "dashboard": "📊 Vehicle Health Dashboard", "kpi": "📈 KPI & Benchmarks",
+         "ota": "🔄 OTA & Subscriptions"}
+GENERATE_BUTTON = "🚀 Analyze & Generate Full Pipeline"
+OTA_BUTTON = "🚀 Execute OTA Deployment"
+ROI_SLIDERS = {"Services per Year": (10, 200), "Avg Engineer Cost ($/hr)": (30, 150)}
+PERCENTILES = (50, 95, 99)
+
+
+def _rss_bytes():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB elsewhere
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    return None
+
+
+class ResourceSampler:
+    """Background thread sampling process RSS and CPU utilisation."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.rss = []
+        self.cpu_percent = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="genauto-loadtest-sampler", daemon=True)
+
+    def _run(self):
+        last_wall, last_cpu = time.perf_counter(), time.process_time()
+        while not self._stop.wait(self.interval):
+            wall, cpu = time.perf_counter(), time.process_time()
+            self.cpu_percent.append(100 * (cpu - last_cpu) / max(wall - last_wall, 1e-9))
+            last_wall, last_cpu = wall, cpu
+            rss = _rss_bytes()
+            if rss is not None:
+                self.rss.append(rss)
+
+    def __enter__(self):
+        self.started_wall, self.started_cpu = time.perf_counter(), time.process_time()
+        self.baseline_rss = _rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.wall_s = time.perf_counter() - self.started_wall
+        self.cpu_s = time.process_time() - self.started_cpu
+
+
+def _percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    rank = max(1, -(-pct * len(ordered) // 100))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def latency_summary(values):
+    ordered = sorted(values)
+    summary = {"count": len(ordered)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_s"] = _percentile(ordered, pct)
+    summary["mean_s"] = statistics.fmean(ordered) if ordered else None
+    summary["max_s"] = ordered[-1] if ordered else None
+    return summary
+
+
+class SimulatedSession:
+    """One user clicking through the app; every rerun is timed under the action that caused it."""
+
+    def __init__(self, index, unique_prompts=True):
+        from streamlit.testing.v1 import AppTest
+        self.index = index
+        self.unique_prompts = unique_prompts
+        self.at = AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT_SECONDS)
+        self.reruns = []  # (action, seconds, ok)
+        self.errors = []
+
+    def _rerun(self, action, interaction=None):
+        started = time.perf_counter()
+        try:
+            (interaction or self.at).run()
+            ok = not self.at.exception
+            if not ok:
+                self.errors.append(f"{action}: {self.at.exception[0].message}")
+        except Exception as e:  # Timeouts surface as RuntimeError from AppTest
+            ok = False
+            self.errors.append(f"{action}: {e}")
+        self.reruns.append((action, time.perf_counter() - started, ok))
+        return ok
+
+    def _widget(self, kind, label):
+        return next(w for w in getattr(self.at, kind) if w.label == label)
+
+    def _goto(self, page):
+        return self._rerun(f"page:{page}", self._widget("radio", "Navigate").set_value(PAGES[page]))
+
+    def scenario(self, iteration):
+        at = self.at
+        if iteration == 0:
+            if not self._rerun("initial_load"):
+                return
+            self._rerun("select_engine", self._widget("selectbox", "LLM Engine").set_value(OFFLINE_ENGINE))
+        else:
+            self._goto("studio")
+        if self.unique_prompts:
+            # Distinct requirements per session/iteration, so responses are not served from the shared cache
+            prompt = at.text_area[0]
+            base = prompt.value.split("\n\n[load test")[0]
+            prompt.set_value(f"{base}\n\n[load test session {self.index}, iteration {iteration}]")
+        self._rerun("generate_pipeline", self._widget("button", GENERATE_BUTTON).click())
+        self._goto("dashboard")
+        self._goto("kpi")
+        for offset, (label, (low, high)) in enumerate(ROI_SLIDERS.items()):
+            value = low + (self.index * 17 + iteration * 31 + offset * 7) % (high - low + 1)
+            self._rerun("roi_slider", self._widget("slider", label).set_value(value))
+        self._goto("ota")
+        self._rerun("run_ota", self._widget("button", OTA_BUTTON).click())
+
+    def run(self, iterations, start_delay=0.0):
+        time.sleep(start_delay)
+        for iteration in range(iterations):
+            try:
+                self.scenario(iteration)
+            except StopIteration:  # A widget the scenario needs did not render
+                self.errors.append(f"iteration {iteration}: expected widget missing")
+                break
+            except Exception as e:
+                self.errors.append(f"iteration {iteration}: {e!r}")
+                break
+        return self
+
+
+def configure_offline_llm(latency, tokens_per_s):
+    from modules.offline_llm import set_offline_profile
+    return set_offline_profile(latency=latency, tokens_per_s=tokens_per_s)
+
+
+@contextmanager
+def _shared_server_state():
+    """Make concurrent AppTests share per-server state the way sessions of one server do.
+
+    AppTest recompiles app.py on every run (concurrent compiles also trip CPython 3.11's AST
+    recursion check) and installs, then clears, a process-global Runtime around each run, which
+    would pull the Runtime out from under the other sessions. Here the script is compiled once and
+    the most recently installed Runtime stays visible while any session is running.
+
+    Each run also patches the process-global config.get_option to set global.appTest. Overlapping
+    runs unwind those patches out of order, so a session can finish its run with the real
+    get_option back in place: its selectbox/radio values are never recorded for the test tree
+    (KeyError '$$ID-...') and the process is left patched afterwards. The option is set once for
+    all sessions instead.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+    from streamlit.testing.v1.util import patch_config_options
+    shared = ScriptCache()
+    last = []
+    saved = Runtime.__dict__["instance"], Runtime.__dict__["exists"]
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+        if not last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+
+    local_script_runner.ScriptCache = lambda: shared
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last))
+    app_test.patch_config_options = lambda overrides: nullcontext()
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield
+    finally:
+        local_script_runner.ScriptCache = ScriptCache
+        Runtime.instance, Runtime.exists = saved
+        app_test.patch_config_options = patch_config_options
+
+
+def run_load_test(sessions, iterations=1, ramp_seconds=0.0, unique_prompts=True):
+    """Run `sessions` concurrent simulated users; returns the report dict."""
+    # Warm-up render: module imports and process-wide caches are paid once, not by the first sessions
+    cold = time.perf_counter()
+    SimulatedSession(-1).at.run()
+    cold_start_s = time.perf_counter() - cold
+
+    users = [SimulatedSession(i, unique_prompts) for i in range(sessions)]
+    with _shared_server_state(), ResourceSampler() as sampler, \
+            ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="genauto-session") as pool:
+        futures = [pool.submit(user.run, iterations, ramp_seconds * i / max(sessions, 1)) for i, user in enumerate(users)]
+        for future in futures:
+            future.result()
+
+    reruns = [r for user in users for r in user.reruns]
+    by_action = {}
+    for action, seconds, _ in reruns:
+        by_action.setdefault(action, []).append(seconds)
+    rss = sampler.rss or [sampler.baseline_rss or 0]
+    return {
+        "sessions": sessions,
+        "iterations": iterations,
+        "wall_s": round(sampler.wall_s, 3),
+        "cold_start_s": round(cold_start_s, 3),
+        "reruns": len(reruns),
+        "failed_reruns": sum(1 for r in reruns if not r[2]),
+        "errors": [e for user in users for e in user.errors][:50],
+        "latency": latency_summary([r[1] for r in reruns]),
+        "latency_by_action": {action: latency_summary(values) for action, values in sorted(by_action.items())},
+        "memory": {
+            "baseline_rss_mb": (sampler.baseline_rss or 0) / 2**20,
+            "peak_rss_mb": max(rss) / 2**20,
+            "mean_rss_mb": statistics.fmean(rss) / 2**20,
+            "rss_per_session_mb": max(0, max(rss) - (sampler.baseline_rss or 0)) / 2**20 / sessions,
+        },
+        "cpu": {
+            "cpu_s": round(sampler.cpu_s, 3),
+            "cpu_s_per_session": round(sampler.cpu_s / sessions, 3),
+            "cpu_ms_per_rerun": round(1000 * sampler.cpu_s / max(len(reruns), 1), 1),
+            "mean_utilisation_pct": round(statistics.fmean(sampler.cpu_percent), 1) if sampler.cpu_percent else None,
+            "peak_utilisation_pct": round(max(sampler.cpu_percent), 1) if sampler.cpu_percent else None,
+        },
+    }
+
+
+def _ms(seconds):
+    return "—" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+
+def format_report(report):
+    lines = [
+        f"Sessions: {report['sessions']} × {report['iterations']} iteration(s) in {report['wall_s']:.1f}s "
+        f"(cold start {report['cold_start_s']:.1f}s) — {report['reruns']} reruns, {report['failed_reruns']} failed",
+        "",
+        "| Action | Reruns | p50 | p95 | p99 | Max |",
+        "|---|---|---|---|---|---|",
+    ]
+    rows = list(report["latency_by_action"].items()) + [("**all**", report["latency"])]
+    for action, s in rows:
+        lines.append(f"| {action} | {s['count']} | {_ms(s['p50_s'])} | {_ms(s['p95_s'])} | {_ms(s['p99_s'])} | {_ms(s['max_s'])} |")
+    mem, cpu = report["memory"], report["cpu"]
+    lines += [
+        "",
+        f"RSS: {mem['baseline_rss_mb']:.0f} MB before → peak {mem['peak_rss_mb']:.0f} MB "
+        f"(≈{mem['rss_per_session_mb']:.1f} MB per session)",
+        f"CPU: {cpu['cpu_s']:.1f}s total, {cpu['cpu_s_per_session']:.2f}s per session, {cpu['cpu_ms_per_rerun']:.0f} ms per rerun "
+        f"(mean {cpu['mean_utilisation_pct']}%, peak {cpu['peak_utilisation_pct']}% of one core)",
+    ]
+    if report["errors"]:
+        lines += ["", "Errors:"] + [f"  - {e}" for e in report["errors"][:10]]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.loadtest", description="Simulate concurrent users of the Streamlit app.")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=1, help="times each user runs the scenario")
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which session starts are spread")
+    parser.add_argument("--llm-latency", default="lognormal:0.3,0.3", help="offline LLM time-to-first-token distribution")
+    parser.add_argument("--tokens-per-s", type=float, default=400, help="offline LLM output token rate")
+    parser.add_argument("--shared-prompts", action="store_true", help="all sessions send the same requirement (exercises the response cache)")
+    parser.add_argument("--cache-dir", help="cache/trace directory (default: a fresh temporary directory)")
+    parser.add_argument("--json", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    # Must be set before the app's modules are imported, so the run neither reads nor pollutes the real cache
+    os.environ["GENAUTO_CACHE_DIR"] = args.cache_dir or tempfile.mkdtemp(prefix="genauto-loadtest-")
+    # AppTest touches session state outside a script run when it is constructed; that warning is noise here
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+    try:
+        configure_offline_llm(args.llm_latency, args.tokens_per_s)
+    except ValueError as e:
+        parser.error(f"--llm-latency: {e}")
+
+    print(f"🚦 {args.sessions} sessions × {args.iterations} iteration(s) against {os.path.basename(APP_PATH)} "
+          f"(cache: {os.environ['GENAUTO_CACHE_DIR']})")
+    sys.stdout.flush()
+    report = run_load_test(args.sessions, args.iterations, args.ramp, unique_prompts=not args.shared_prompts)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["failed_reruns"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
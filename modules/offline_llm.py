@@ -0,0 +1,282 @@
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from modules.llm_cache import CACHE_DIR
+
+# ============================================================
+# OFFLINE LLM PROVIDER (Cassette Record / Replay + Fault Injection)
+# ============================================================
+# Provider "offline" answers like a real SDK client without any network access.
+# Replay mode serves responses captured from real providers (cassette JSONL files),
+# falling back to deterministic synthetic text sized by max_tokens. Latency is a
+# sampled time-to-first-token plus a token rate, and errors / 429s are injected at
+# configurable rates, so routing, hedging, rate limiting and caching can be exercised
+# and benchmarked on a machine with no API keys.
+#
+# Record mode is independent of the provider in use: with GENAUTO_LLM_RECORD set,
+# every real provider response that _call_provider receives is appended to that cassette.
+
+OFFLINE_MODEL = "genauto-offline"
+OFFLINE_API_KEY = "offline"  # Placeholder so the client pool can key the stand-in like a real provider
+CASSETTE_PATH = os.getenv("GENAUTO_OFFLINE_CASSETTE", os.path.join(CACHE_DIR, "cassettes", "default.jsonl"))
+RECORD_PATH = os.getenv("GENAUTO_LLM_RECORD", "")
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_TOKENS = 8
+
+OfflineProfile = namedtuple("OfflineProfile", [
+    "latency",          # time-to-first-token distribution: "fixed:S", "uniform:LO,HI", "lognormal:MEDIAN,SIGMA" or "recorded"
+    "tokens_per_s",     # output token rate after the first token (0 = instant)
+    "error_rate",       # probability of an injected provider error (HTTP 500)
+    "rate_limit_rate",  # probability of an injected 429
+    "retry_after",      # Retry-After seconds carried by injected 429s
+    "seed",             # RNG seed for latency / fault sampling (None = nondeterministic)
+])
+
+
+# Latency kind -> (min, max) number of comma-separated parameters
+LATENCY_KINDS = {"fixed": (0, 1), "uniform": (2, 2), "lognormal": (0, 2), "recorded": (0, 0)}
+
+
+def parse_latency(spec):
+    """Split a latency spec like "uniform:0.2,1.5" into (kind, [params]); ValueError if malformed."""
+    kind, _, args = spec.partition(":")
+    if kind not in LATENCY_KINDS:
+        raise ValueError(f"unknown latency kind {kind!r} in {spec!r} (expected one of {', '.join(LATENCY_KINDS)})")
+    try:
+        params = [float(a) for a in args.split(",") if a.strip()]
+    except ValueError:
+        raise ValueError(f"latency parameters must be numbers: {spec!r}") from None
+    lo, hi = LATENCY_KINDS[kind]
+    if not lo <= len(params) <= hi:
+        raise ValueError(f"{kind} latency takes {lo if lo == hi else f'{lo}-{hi}'} parameter(s), got {spec!r}")
+    if any(p < 0 for p in params) or (kind == "uniform" and params[0] > params[1]):
+        raise ValueError(f"latency parameters must be non-negative (and LO <= HI for uniform): {spec!r}")
+    return kind, params
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return float(default)
+
+
+def profile_from_env():
+    seed = os.getenv("GENAUTO_OFFLINE_SEED")
+    latency = os.getenv("GENAUTO_OFFLINE_LATENCY", "lognormal:0.6,0.4")
+    parse_latency(latency)  # Fail at startup rather than on every request
+    return OfflineProfile(
+        latency=latency,
+        tokens_per_s=_env_float("GENAUTO_OFFLINE_TOKENS_PER_S", "150"),
+        error_rate=_env_float("GENAUTO_OFFLINE_ERROR_RATE", "0"),
+        rate_limit_rate=_env_float("GENAUTO_OFFLINE_429_RATE", "0"),
+        retry_after=_env_float("GENAUTO_OFFLINE_RETRY_AFTER", "1"),
+        seed=int(seed) if seed else None,
+    )
+
+
+class OfflineProviderError(Exception):
+    """Injected provider failure (behaves like an HTTP 500 from a real SDK)."""
+
+    status_code = 500
+
+
+class _Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class OfflineRateLimitError(Exception):
+    """Injected 429 carrying a Retry-After header, recognised by rate_limiter.retry_after_seconds."""
+
+    status_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__(f"offline provider: rate limited (retry after {retry_after:g}s)")
+        self.response = _Response({"retry-after": f"{retry_after:g}"})
+
+
+def _prompt_key(system_prompt, user_prompt, max_tokens):
+    return hashlib.sha256(f"{system_prompt}\0{user_prompt}\0{max_tokens}".encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Append-only JSONL store of recorded responses keyed by prompt."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        entries = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    entries[entry["key"]] = entry
+        except OSError:
+            pass
+        return entries
+
+    def lookup(self, system_prompt, user_prompt, max_tokens):
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            return self._entries.get(_prompt_key(system_prompt, user_prompt, max_tokens))
+
+    def record(self, system_prompt, user_prompt, max_tokens, text, provider, model, usage=None, wall_s=None, ttft_s=None):
+        entry = {
+            "key": _prompt_key(system_prompt, user_prompt, max_tokens),
+            "provider": provider, "model": model, "max_tokens": max_tokens,
+            "text": text, "input_tokens": (usage or {}).get("input_tokens"),
+            "output_tokens": (usage or {}).get("output_tokens"), "wall_s": wall_s, "ttft_s": ttft_s,
+            "recorded": round(time.time(), 3),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            if self._entries is not None:
+                self._entries[entry["key"]] = entry
+
+    def __len__(self):
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            return len(self._entries)
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path=CASSETTE_PATH):
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+        return _cassettes[path]
+
+
+def get_recorder():
+    """Cassette real responses are recorded into, or None when record mode is off."""
+    return get_cassette(RECORD_PATH) if RECORD_PATH else None
+
+
+_SYNTH_WORDS = ("signal", "service", "vehicle", "pressure", "event", "handler", "status", "value", "update",
+                "publish", "subscribe", "threshold", "alert", "sensor", "frame", "timeout", "state", "config")
+
+
+def synthetic_text(system_prompt, user_prompt, max_tokens):
+    """Deterministic filler of roughly 60% of max_tokens, seeded by the prompt."""
+    rng = random.Random(_prompt_key(system_prompt, user_prompt, max_tokens))
+    target_chars = int(max_tokens * 0.6) * CHARS_PER_TOKEN
+    lines = [f"// offline synthetic response ({max_tokens} max tokens)"]
+    size = len(lines[0])
+    while size < target_chars:
+        line = " ".join(rng.choice(_SYNTH_WORDS) for _ in range(rng.randint(4, 12)))
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+class OfflineClient:
+    """SDK-like client: `complete()` returns text, `stream()` yields chunks, both filling `usage`."""
+
+    def __init__(self, model=OFFLINE_MODEL, profile=None, cassette=None):
+        self.model = model
+        self.profile = profile
+        self.cassette = cassette
+        self.calls = 0
+        self._rng = None
+        self._seed = None
+        self._lock = threading.Lock()
+
+    def _current_profile(self):
+        return self.profile or get_offline_profile()
+
+    def _sample(self, profile, recorded_ttft):
+        """(ttft seconds, fault) for one request, drawn from the profile's distributions."""
+        with self._lock:
+            if self._rng is None or profile.seed != self._seed:
+                self._rng, self._seed = random.Random(profile.seed), profile.seed  # Reseed when the profile's seed changes
+            self.calls += 1
+            roll = self._rng.random()
+            kind, params = parse_latency(profile.latency)
+            if kind == "recorded" and recorded_ttft is not None:
+                ttft = recorded_ttft
+            elif kind == "fixed":
+                ttft = params[0] if params else 0.0
+            elif kind == "uniform":
+                ttft = self._rng.uniform(params[0], params[1])
+            else:  # lognormal (also the fallback when a recording has no timing)
+                median, sigma = (params + [0.6, 0.4][len(params):])[:2] if kind == "lognormal" else (0.6, 0.4)
+                ttft = self._rng.lognormvariate(math.log(max(median, 1e-6)), sigma)
+        if roll < profile.rate_limit_rate:
+            return ttft, OfflineRateLimitError(profile.retry_after)
+        if roll < profile.rate_limit_rate + profile.error_rate:
+            return ttft, OfflineProviderError("offline provider: injected server error")
+        return ttft, None
+
+    def _respond(self, system_prompt, user_prompt, max_tokens, usage):
+        profile = self._current_profile()
+        cassette = self.cassette or get_cassette()
+        entry = cassette.lookup(system_prompt, user_prompt, max_tokens)
+        text = entry["text"] if entry else synthetic_text(system_prompt, user_prompt, max_tokens)
+        ttft, fault = self._sample(profile, entry.get("ttft_s") if entry else None)
+        if usage is not None and fault is None:  # Failed requests report no usage, like the real SDKs
+            usage["input_tokens"] = (entry or {}).get("input_tokens") or len(system_prompt + user_prompt) // CHARS_PER_TOKEN
+            usage["output_tokens"] = (entry or {}).get("output_tokens") or len(text) // CHARS_PER_TOKEN
+        return text, ttft, fault, profile
+
+    def complete(self, system_prompt, user_prompt, max_tokens, usage=None):
+        text, ttft, fault, profile = self._respond(system_prompt, user_prompt, max_tokens, usage)
+        if fault is not None:
+            time.sleep(min(ttft, 0.05))
+            raise fault
+        output_tokens = len(text) // CHARS_PER_TOKEN
+        time.sleep(ttft + (output_tokens / profile.tokens_per_s if profile.tokens_per_s else 0))
+        return text
+
+    def stream(self, system_prompt, user_prompt, max_tokens, usage=None):
+        text, ttft, fault, profile = self._respond(system_prompt, user_prompt, max_tokens, usage)
+        time.sleep(ttft if fault is None else min(ttft, 0.05))
+        if fault is not None:
+            raise fault
+        step = STREAM_CHUNK_TOKENS * CHARS_PER_TOKEN
+        pause = STREAM_CHUNK_TOKENS / profile.tokens_per_s if profile.tokens_per_s else 0
+        for start in range(0, len(text), step):
+            if start and pause:
+                time.sleep(pause)
+            yield text[start:start + step]
+
+
+_profile = None
+_profile_lock = threading.Lock()
+
+
+def get_offline_profile():
+    global _profile
+    with _profile_lock:
+        if _profile is None:
+            _profile = profile_from_env()
+        return _profile
+
+
+def set_offline_profile(**overrides):
+    """Adjust the process-wide offline profile (e.g. from a benchmark); returns the new profile."""
+    global _profile
+    if "latency" in overrides:
+        parse_latency(overrides["latency"])
+    with _profile_lock:
+        _profile = (_profile or profile_from_env())._replace(**overrides)
+        return _profile
@@ -0,0 +1,102 @@
+import hashlib
+import io
+import os
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from collections import namedtuple
+import streamlit as st
+
+try:
+    import zstandard
+except ImportError:  # tar.zst export is offered only when zstandard is installed
+    zstandard = None
+
+# ============================================================
+# PROJECT EXPORT (Content-Hashed Archives, Built on Demand)
+# ============================================================
+# The download button gets a callable, so nothing is packed until someone clicks it.
+# Archives are keyed by a hash of the artifacts that go into them and shared across
+# reruns and sessions. Files are streamed one by one into a spooled temp file, which
+# stays in memory for small projects and spills to disk for large ones.
+
+SPOOL_MAX_BYTES = int(os.getenv("GENAUTO_EXPORT_SPOOL_MB", "8")) * 1024 * 1024
+EXPORT_CACHE_ENTRIES = int(os.getenv("GENAUTO_EXPORT_CACHE_ENTRIES", "8"))
+STREAM_CHUNK_BYTES = 64 * 1024
+
+ExportFormat = namedtuple("ExportFormat", ["label", "extension", "mime"])
+
+EXPORT_FORMATS = {
+    "zip": ExportFormat("ZIP (deflate)", ".zip", "application/zip"),
+    "zip-stored": ExportFormat("ZIP (stored, fastest)", ".zip", "application/zip"),
+    "tar.zst": ExportFormat("tar + zstd", ".tar.zst", "application/zstd"),
+}
+
+
+def available_formats():
+    """Export format keys usable in this environment."""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "tar.zst" or zstandard is not None]
+
+
+def export_digest(fmt, *parts):
+    """Hash of the archive format and everything that goes into it (strings, lists, or {key: text} dicts)."""
+    digest = hashlib.sha256(fmt.encode("utf-8"))
+    for part in parts:
+        items = sorted(part.items()) if isinstance(part, dict) else [part]
+        for item in items:
+            digest.update(b"\0")
+            digest.update(repr(item).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def write_archive(files, fmt, fileobj):
+    """Stream (path, text) files into `fileobj` as a zip or tar.zst archive."""
+    if fmt in ("zip", "zip-stored"):
+        compression = zipfile.ZIP_DEFLATED if fmt == "zip" else zipfile.ZIP_STORED
+        with zipfile.ZipFile(fileobj, "w", compression) as zf:
+            for path, content in files:
+                data = content.encode("utf-8")
+                with zf.open(path, "w") as dst:
+                    for start in range(0, len(data), STREAM_CHUNK_BYTES):
+                        dst.write(data[start:start + STREAM_CHUNK_BYTES])
+    elif fmt == "tar.zst":
+        if zstandard is None:
+            raise ValueError("tar.zst export needs the zstandard package")
+        compressor = zstandard.ZstdCompressor(level=3)
+        with compressor.stream_writer(fileobj, closefd=False) as zst, tarfile.open(fileobj=zst, mode="w|") as tar:
+            now = time.time()
+            for path, content in files:
+                data = content.encode("utf-8")
+                info = tarfile.TarInfo(path)
+                info.size = len(data)
+                info.mtime = now
+                tar.addfile(info, io.BytesIO(data))
+    else:
+        raise ValueError(f"unknown export format {fmt!r}")
+
+
+class ExportedArchive:
+    """A finished archive held in a spooled temp file; safe to read from several threads."""
+
+    def __init__(self, digest, fmt, spool):
+        self.digest = digest
+        self.fmt = fmt
+        self._spool = spool
+        self._lock = threading.Lock()
+        spool.seek(0, os.SEEK_END)
+        self.size = spool.tell()
+
+    def read(self):
+        with self._lock:
+            self._spool.seek(0)
+            return self._spool.read()
+
+
+@st.cache_resource(show_spinner=False, max_entries=EXPORT_CACHE_ENTRIES)
+def build_archive(digest, fmt, _files):
+    """Pack `_files()` once per content digest (callers compute the digest with export_digest)."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    write_archive(_files(), fmt, spool)
+    return ExportedArchive(digest, fmt, spool)
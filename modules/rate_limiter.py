@@ -0,0 +1,200 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+
+# ============================================================
+# CLIENT-SIDE RATE LIMITER (Token Buckets + Fair FIFO Queue)
+# ============================================================
+# One limiter per provider/model, shared by every Streamlit session in the process.
+# Requests wait in arrival order until both the requests-per-minute and the
+# tokens-per-minute buckets can cover them, so bursts from several users queue up
+# instead of turning into 429 storms.
+
+# Fallback quotas (requests/min, tokens/min) for engines without an explicit limit
+DEFAULT_QUOTAS = {
+    "groq": (30, 12000),
+    "anthropic": (50, 40000),
+    "google": (15, 1000000),
+}
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("GENAUTO_RATE_QUEUE_TIMEOUT", "90"))
+MAX_RETRY_AFTER_SECONDS = 30   # Longer server-side backoffs fail over to another provider instead
+RATE_LIMIT_RETRIES = 2
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a request could not get quota within the queue timeout."""
+
+
+class TokenBucket:
+    """Continuous-refill bucket sized to one minute of quota."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def consume(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """RPM + TPM limiter with a strict FIFO wait queue and Retry-After pauses."""
+
+    def __init__(self, provider, model, rpm, tpm):
+        self.provider = provider
+        self.model = model
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self.max_depth = 0
+        self.granted = 0
+        self.timeouts = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    def _delay(self, tokens, now):
+        delay = self.paused_until - now
+        if self.requests:
+            delay = max(delay, self.requests.wait_time(1, now))
+        if self.tokens:
+            delay = max(delay, self.tokens.wait_time(tokens, now))
+        return delay
+
+    def acquire(self, tokens, timeout=QUEUE_TIMEOUT_SECONDS):
+        """Block until this request reaches the head of the queue and its quota is available."""
+        ticket = object()
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            self._queue.append(ticket)
+            self.max_depth = max(self.max_depth, len(self._queue))
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._delay(tokens, now) if self._queue[0] is ticket else None
+                    if delay is not None and delay <= 0:
+                        if self.requests:
+                            self.requests.consume(1)
+                        if self.tokens:
+                            self.tokens.consume(tokens)
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise RateLimitTimeout(f"{self.provider}/{self.model}: no quota within {timeout:.0f}s")
+                    self._cond.wait(remaining if delay is None else min(delay, remaining))
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+            self.granted += 1
+            self.total_wait += time.monotonic() - started
+
+    def settle(self, charged, used, counted=True):
+        """Replace a token reservation with what the attempt really used.
+
+        `counted=False` also returns the request slot, for attempts the provider rejected
+        (429) or that failed before producing anything.
+        """
+        with self._cond:
+            if self.tokens:
+                held = min(charged, self.tokens.capacity)
+                self.tokens.level = min(self.tokens.capacity, self.tokens.level + held - min(used, self.tokens.capacity))
+            if self.requests and not counted:
+                self.requests.level = min(self.requests.capacity, self.requests.level + 1)
+            self._cond.notify_all()
+
+    def backoff(self, seconds):
+        """Pause every queued request after the provider answered 429 with Retry-After."""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.throttled += 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            depth = len(self._queue)
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "queue_depth": depth,
+            "max_depth": self.max_depth,
+            "granted": self.granted,
+            "avg_wait": self.total_wait / self.granted if self.granted else 0.0,
+            "timeouts": self.timeouts,
+            "throttled": self.throttled,
+        }
+
+
+_quotas = {}
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def parse_rpm(label):
+    """Extract a requests-per-minute limit from an engine label like "Free (30 RPM)"."""
+    match = re.search(r"(\d+)\s*RPM", label or "")
+    return int(match.group(1)) if match else None
+
+
+def register_quota(provider, model, rpm=None, tpm=None):
+    """Override the default quota for one provider/model (e.g. from LLM_ENGINES)."""
+    default_rpm, default_tpm = DEFAULT_QUOTAS.get(provider, (None, None))
+    quota = (rpm or default_rpm, tpm or default_tpm)
+    with _limiters_lock:
+        if _quotas.get((provider, model)) == quota:
+            return
+        _quotas[(provider, model)] = quota
+        _limiters.pop((provider, model), None)  # Rebuilt with the new quota on next use
+
+
+def get_rate_limiter(llm_info):
+    key = (llm_info["provider"], llm_info["model"])
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            rpm, tpm = _quotas.get(key, DEFAULT_QUOTAS.get(key[0], (None, None)))
+            limiter = _limiters[key] = RateLimiter(key[0], key[1], rpm, tpm)
+        return limiter
+
+
+def estimate_tokens(*texts, max_tokens=0):
+    """Rough token count at ~4 characters per token, plus any reserved output budget."""
+    return sum(len(t) for t in texts) // 4 + max_tokens
+
+
+def retry_after_seconds(error):
+    """Seconds to back off if `error` is a provider 429, else None."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    name = type(error).__name__
+    if status != 429 and "RateLimit" not in name and "ResourceExhausted" not in name:
+        return None
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0)) or 1.0
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def rate_limit_stats():
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.stats() for limiter in limiters]
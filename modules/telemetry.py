@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+from modules.can_log import LogReplayer
+from modules.timeseries import TimeSeriesStore
+
+# ============================================================
+# REAL-TIME TELEMETRY ENGINE (Background Signal Generation)
+# ============================================================
+# A daemon thread produces continuous time series for every dashboard signal at a
+# fixed sample rate and appends them in vectorized batches to a TimeSeriesStore keyed
+# by VSS path. Streamlit reruns only ever read from the store, so the script thread
+# never blocks on generation.
+
+MIN_RATE_HZ, MAX_RATE_HZ = 10, 1000
+TELEMETRY_RATE_HZ = min(MAX_RATE_HZ, max(MIN_RATE_HZ, int(os.getenv("GENAUTO_TELEMETRY_HZ", "100"))))
+TELEMETRY_BUDGET_BYTES = int(float(os.getenv("GENAUTO_TELEMETRY_BUDGET_MB", "64")) * 1024 * 1024)
+TICK_SECONDS = 0.02               # Generator wake-up period (50 batches/s)
+
+
+class SignalChannel:
+    """Deterministic waveform (slow drift + fast ripple + noise) for one signal definition."""
+
+    def __init__(self, sig, rate_hz, t0):
+        self.vss = sig["vss"]
+        self.rate_hz = rate_hz
+        self.t0 = t0
+        self.produced = 0
+        self.lo, self.hi = float(sig["min"]), float(sig["max"])
+        center = (sig["normal_min"] + sig["normal_max"]) / 2
+        spread = (sig["normal_max"] - sig["normal_min"]) / 2
+
+        # Hash-derived phases/frequencies so each signal has its own stable shape
+        h = hashlib.md5(self.vss.encode()).digest()
+        self.center = center
+        self.drift_amp = spread * 0.45
+        self.drift_hz = 0.01 + h[0] / 255.0 * 0.04
+        self.ripple_amp = spread * 0.12
+        self.ripple_hz = 0.2 + h[1] / 255.0 * 0.6
+        self.phase = h[2] / 255.0 * 2 * np.pi
+        self.noise = spread * 0.02
+        self.rng = np.random.default_rng(int.from_bytes(h[3:7], "little"))
+
+    def generate_until(self, now, store):
+        """Append every sample due up to `now` to `store` in one vectorized batch."""
+        target = int((now - self.t0) * self.rate_hz)
+        n = min(target - self.produced, self.rate_hz * 60)  # Never backfill more than a minute
+        if n <= 0:
+            return 0
+        idx = np.arange(target - n, target, dtype=np.float64)
+        ts = self.t0 + idx / self.rate_hz
+        t = ts - self.t0
+        values = (self.center
+                  + self.drift_amp * np.sin(2 * np.pi * self.drift_hz * t + self.phase)
+                  + self.ripple_amp * np.sin(2 * np.pi * self.ripple_hz * t)
+                  + self.rng.normal(0.0, self.noise, n))
+        store.extend(self.vss, ts, np.clip(values, self.lo, self.hi).astype(np.float32))
+        self.produced = target
+        return n
+
+    def skip_until(self, now):
+        """Advance without producing samples (the signal is being fed by a log replay)."""
+        self.produced = max(self.produced, int((now - self.t0) * self.rate_hz) + 1)
+
+
+class TelemetryEngine:
+    """Owns the generator thread and the shared time-series store."""
+
+    def __init__(self, signals, rate_hz=TELEMETRY_RATE_HZ):
+        self.rate_hz = min(MAX_RATE_HZ, max(MIN_RATE_HZ, int(rate_hz)))
+        t0 = time.time()
+        self.channels = {}
+        for sig in signals:
+            self.channels.setdefault(sig["vss"], SignalChannel(sig, self.rate_hz, t0))
+        self.store = TimeSeriesStore(self.channels, TELEMETRY_BUDGET_BYTES, self.rate_hz)
+        self.samples_generated = 0
+        self.replay = None
+        self.replay_owner = None          # Session that started the current replay
+        self._replay_lock = threading.Lock()
+        self._paused = frozenset()        # VSS paths currently written by a LogReplayer instead
+        self._tick_lock = threading.Lock()
+        self._tick(t0 + TICK_SECONDS)  # Seed one batch so the first frame is never empty
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="telemetry-engine", daemon=True)
+        self._thread.start()
+
+    def _tick(self, now):
+        with self._tick_lock:
+            for vss, channel in self.channels.items():
+                if vss in self._paused:
+                    channel.skip_until(now)
+                else:
+                    self.samples_generated += channel.generate_until(now, self.store)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._tick(time.time())
+            self._stop.wait(TICK_SECONDS)
+
+    def stop(self):
+        self._stop.set()
+
+    def start_replay(self, log, db, vss_map, speed=1.0, start_time=None, owner=None):
+        """Feed the VSS paths covered by `vss_map` from a CAN log; the generator pauses those paths.
+
+        Takes ownership of `log`. Raises RuntimeError (and closes `log`) if another owner's replay is
+        still running or the previous writer thread has not exited yet.
+        """
+        with self._replay_lock:
+            try:
+                if not self.can_control_replay(owner):
+                    raise RuntimeError("another session is replaying a log")
+                if not self._stop_replay():
+                    raise RuntimeError("the previous replay is still shutting down")
+                replayer = LogReplayer(log, db, vss_map, self.store, speed, start_time,
+                                       on_finish=lambda: self._resume_paths(replayer))
+            except Exception:
+                log.close()
+                raise
+            with self._tick_lock:
+                self._paused = frozenset(replayer.paths)
+            self.replay_owner = owner
+            self.replay = replayer  # Registered before the thread starts so a short log can find itself on finish
+            return replayer.start()
+
+    def can_control_replay(self, owner):
+        """Only the session that started a running replay may stop or replace it."""
+        replayer = self.replay
+        return replayer is None or not replayer.running or self.replay_owner == owner
+
+    def stop_replay(self, owner=None):
+        """Stop the replay and hand its paths back to the generator; False if it could not be stopped."""
+        with self._replay_lock:
+            if not self.can_control_replay(owner):
+                return False
+            return self._stop_replay()
+
+    def _stop_replay(self):
+        replayer = self.replay
+        if replayer is None:
+            return True
+        replayer.stop()
+        if replayer.running:
+            return False  # Writer still draining; keep its paths paused so two writers never share a ring
+        self._resume_paths(replayer)
+        replayer.log.close()
+        self.replay = self.replay_owner = None
+        return True
+
+    def _resume_paths(self, replayer):
+        """Hand a finished or stopped replay's paths back to the generator, after its last replayed sample.
+
+        Runs on the replay thread when the log ends, so it takes only the tick lock (stop_replay holds the
+        replay lock while joining that thread). A replay that is no longer current has nothing to release.
+        """
+        with self._tick_lock:
+            if self.replay is not replayer:
+                return
+            for vss in self._paused:
+                last_ts = self.store.series[vss].raw.latest()[0]
+                self.channels[vss].skip_until(max(time.time(), last_ts or 0.0))
+            self._paused = frozenset()
+
+    def latest(self, vss):
+        return self.store.latest(vss)
+
+    def read_since(self, vss, cursor):
+        """Incremental delta for one signal: (ts, values, new_cursor)."""
+        return self.store.read_since(vss, cursor)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_telemetry_engine(signals):
+    """Process-wide engine, started on first use and shared by every session."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TelemetryEngine(signals)
+        return _engine
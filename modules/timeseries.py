@@ -0,0 +1,254 @@
+import numpy as np
+
+# ============================================================
+# VSS TIME-SERIES STORE (NumPy Ring Buffers)
+# ============================================================
+# Every VSS path gets two preallocated tiers:
+#   raw    — full-rate (timestamp float64, value float32) samples for the recent past
+#   rollup — one (min, max, mean) row per ROLLUP_SECONDS bucket for hours of history
+# Capacities are derived from a fixed memory budget, so memory never grows at runtime.
+
+ROLLUP_SECONDS = 1.0
+ROLLUP_HOURS = 3
+MIN_RAW_SECONDS = 10
+
+
+class RingBuffer:
+    """Fixed-capacity (timestamp, value) ring — single writer, many lock-free readers.
+
+    Storage is mirrored (every slot is written at i and i + capacity), so any window of up
+    to `capacity` samples is one contiguous slice: windows are zero-copy NumPy views and
+    appends stay O(1). The writer publishes by advancing `count` only after the data is in
+    place; readers that copy re-check `count` to drop anything lapped meanwhile (seqlock-style).
+    """
+
+    def __init__(self, capacity, columns=1):
+        self.capacity = int(capacity)
+        self.ts = np.zeros(2 * self.capacity, dtype=np.float64)
+        shape = (2 * self.capacity,) if columns == 1 else (2 * self.capacity, columns)
+        self.values = np.zeros(shape, dtype=np.float32)
+        self.count = 0  # Total samples ever written (monotonic)
+
+    @property
+    def size(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def nbytes(self):
+        return self.ts.nbytes + self.values.nbytes
+
+    def append(self, t, value):
+        """O(1) single-sample append (writer thread only)."""
+        i = self.count % self.capacity
+        self.ts[i] = self.ts[i + self.capacity] = t
+        self.values[i] = self.values[i + self.capacity] = value
+        self.count += 1
+
+    def extend(self, ts, values):
+        """Append a batch of samples (writer thread only)."""
+        n = len(ts)
+        if n == 0:
+            return
+        skipped = max(0, n - self.capacity)
+        if skipped:
+            ts, values, n = ts[skipped:], values[skipped:], self.capacity
+        idx = (self.count + skipped + np.arange(n)) % self.capacity
+        self.ts[idx] = self.ts[idx + self.capacity] = ts
+        self.values[idx] = self.values[idx + self.capacity] = values
+        self.count += skipped + n  # Publish only after the data is in place
+
+    def last(self, n):
+        """Zero-copy views of the newest `n` samples, oldest first."""
+        end = self.count
+        n = min(n, end, self.capacity)
+        if n <= 0:
+            return self.ts[:0], self.values[:0]
+        stop = (end - 1) % self.capacity + 1 + self.capacity
+        return self.ts[stop - n:stop], self.values[stop - n:stop]
+
+    def read_since(self, cursor):
+        """Copied samples written after `cursor` (a previous return value); returns (ts, values, new_cursor)."""
+        end = self.count
+        n = end - max(cursor, end - self.capacity)
+        ts, values = self.last(n)
+        ts, values = ts.copy(), values.copy()
+        overwritten = self.count - self.capacity - (end - len(ts))
+        if overwritten > 0:
+            ts, values = ts[overwritten:], values[overwritten:]
+        return ts, values, end
+
+    def latest(self):
+        """Most recent (timestamp, value), or (None, None) before the first write."""
+        end = self.count
+        if end == 0:
+            return None, None
+        i = (end - 1) % self.capacity
+        return float(self.ts[i]), self.values[i]
+
+
+class SignalSeries:
+    """Raw ring plus a per-second (min, max, mean) rollup ring for one signal."""
+
+    def __init__(self, raw_capacity, rollup_capacity, rollup_seconds=ROLLUP_SECONDS):
+        self.raw = RingBuffer(raw_capacity)
+        self.rollup = RingBuffer(rollup_capacity, columns=3)
+        self.rollup_seconds = rollup_seconds
+        self._open = None  # [bucket_id, min, max, sum, count] of the bucket still filling
+
+    @property
+    def nbytes(self):
+        return self.raw.nbytes + self.rollup.nbytes
+
+    def append(self, t, value):
+        self.raw.append(t, value)
+        bucket = np.floor(t / self.rollup_seconds)
+        if self._open is not None and self._open[0] == bucket:
+            b = self._open
+            b[1], b[2], b[3], b[4] = min(b[1], value), max(b[2], value), b[3] + value, b[4] + 1
+        else:
+            self._flush_open()
+            self._open = [bucket, value, value, float(value), 1]
+
+    def extend(self, ts, values):
+        if len(ts) == 0:
+            return
+        self.raw.extend(ts, values)
+
+        # Group the batch by rollup bucket with reduceat — no per-sample Python work
+        buckets = np.floor(ts / self.rollup_seconds)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+        ids = buckets[starts]
+        mins = np.minimum.reduceat(values, starts)
+        maxs = np.maximum.reduceat(values, starts)
+        sums = np.add.reduceat(values.astype(np.float64), starts)
+        counts = np.diff(np.append(starts, len(ts)))
+
+        if self._open is not None and self._open[0] == ids[0]:
+            b = self._open
+            mins[0], maxs[0] = min(b[1], mins[0]), max(b[2], maxs[0])
+            sums[0], counts[0] = sums[0] + b[3], counts[0] + b[4]
+        else:
+            self._flush_open()
+
+        if len(ids) > 1:
+            done = slice(0, len(ids) - 1)
+            rows = np.stack([mins[done], maxs[done], sums[done] / counts[done]], axis=1)
+            self.rollup.extend(ids[done] * self.rollup_seconds, rows)
+        self._open = [ids[-1], mins[-1], maxs[-1], sums[-1], counts[-1]]
+
+    def _flush_open(self):
+        if self._open is not None:
+            bucket, lo, hi, total, n = self._open
+            self.rollup.append(bucket * self.rollup_seconds, (lo, hi, total / n))
+            self._open = None
+
+    def window(self, seconds):
+        """Zero-copy full-rate views for the last `seconds` (clipped to what the raw tier holds)."""
+        ts, values = self.raw.last(self.raw.size)
+        if len(ts) == 0:
+            return ts, values
+        start = np.searchsorted(ts, ts[-1] - seconds)
+        return ts[start:], values[start:]
+
+    def history(self, seconds):
+        """Rollup views (ts, min, max, mean) for long ranges the raw tier no longer covers."""
+        ts, rows = self.rollup.last(self.rollup.size)
+        if len(ts) == 0:
+            return ts, rows[:, 0], rows[:, 1], rows[:, 2]
+        start = np.searchsorted(ts, ts[-1] - seconds)
+        rows = rows[start:]
+        return ts[start:], rows[:, 0], rows[:, 1], rows[:, 2]
+
+
+class TimeSeriesStore:
+    """Fixed-budget store of SignalSeries keyed by VSS path."""
+
+    def __init__(self, paths, memory_budget_bytes, rate_hz, rollup_hours=ROLLUP_HOURS, rollup_seconds=ROLLUP_SECONDS):
+        paths = list(dict.fromkeys(paths))
+        per_signal = memory_budget_bytes // max(1, len(paths))
+        rollup_capacity = int(rollup_hours * 3600 / rollup_seconds)
+        rollup_bytes = 2 * rollup_capacity * (8 + 3 * 4)
+        raw_capacity = max(int(rate_hz * MIN_RAW_SECONDS), (per_signal - rollup_bytes) // (2 * (8 + 4)))
+        self.rate_hz = rate_hz
+        self.series = {path: SignalSeries(raw_capacity, rollup_capacity, rollup_seconds) for path in paths}
+
+    def __contains__(self, path):
+        return path in self.series
+
+    @property
+    def nbytes(self):
+        return sum(s.nbytes for s in self.series.values())
+
+    @property
+    def raw_seconds(self):
+        """How much full-rate history each signal keeps."""
+        some = next(iter(self.series.values()), None)
+        return some.raw.capacity / self.rate_hz if some else 0.0
+
+    def append(self, path, t, value):
+        self.series[path].append(t, value)
+
+    def extend(self, path, ts, values):
+        self.series[path].extend(ts, values)
+
+    def latest(self, path):
+        return self.series[path].raw.latest()[1]
+
+    def read_since(self, path, cursor):
+        return self.series[path].raw.read_since(cursor)
+
+    def window(self, path, seconds):
+        return self.series[path].window(seconds)
+
+    def history(self, path, seconds):
+        return self.series[path].history(seconds)
+
+    def plot_view(self, path, seconds, max_points, method="lttb"):
+        """Downsampled (ts, values) for charts; falls back to rollup means beyond the raw tier."""
+        if seconds <= self.raw_seconds:
+            ts, values = self.window(path, seconds)
+        else:
+            ts, _, _, values = self.history(path, seconds)
+        if method == "minmax":
+            return downsample_minmax(ts, values, max_points // 2)
+        return lttb(ts, values, max_points)
+
+
+# ============================================================
+# DOWNSAMPLING FOR PLOTTING
+# ============================================================
+
+def downsample_minmax(ts, values, n_buckets):
+    """Keep each bucket's min and max sample (preserves spikes) — at most 2 * n_buckets points."""
+    n = len(values)
+    if n_buckets < 1 or n <= 2 * n_buckets:
+        return ts, values
+    per = n // n_buckets
+    start = n - per * n_buckets  # Drop the oldest remainder so buckets are equal-sized
+    block = values[start:].reshape(n_buckets, per)
+    base = start + np.arange(n_buckets) * per
+    idx = np.unique(np.concatenate([base + block.argmin(axis=1), base + block.argmax(axis=1)]))
+    return ts[idx], values[idx]
+
+
+def lttb(ts, values, n_out):
+    """Largest-Triangle-Three-Buckets: visually faithful downsampling to `n_out` points."""
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return ts, values
+    x = ts.astype(np.float64)
+    y = values.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Centroid of every bucket in one pass (the last "bucket" is the final point); the loop only picks maxima
+    counts = np.diff(np.append(edges, n))
+    avg_x = np.add.reduceat(x, edges) / counts
+    avg_y = np.add.reduceat(y, edges) / counts
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return ts[out], values[out]
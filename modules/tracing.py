@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from modules.llm_cache import CACHE_DIR
+
+# ============================================================
+# GENERATION TRACING (Per-Artifact Spans, Append-Only JSONL)
+# ============================================================
+# Every artifact generation runs inside a span. Each provider attempt made on its
+# behalf (cache hits, hedged/fallback hops, patch + fallback calls) is appended to the
+# span as a "hop" carrying wall time, time-to-first-token, provider-reported token
+# usage and estimated cost. Closed spans are appended as one JSON line to a local
+# trace file that the KPI page reads back.
+
+TRACE_PATH = os.getenv("GENAUTO_TRACE_FILE", os.path.join(CACHE_DIR, "generation_traces.jsonl"))
+TRACE_MAX_BYTES = int(os.getenv("GENAUTO_TRACE_MAX_MB", "16")) * 1024 * 1024
+TRACE_READ_BYTES = 2 * 1024 * 1024  # Tail of the file scanned when reading spans back
+TRACING_ENABLED = os.getenv("GENAUTO_TRACE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+# USD per million (input, output) tokens at list price
+MODEL_PRICES = {
+    "claude-3-haiku-20240307": (0.25, 1.25),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "meta-llama/llama-4-scout-17b-16e-instruct": (0.11, 0.34),
+    "gemini-2.0-flash": (0.10, 0.40),
+}
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def new_trace_id():
+    return uuid.uuid4().hex[:12]
+
+
+def hop_cost(model, input_tokens, output_tokens):
+    price = MODEL_PRICES.get(model)
+    if price is None or input_tokens is None or output_tokens is None:
+        return None
+    return (input_tokens * price[0] + output_tokens * price[1]) / 1e6
+
+
+class Span:
+    """One artifact generation: its provider hops and which one finally served it."""
+
+    def __init__(self, name, trace_id=None, **attrs):
+        self.name = name
+        self.trace_id = trace_id or new_trace_id()
+        self.attrs = attrs
+        self.started = time.time()
+        self.wall_s = None
+        self.served_by = None
+        self.ok = True
+        self.error = None
+        self.hops = []
+        self._lock = threading.Lock()
+
+    def hop(self, provider, model, **fields):
+        """Start recording one provider attempt; fill in the returned dict as the call progresses."""
+        record = {"provider": provider, "model": model, "started": time.time(), "cache_hit": False,
+                  "wall_s": None, "ttft_s": None, "input_tokens": None, "output_tokens": None, "ok": None, **fields}
+        with self._lock:
+            self.hops.append(record)
+        return record
+
+    def to_dict(self):
+        with self._lock:
+            hops = [dict(h) for h in self.hops]
+        served = next((h for h in reversed(hops) if h["ok"]), None)
+        billed = [h for h in hops if not h["cache_hit"]]
+        costs = [hop_cost(h["model"], h["input_tokens"], h["output_tokens"]) for h in billed]
+        return {
+            "trace_id": self.trace_id,
+            "span": self.name,
+            **self.attrs,
+            "started": round(self.started, 3),
+            "wall_s": self.wall_s,
+            "ttft_s": served["ttft_s"] if served else None,
+            "input_tokens": sum(h["input_tokens"] or 0 for h in billed),
+            "output_tokens": sum(h["output_tokens"] or 0 for h in billed),
+            "cost_usd": round(sum(c for c in costs if c is not None), 6),
+            "provider": served["provider"] if served else self.served_by,
+            "model": served["model"] if served else None,
+            "fallback_hops": max(0, len({(h["provider"], h["model"]) for h in hops}) - 1),
+            "cache_hits": sum(1 for h in hops if h["cache_hit"]),
+            "ok": self.ok,
+            "error": self.error,
+            "hops": hops,
+        }
+
+
+def current_span():
+    return getattr(_local, "span", None)
+
+
+@contextmanager
+def span(name, trace_id=None, **attrs):
+    """Open a span on this thread (or join the one already open) and write it to the trace file on exit."""
+    parent = current_span()
+    if parent is not None:
+        yield parent
+        return
+    active = _local.span = Span(name, trace_id, **attrs)
+    try:
+        yield active
+    except Exception as e:
+        active.ok, active.error = False, str(e)
+        raise
+    finally:
+        _local.span = None
+        active.wall_s = round(time.time() - active.started, 3)
+        write_span(active)
+
+
+def write_span(active, path=None):
+    if not TRACING_ENABLED:
+        return
+    path = path or TRACE_PATH
+    line = json.dumps(active.to_dict(), ensure_ascii=False) + "\n"
+    with _write_lock:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > TRACE_MAX_BYTES:
+            os.replace(path, f"{path}.1")  # Keep one rotated generation
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def read_spans(trace_id=None, path=None, max_bytes=TRACE_READ_BYTES):
+    """Spans from the tail of the trace file, oldest first; optionally only one trace."""
+    path = path or TRACE_PATH
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - max_bytes))
+            data = f.read()
+    except OSError:
+        return []
+    lines = data.split(b"\n")
+    if size > max_bytes:
+        lines = lines[1:]  # First line is probably cut in half
+    spans = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if trace_id is None or record.get("trace_id") == trace_id:
+            spans.append(record)
+    return spans
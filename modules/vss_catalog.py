@@ -0,0 +1,177 @@
+import json
+import os
+import streamlit as st
+
+# ============================================================
+# VSS CATALOG (Path Trie + CAN-ID / Variant Indexes)
+# ============================================================
+# Loads data/vss_signals.json (flat {"signals": {path: meta}}) or a full COVESA VSS
+# JSON export (nested "children" tree) once per process. Paths live in a trie keyed
+# by segment, so exact and prefix lookups cost O(path length) and wildcard patterns
+# only walk the branches they can match.
+
+VSS_CATALOG_PATH = os.getenv(
+    "GENAUTO_VSS_CATALOG",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "vss_signals.json"),
+)
+ALL_VARIANTS = ("ICE", "Hybrid", "EV")
+
+
+class VssNode:
+    """One path segment; `signal` is set on leaves that carry metadata."""
+
+    __slots__ = ("name", "children", "signal")
+
+    def __init__(self, name):
+        self.name = name
+        self.children = {}
+        self.signal = None
+
+
+class VssCatalog:
+    """Trie of VSS signals with reverse indexes by CAN ID and vehicle variant."""
+
+    def __init__(self, signals):
+        self.root = VssNode("")
+        self.signals = {}
+        self.by_can_id = {}
+        self.by_variant = {variant: set() for variant in ALL_VARIANTS}
+        for path, meta in signals.items():
+            self.add(path, meta)
+
+    def add(self, path, meta):
+        meta = dict(meta, vss_path=path)
+        node = self.root
+        for segment in path.split("."):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = VssNode(segment)
+            node = child
+        node.signal = meta
+        self.signals[path] = meta
+
+        can_id = _parse_can_id(meta.get("can_id"))
+        if can_id is not None:
+            self.by_can_id.setdefault(can_id, []).append(path)
+        for variant in meta.get("variants") or ALL_VARIANTS:
+            self.by_variant.setdefault(variant, set()).add(path)
+
+    def __len__(self):
+        return len(self.signals)
+
+    def __contains__(self, path):
+        return self._node(path) is not None
+
+    def _node(self, path):
+        node = self.root
+        for segment in path.split(".") if path else ():
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def get(self, path):
+        """Signal metadata for an exact leaf path, or None."""
+        node = self._node(path)
+        return node.signal if node is not None else None
+
+    def children(self, path=""):
+        """Names of the direct children of a branch."""
+        node = self._node(path)
+        return sorted(node.children) if node is not None else []
+
+    def prefix(self, path):
+        """Every signal path at or below `path`."""
+        node = self._node(path)
+        if node is None:
+            return []
+        found = []
+        stack = [(node, path)]
+        while stack:
+            node, node_path = stack.pop()
+            if node.signal is not None:
+                found.append(node_path)
+            stack.extend((child, f"{node_path}.{name}" if node_path else name) for name, child in node.children.items())
+        return sorted(found)
+
+    def match(self, pattern):
+        """Signal paths matching a dotted pattern: `*` is one segment, `**` is any number of segments."""
+        segments = pattern.split(".")
+        found = set()
+        stack = [(self.root, 0, "")]
+        while stack:
+            node, i, node_path = stack.pop()
+            if i == len(segments):
+                if node.signal is not None:
+                    found.add(node_path)
+                continue
+            segment = segments[i]
+            if segment == "**":
+                stack.append((node, i + 1, node_path))  # Zero segments
+                for name, child in node.children.items():
+                    stack.append((child, i, f"{node_path}.{name}" if node_path else name))
+            elif segment == "*":
+                for name, child in node.children.items():
+                    stack.append((child, i + 1, f"{node_path}.{name}" if node_path else name))
+            else:
+                child = node.children.get(segment)
+                if child is not None:
+                    stack.append((child, i + 1, f"{node_path}.{segment}" if node_path else segment))
+        return sorted(found)
+
+    def for_can_id(self, can_id):
+        """Signal paths transported in a CAN frame (int or "0x..." string)."""
+        return list(self.by_can_id.get(_parse_can_id(can_id), []))
+
+    def for_variant(self, variant, paths=None):
+        """Signal paths available on a vehicle variant, optionally restricted to `paths`."""
+        available = self.by_variant.get(variant, set())
+        return sorted(available if paths is None else available.intersection(paths))
+
+    def available(self, path, variant):
+        return path in self.by_variant.get(variant, ())
+
+
+def _parse_can_id(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value), 16) if str(value).lower().startswith("0x") else int(value)
+    except ValueError:
+        return None
+
+
+def _flatten_covesa(tree, prefix=""):
+    """Yield (path, meta) leaves from a COVESA vss-tools JSON export."""
+    for name, node in tree.items():
+        path = f"{prefix}.{name}" if prefix else name
+        children = node.get("children")
+        if children:
+            yield from _flatten_covesa(children, path)
+        elif node.get("type") != "branch":
+            yield path, {
+                "type": node.get("datatype", node.get("type")),
+                "unit": node.get("unit", ""),
+                "min": node.get("min"),
+                "max": node.get("max"),
+                "description": node.get("description", ""),
+                "can_id": node.get("can_id"),
+                "variants": node.get("variants"),
+            }
+
+
+def load_vss_catalog(path=VSS_CATALOG_PATH):
+    """Build a catalog from either the project's flat signal list or a COVESA tree export."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if "signals" in data:
+        return VssCatalog(data["signals"])
+    return VssCatalog(dict(_flatten_covesa(data)))
+
+
+@st.cache_resource(show_spinner=False)
+def get_vss_catalog(path=VSS_CATALOG_PATH):
+    """Process-wide catalog shared by every session."""
+    return load_vss_catalog(path)
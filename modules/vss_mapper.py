@@ -0,0 +1,241 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+import streamlit as st
+from modules.vss_catalog import get_vss_catalog
+
+# ============================================================
+# CAN → VSS AUTO-MAPPER (Token Inverted Index)
+# ============================================================
+# CAN signal / message names and units are tokenized (camelCase, underscores, wheel
+# position codes, unit and abbreviation expansion) and scored against an inverted
+# index of VSS path tokens with IDF weights. Only paths whose leaf segment names one of
+# the signal's words are nominated, and each is scored against its own token slice, so
+# cost scales with the handful of plausible leaves, not with catalog size.
+
+MIN_CONFIDENCE = 0.35
+DESCRIPTION_WEIGHT = 0.4             # Words from the VSS description count less than path segments
+MESSAGE_WEIGHT = 0.5                 # Words from the enclosing CAN message count less than the signal name
+UNIT_WEIGHT = 0.7
+MAP_CHUNK_SIGNALS = 256              # Signals scored per vectorized pass (bounds peak memory on huge DBCs)
+
+VssMatch = namedtuple("VssMatch", ["path", "confidence"])
+
+_PART_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+\d*|[A-Z]+\d*|\d+")
+_ACRONYMS = [(re.compile(r"SoC"), "StateOfCharge"), (re.compile(r"SoH"), "StateOfHealth")]
+_STOPWORDS = {"of", "the", "and", "msg", "message", "signal", "sig", "data", "status", "info", "vector", "xxx", "value"}
+_GENERIC_LEAVES = {"current", "average", "actual", "displayed"}
+
+# Abbreviation / unit / position-code expansions (lower-case token -> VSS vocabulary)
+_EXPANSIONS = {
+    "fl": ("row1", "left", "front"), "fr": ("row1", "right", "front"),
+    "rl": ("row2", "left", "rear"), "rr": ("row2", "right", "rear"),
+    "lf": ("row1", "left", "front"), "rf": ("row1", "right", "front"),
+    "lr": ("row2", "left", "rear"),
+    "psi": ("pressure",), "kpa": ("pressure",), "bar": ("pressure",), "press": ("pressure",), "prs": ("pressure",),
+    "kmh": ("speed",), "kph": ("speed",), "mph": ("speed",), "spd": ("speed",), "vel": ("speed",), "rpm": ("speed",),
+    "temp": ("temperature",), "tmp": ("temperature",), "degc": ("temperature",), "celsius": ("temperature",),
+    "volt": ("voltage",), "volts": ("voltage",), "vlt": ("voltage",),
+    "curr": ("current",), "amp": ("current",), "amps": ("current",),
+    "pos": ("position",), "posn": ("position",),
+    "batt": ("battery",), "bat": ("battery",), "hv": ("traction", "battery"),
+    "mot": ("motor",), "mtr": ("motor",), "eng": ("engine",), "ice": ("combustion", "engine"),
+    "coolant": ("ect",), "ect": ("coolant", "temperature"),
+    "brk": ("brake",), "thr": ("throttle",), "thrtl": ("throttle",),
+    "steer": ("steering",), "str": ("steering",), "ang": ("angle",), "whl": ("wheel",),
+    "trq": ("torque",), "accel": ("acceleration",),
+}
+_UNIT_ALIASES = {
+    "km/h": "km/h", "kmh": "km/h", "kph": "km/h",
+    "degc": "celsius", "°c": "celsius", "c": "celsius", "celsius": "celsius",
+    "deg": "degrees", "degrees": "degrees", "°": "degrees",
+    "psi": "psi", "kpa": "kpa", "v": "v", "a": "a", "%": "percent", "percent": "percent",
+    "rpm": "rpm", "km": "km", "mm/s": "mm/s",
+}
+_UNIT_TOKENS = {"km/h": ("speed",), "celsius": ("temperature",), "psi": ("pressure",), "kpa": ("pressure",),
+                "v": ("voltage",), "a": ("current",), "rpm": ("speed",), "degrees": ("angle",)}
+
+
+@lru_cache(maxsize=4096)
+def normalize_unit(unit):
+    return _UNIT_ALIASES.get((unit or "").strip().lower(), "")
+
+
+@lru_cache(maxsize=65536)
+def _segment_words(segment):
+    return tuple(w for w in (w.lower() for w in _PART_RE.findall(segment)) if w not in _STOPWORDS)
+
+
+@lru_cache(maxsize=65536)
+def tokenize(name):
+    """Split an identifier into lower-case tokens and expand abbreviations / position codes."""
+    for pattern, replacement in _ACRONYMS:
+        name = pattern.sub(replacement, name)
+    tokens = []
+    for part in re.split(r"[^A-Za-z0-9]+", name):
+        if not part:
+            continue
+        words = [w.lower() for w in _PART_RE.findall(part)]
+        if len(words) > 1:
+            tokens.append(part.lower())   # Compound token ("throttleposition") for exact-segment hits
+        for word in words:
+            tokens.append(word)
+            tokens.extend(_EXPANSIONS.get(word, ()))
+        tokens.extend(_EXPANSIONS.get(part.lower(), ()))
+    return tuple(t for t in tokens if t not in _STOPWORDS)
+
+
+class VssMapper:
+    """Inverted index over VSS path tokens; maps CAN signals to ranked VSS paths."""
+
+    def __init__(self, signals):
+        """`signals` maps VSS path -> metadata (unit, description), e.g. `VssCatalog.signals`."""
+        self.paths = list(signals)
+        self.vocab = {}
+        rows = []                    # per path: [(token id, path weight, core segment word)]
+        leaf_postings = {}           # token id -> path ids whose leaf segment contains the word
+        leaf_count = []
+        units = []
+        for i, path in enumerate(self.paths):
+            meta = signals[path] or {}
+            segments = path.split(".")
+            weights = dict.fromkeys(tokenize(meta.get("description") or ""), DESCRIPTION_WEIGHT)
+            core = set()
+            for segment in segments:
+                core.update(_segment_words(segment))
+                weights.update(dict.fromkeys(tokenize(segment), 1.0))
+            leaf = segments[-1]
+            if leaf.lower() in _GENERIC_LEAVES and len(segments) > 2:
+                leaf = segments[-2]
+            leaf_words = set(_segment_words(leaf))
+            leaf_words = leaf_words - _GENERIC_LEAVES or leaf_words
+
+            row = []
+            for token, weight in weights.items():
+                token_id = self.vocab.setdefault(token, len(self.vocab))
+                row.append((token_id, weight, token in core))
+                if token in leaf_words:
+                    leaf_postings.setdefault(token_id, []).append(i)
+            rows.append(row)
+            leaf_count.append(max(1, len(leaf_words)))
+            units.append(normalize_unit(meta.get("unit")))
+
+        # Flat CSR of path tokens: path i owns entries offsets[i]:offsets[i + 1]
+        flat = [entry for row in rows for entry in row]
+        token_ids, path_weight, in_core = (np.array(col) for col in zip(*flat)) if flat else ([],) * 3
+        self.offsets = np.concatenate([[0], np.cumsum([len(row) for row in rows])]).astype(np.int32)
+        self.token_ids = np.asarray(token_ids, dtype=np.int32)
+        df = np.bincount(self.token_ids, minlength=len(self.vocab))
+        self.idf = np.log1p(max(1, len(self.paths)) / np.maximum(df, 1))
+        self.match_weight = np.asarray(path_weight, dtype=np.float64) * self.idf[self.token_ids]
+        self.core_idf = np.asarray(in_core, dtype=np.float64) * self.idf[self.token_ids]
+        self.path_idf = np.maximum(np.add.reduceat(self.core_idf, self.offsets[:-1]), 1e-9) if flat else np.empty(0)
+        self.leaf_count = np.array(leaf_count, dtype=np.float64)
+        self.leaf_postings = {t: np.array(ids, dtype=np.int64) for t, ids in leaf_postings.items()}
+        self._unit_codes = {u: k for k, u in enumerate(sorted(set(units)))}
+        self._no_unit = self._unit_codes.get("", -1)
+        self.units = np.array([self._unit_codes[u] for u in units], dtype=np.int32)
+
+    def _signal_weights(self, name, message, unit):
+        weights = {}
+        for token in tokenize(message or ""):
+            weights[token] = MESSAGE_WEIGHT
+        for token in _UNIT_TOKENS.get(normalize_unit(unit), ()):
+            weights[token] = max(weights.get(token, 0.0), UNIT_WEIGHT)
+        weights.update(dict.fromkeys(tokenize(name), 1.0))
+        return {self.vocab[t]: w for t, w in weights.items() if t in self.vocab}
+
+    def _nominate(self, batch):
+        """Candidate (signal index, path id) pairs sorted by signal then path, with each pair's leaf-hit fraction."""
+        n = len(self.paths)
+        # Only paths whose leaf names one of the signal's own words are nominated: without a leaf hit
+        # confidence tops out at 0.25, below MIN_CONFIDENCE, so nothing else can win
+        nominated = [self.leaf_postings[t] + k * n for k, weights in enumerate(batch)
+                     for t, w in weights.items() if w > MESSAGE_WEIGHT and t in self.leaf_postings]
+        if not nominated:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        keys = np.sort(np.concatenate(nominated))    # Per-signal postings are already sorted: near-linear
+        first = np.concatenate([[True], keys[1:] != keys[:-1]])
+        hits = np.diff(np.append(np.flatnonzero(first), len(keys)))
+        sig, path = np.divmod(keys[first], n)
+        return sig, path, hits / self.leaf_count[path]
+
+    def _overlap(self, batch, sig, path):
+        """explained^0.6 · coverage^0.4 for (signal, path) pairs.
+
+        explained: share of the signal's (weighted) idf found in the path;
+        coverage: share of the path's segment idf named by the signal.
+        """
+        if not len(path):
+            return np.empty(0)
+        # Gather every pair's CSR token slice; batch tokens map to columns of a dense (signal x token) weight table
+        starts = self.offsets[path]
+        lengths = self.offsets[path + 1] - starts
+        owner = np.repeat(np.arange(len(path), dtype=np.int32), lengths)
+        entries = np.arange(len(owner), dtype=np.int32) + (starts - (np.cumsum(lengths) - lengths))[owner]
+        batch_tokens = sorted({t for weights in batch for t in weights})
+        column = np.full(len(self.vocab), -1, dtype=np.int32)
+        column[batch_tokens] = np.arange(len(batch_tokens), dtype=np.int32)
+        table = np.zeros((len(batch), len(batch_tokens)))
+        for k, weights in enumerate(batch):
+            table[k, column[list(weights)]] = list(weights.values())
+
+        # Keep only entries naming one of the signal's words, then sum them per pair
+        hit_columns = column[self.token_ids[entries]]
+        hits = np.flatnonzero(hit_columns >= 0)
+        pair = owner[hits]
+        weight = table[sig[pair], hit_columns[hits]]
+        shared = weight > 0
+        hits, pair, weight = entries[hits[shared]], pair[shared], weight[shared]
+
+        totals = np.array([sum(w * self.idf[t] for t, w in weights.items()) or 1.0 for weights in batch])
+        explained = np.bincount(pair, weight * self.match_weight[hits], len(path)) / totals[sig]
+        coverage = np.bincount(pair, self.core_idf[hits], len(path)) / self.path_idf[path]
+        return np.minimum(1.0, explained ** 0.6 * coverage ** 0.4)
+
+    def map_signals(self, signals, top_k=3):
+        """Ranked VssMatch lists for many (name, message, unit) signals, scored in vectorized chunks."""
+        results = []
+        for chunk_start in range(0, len(signals), MAP_CHUNK_SIGNALS):
+            chunk = signals[chunk_start:chunk_start + MAP_CHUNK_SIGNALS]
+            batch = [self._signal_weights(name, message, unit) for name, message, unit in chunk]
+            sig, path, leaf = self._nominate(batch)
+
+            confidence = (0.25 + 0.75 * leaf) * self._overlap(batch, sig, path)
+            unit_codes = np.array([self._unit_codes.get(normalize_unit(unit), self._no_unit) for _, _, unit in chunk])
+            signal_units, path_units = unit_codes[sig], self.units[path]
+            confidence[(signal_units != self._no_unit) & (path_units != self._no_unit) & (signal_units != path_units)] *= 0.5
+
+            # Best-first within each signal (pairs stay sorted by signal then path, so ties stay path-ordered)
+            confidence = np.round(confidence, 3)
+            order = np.argsort(sig * 2.0 - confidence, kind="stable")
+            sig, path, confidence = sig[order], path[order], confidence[order]
+            keep = np.arange(len(sig)) - np.searchsorted(sig, sig) < top_k
+            chunk_results = [[] for _ in chunk]
+            for k, i, score in zip(sig[keep].tolist(), path[keep].tolist(), confidence[keep].tolist()):
+                chunk_results[k].append(VssMatch(self.paths[i], score))
+            results.extend(chunk_results)
+        return results
+
+    def map_signal(self, name, message="", unit="", top_k=3):
+        """Ranked VssMatch candidates (highest confidence first) for one CAN signal."""
+        return self.map_signals([(name, message, unit)], top_k)[0]
+
+    def best(self, name, message="", unit="", min_confidence=MIN_CONFIDENCE):
+        """Top match above `min_confidence`, or None."""
+        matches = self.map_signal(name, message, unit, top_k=1)
+        return matches[0] if matches and matches[0].confidence >= min_confidence else None
+
+    def map_database(self, db, min_confidence=MIN_CONFIDENCE):
+        """{signal name: vss path} for every DBC signal with a confident match."""
+        pairs = list(db.iter_signals())
+        matches = self.map_signals([(sig.name, msg.name, sig.unit) for msg, sig in pairs], top_k=1)
+        return {sig.name: found[0].path for (_, sig), found in zip(pairs, matches)
+                if found and found[0].confidence >= min_confidence}
+
+
+@st.cache_resource(show_spinner=False)
+def get_vss_mapper():
+    """Process-wide mapper over the VSS catalog."""
+    return VssMapper(get_vss_catalog().signals)